@@ -1,8 +1,12 @@
 from furl import furl
 import json
+import time
 import base64
+import hashlib
 import logging
+import threading
 import requests
+import jwt
 from functools import wraps
 
 from django.contrib.auth.models import User
@@ -13,11 +17,174 @@ from django.shortcuts import redirect
 from django.contrib.auth import logout
 from django.core.exceptions import PermissionDenied
 from dbmi_client.settings import dbmi_settings
-from dbmi_client.settings import dbmi_settings
-from dbmi_client.authn import validate_request, login_redirect_url
+from dbmi_client.authn import validate_request as dbmi_validate_request, login_redirect_url
+
+from hypatio.http_session import SERVICE_REQUEST_TIMEOUT
 
 logger = logging.getLogger(__name__)
 
+# The number of seconds signing keys are kept before the JWKS is fetched again
+JWKS_CACHE_LIFESPAN = 3600
+
+# The number of seconds of clock skew allowed when verifying tokens, matching the DBMI client
+JWT_LEEWAY = 120
+
+# The maximum number of verified tokens whose claims are kept in memory
+JWT_CLAIMS_MEMO_SIZE = 10000
+
+# JWKS clients keyed by JWKS URL, shared by all threads in the process
+_jwks_clients = {}
+
+# Verified claims keyed by token hash, shared by all threads in the process
+_jwt_claims = {}
+_jwt_claims_lock = threading.Lock()
+
+
+def get_request_jwt(request):
+    """
+    Returns the JWT passed with the request, if any, from either the DBMI
+    cookie or the Authorization header.
+
+    :param request: The current request
+    :type request: HttpRequest
+    :return: The JWT
+    :rtype: str
+    """
+    token = request.COOKIES.get("DBMI_JWT", None)
+    if not token:
+        authorization = request.META.get("HTTP_AUTHORIZATION", "")
+        if authorization.startswith("JWT ") or authorization.startswith("Bearer "):
+            token = authorization.split(" ", 1)[1]
+
+    return token or None
+
+
+def get_jwks_client(audience):
+    """
+    Returns the process-wide JWKS client for the auth client the token was
+    issued to. Signing keys are cached by the client and the JWKS is fetched
+    again when a token is signed with a key it has not seen, e.g. after keys
+    are rotated.
+
+    :param audience: The client ID the token was issued for
+    :type audience: str
+    :return: The JWKS client or None if the auth client is not configured for local verification
+    :rtype: PyJWKClient
+    """
+    client = dbmi_settings.AUTH_CLIENTS.get(audience)
+    if not client:
+        return None
+
+    # Determine where the keys are published
+    jwks_url = client.get("JWKS_URL")
+    if not jwks_url and client.get("DOMAIN"):
+        jwks_url = f"https://{client['DOMAIN']}/.well-known/jwks.json"
+    if not jwks_url:
+        return None
+
+    jwks_client = _jwks_clients.get(jwks_url)
+    if jwks_client is None:
+        jwks_client = _jwks_clients.setdefault(
+            jwks_url, jwt.PyJWKClient(jwks_url, cache_keys=True, lifespan=JWKS_CACHE_LIFESPAN)
+        )
+
+    return jwks_client
+
+
+def verify_jwt(token):
+    """
+    Verifies the token locally against the cached signing keys of the auth
+    client it was issued to.
+
+    :param token: The JWT
+    :type token: str
+    :raises jwt.PyJWKClientError: If the signing keys could not be fetched
+    :return: The verified claims, False if the token is invalid or None if it cannot be verified locally
+    :rtype: dict
+    """
+    try:
+        # Find the auth client this token was issued to
+        audiences = jwt.decode(token, options={"verify_signature": False}).get("aud")
+        audiences = audiences if isinstance(audiences, list) else [audiences]
+        audience = next((a for a in audiences if a in dbmi_settings.AUTH_CLIENTS), None)
+
+        jwks_client = get_jwks_client(audience) if audience else None
+        if jwks_client is None:
+            return None
+
+        # Verify it, including its issuer if the auth client's domain is known
+        domain = dbmi_settings.AUTH_CLIENTS[audience].get("DOMAIN")
+        signing_key = jwks_client.get_signing_key_from_jwt(token)
+        return jwt.decode(
+            token,
+            signing_key.key,
+            algorithms=["RS256"],
+            audience=audience,
+            issuer=f"https://{domain}/" if domain else None,
+            leeway=JWT_LEEWAY,
+        )
+
+    except jwt.PyJWKClientError:
+        raise
+
+    except jwt.InvalidTokenError as e:
+        logger.debug(f"Invalid JWT: {e}")
+        return False
+
+
+def validate_request(request):
+    """
+    Validates the JWT passed with the request and returns its claims. Tokens
+    are verified locally when the auth client is configured for it, otherwise
+    verification is deferred to the DBMI client. Verified claims are kept in
+    memory until the token expires so subsequent requests with the same token
+    skip verification entirely.
+
+    :param request: The current request
+    :type request: HttpRequest
+    :return: The verified claims or None if the token is missing or invalid
+    :rtype: dict
+    """
+    token = get_request_jwt(request)
+    if not token:
+        return None
+
+    # Check for previously verified claims
+    token_hash = hashlib.sha256(token.encode()).hexdigest()
+    claims = _jwt_claims.get(token_hash)
+    if claims is not None:
+        if claims.get("exp", 0) > time.time():
+            return claims
+
+        with _jwt_claims_lock:
+            _jwt_claims.pop(token_hash, None)
+
+    try:
+        claims = verify_jwt(token)
+    except jwt.PyJWKClientError as e:
+        logger.warning(f"Could not fetch signing keys, falling back to DBMI client: {e}")
+        claims = None
+
+    # Defer to the DBMI client if it could not be done locally
+    if claims is None:
+        claims = dbmi_validate_request(request)
+
+    if not claims:
+        return None
+
+    # Remember it, dropping expired claims when full
+    with _jwt_claims_lock:
+        if len(_jwt_claims) >= JWT_CLAIMS_MEMO_SIZE:
+            now = time.time()
+            for key in [k for k, c in _jwt_claims.items() if c.get("exp", 0) <= now]:
+                del _jwt_claims[key]
+            if len(_jwt_claims) >= JWT_CLAIMS_MEMO_SIZE:
+                _jwt_claims.clear()
+
+        _jwt_claims[token_hash] = claims
+
+    return claims
+
 
 def jwt_and_manage(item):
     '''
@@ -47,7 +214,7 @@ def jwt_and_manage(item):
 
                     # Confirm user is a manager of the given project
                     permissions_url = sciauthz_permission_url(item, email)
-                    response = requests.get(permissions_url, headers=sciauthz_headers(request))
+                    response = requests.get(permissions_url, headers=sciauthz_headers(request), timeout=SERVICE_REQUEST_TIMEOUT)
                     content = response.content
                     response.raise_for_status()
 
@@ -1,10 +1,10 @@
-import requests
 from furl import furl
 import logging
 
 from django.core.exceptions import ObjectDoesNotExist
 from dbmi_client.settings import dbmi_settings
 
+from hypatio.http_session import session
 from projects.models import DataProject
 from projects.models import Participant
 
@@ -59,7 +59,7 @@ class DBMIAuthz:
         while url is not None:
             try:
                 # Make the request
-                response = requests.get(url=url.url, headers=headers, params=params)
+                response = session.get(url=url.url, headers=headers, params=params)
                 content = response.content
                 response.raise_for_status()
 
@@ -71,13 +71,18 @@ class DBMIAuthz:
                     permissions.extend(results['results'])
 
                 # If there are more permissions to pull, update the URL to hit. Otherwise, exit the loop.
-                url = furl.furl(results['next']) if results.get('next') else None
+                # The next URL already carries the query parameters.
+                url = furl(results['next']) if results.get('next') else None
+                params = None
 
             except Exception as e:
                 logger.exception(f'AuthZ Error: {e}', exc_info=True, extra={
                     'url': url, 'params': params, 'content': content,
                 })
 
+                # Do not retry the same page indefinitely
+                break
+
         return permissions
 
     @classmethod
@@ -100,7 +105,7 @@ class DBMIAuthz:
         content = None
         try:
             # Make the request
-            response = requests.post(url=url.url, headers=headers, data=data)
+            response = session.post(url=url, headers=headers, data=data)
             content = response.content
             response.raise_for_status()
 
@@ -2,14 +2,25 @@ import os
 import boto3
 import requests
 import furl
+from boto3.s3.transfer import TransferConfig
 from botocore.client import Config
 from django.conf import settings
 
+from hypatio.http_session import session
 from projects.models import Bucket
 
 import logging
 logger = logging.getLogger(__name__)
 
+# Objects larger than this are copied in parts, which is required above 5 GB
+HOST_FILE_MULTIPART_THRESHOLD = 256 * 1024 * 1024
+
+# The size of each part of a multipart copy
+HOST_FILE_MULTIPART_CHUNKSIZE = 256 * 1024 * 1024
+
+# The number of parts of a single object copied concurrently
+HOST_FILE_MAX_CONCURRENCY = 8
+
 
 def build_url(base, path):
 
@@ -46,7 +57,7 @@ def get(request, path, params=None):
         url = build_url(settings.FILESERVICE_API_URL, path)
 
         # Prepare the request.
-        response = requests.get(url, headers=headers(request), params=params)
+        response = session.get(url, headers=headers(request), params=params)
 
         logger.debug('URL: {}, Response: {}'.format(url, response.status_code))
 
@@ -68,7 +79,7 @@ def post(request, path, data):
 
     try:
         # Prepare the request.
-        response = requests.post(url, headers=headers(request), json=data)
+        response = session.post(url, headers=headers(request), json=data)
 
         logger.debug('URL: {}, Response: {}'.format(url, response.status_code))
 
@@ -91,7 +102,7 @@ def put(request, path, data):
     try:
 
         # Prepare the request.
-        response = requests.put(url, headers=headers(request), json=data)
+        response = session.put(url, headers=headers(request), json=data)
 
         logger.debug('URL: {}, Response: {}'.format(url, response.status_code))
 
@@ -114,7 +125,7 @@ def patch(request, path, data):
     try:
 
         # Prepare the request.
-        response = requests.patch(url, headers=headers(request), json=data)
+        response = session.patch(url, headers=headers(request), json=data)
 
         logger.debug('URL: {}, Response: {}'.format(url, response.status_code))
 
@@ -137,7 +148,7 @@ def delete(request, path, params=None):
     try:
 
         # Prepare the request.
-        response = requests.delete(url, headers=headers(request), params=params)
+        response = session.delete(url, headers=headers(request), params=params)
 
         logger.debug('URL: {}, Response: {}'.format(url, response.status_code))
 
@@ -259,11 +270,29 @@ def group_name(permission):
     return '{}__{}'.format(settings.FILESERVICE_GROUP, permission.upper())
 
 
-def _s3_client():
+def _s3_client(max_pool_connections=None):
     # Get the service client with sigv4 configured
+    if max_pool_connections:
+        return boto3.client('s3', config=Config(signature_version='s3v4', max_pool_connections=max_pool_connections))
+
     return boto3.client('s3', config=Config(signature_version='s3v4'))
 
 
+def get_s3_client(max_pool_connections=None):
+    """
+    Returns a new S3 client. Creating clients from the default session is not
+    thread-safe but a client may be shared between threads once created, so
+    create one before starting any threads that need it. Size its connection
+    pool for the number of requests those threads make at once.
+
+    :param max_pool_connections: The maximum number of connections to keep, defaults to botocore's
+    :type max_pool_connections: int, optional
+    :return: The client
+    :rtype: S3.Client
+    """
+    return _s3_client(max_pool_connections=max_pool_connections)
+
+
 def get_download_url(file_uri, expires_in=3600):
     """
     Returns an S3 URL for project related files not tracked by fileservice.
@@ -322,7 +351,7 @@ def upload_file(file, file_uri, expires_in=3600):
     # Perform the request to upload the file
     files = {"file": file}
     try:
-        response = requests.post(post["url"], data=post["fields"], files=files)
+        response = session.post(post["url"], data=post["fields"], files=files)
         response.raise_for_status()
 
         return response
@@ -336,46 +365,101 @@ def upload_file(file, file_uri, expires_in=3600):
         logger.exception(e)
 
 
+def list_objects(prefix_uri):
+    """
+    Returns the URI and size of every object under the passed prefix.
+
+    :param prefix_uri: The URI of the prefix, e.g. s3://bucket/path/
+    :type prefix_uri: str
+    :return: A list of (URI, size) tuples
+    :rtype: list
+    """
+    provider, bucket, prefix = Bucket.split_uri(prefix_uri)
+
+    # Check provider
+    match provider:
+        case Bucket.Provider.S3:
+            objects = []
+            paginator = _s3_client().get_paginator('list_objects_v2')
+            for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+                objects.extend(
+                    (f'{provider.value}://{bucket}/{item["Key"]}', item["Size"])
+                    for item in page.get("Contents", []) if not item["Key"].endswith("/")
+                )
+
+            return objects
+
+        case _:
+            raise NotImplementedError(f"Could not list objects for URI: {prefix_uri}")
+
+
+def get_file_uri(file_uuid):
+    """
+    Returns the URI of the object backing a file tracked by Fileservice.
+
+    :param file_uuid: The UUID of the Fileservice file
+    :type file_uuid: str
+    :return: The filename and URI of the file, or None if it could not be found
+    :rtype: tuple
+    """
+    file = get(None, '/api/file/{}/'.format(file_uuid))
+    if not file or not file.get('locations'):
+        return None
+
+    return file['filename'], file['locations'][0]['url']
+
+
+def copy_object(source_uri, file_uri, client=None):
+    """
+    Copies an object server-side between buckets. Large objects are copied
+    in parts concurrently, which also allows copying objects over 5 GB.
+
+    :param source_uri: The URI of the object to copy
+    :type source_uri: str
+    :param file_uri: The URI to copy it to
+    :type file_uri: str
+    :param client: The S3 client to use, defaults to a new client
+    :type client: S3.Client, optional
+    """
+    _, origin_bucket, origin_key = Bucket.split_uri(source_uri)
+    provider, bucket, key = Bucket.split_uri(file_uri)
+
+    # Check provider
+    match provider:
+        case Bucket.Provider.S3:
+            logger.debug(f'Copying s3://{origin_bucket}/{origin_key} to {provider.value}://{bucket}/{key}')
+
+            (client or _s3_client()).copy(
+                CopySource={'Bucket': origin_bucket, 'Key': origin_key},
+                Bucket=bucket,
+                Key=key,
+                Config=TransferConfig(
+                    multipart_threshold=HOST_FILE_MULTIPART_THRESHOLD,
+                    multipart_chunksize=HOST_FILE_MULTIPART_CHUNKSIZE,
+                    max_concurrency=HOST_FILE_MAX_CONCURRENCY,
+                ),
+            )
+
+        case _:
+            raise NotImplementedError(f"Could not copy to URI: {file_uri}")
+
+
 def host_file(request, file_uuid, file_uri):
     """
     Copies a file from the Fileservice bucket to the Hypatio hosted files bucket
     """
     try:
         # Get the original file from Fileservice
-        file = get(request, '/api/file/{}/'.format(file_uuid))
-        logger.debug(file)
-
-        # Separate destination URI
-        provider, bucket, key = Bucket.split_uri(file_uri)
-
-        # Check provider
-        match provider:
-            case Bucket.Provider.S3:
-
-                # Perform the request to copy the file
-                _, origin_bucket, origin_key = Bucket.split_uri(file['locations'][0]['url'])
-                source = {'Bucket': origin_bucket, 'Key': origin_key}
-                logger.debug(
-                    f'Fileservice: Copying s3://{origin_bucket}/{origin_key}'
-                    f' to {provider.value}://{bucket}/{key}'
-                )
-
-                # Generate the URL to get the file object
-                _s3_client().copy_object(
-                    CopySource=source,
-                    Bucket=bucket,
-                    Key=key,
-                )
+        _, source_uri = get_file_uri(file_uuid)
 
-                return True
+        # Perform the request to copy the file
+        copy_object(source_uri, file_uri)
 
-            case _:
-                raise NotImplementedError(f"Could not generate upload for URI: {file_uri}")
+        return True
 
     except Exception as e:
         logger.exception('[file_services][host_file] Error: {}'.format(e), exc_info=True, extra={
-            'request': request, 'bucket': bucket, 'file_uuid': file_uuid,
-            'file_uri': file_uri,
+            'request': request, 'file_uuid': file_uuid, 'file_uri': file_uri,
         })
 
     return False
@@ -0,0 +1,52 @@
+from http.cookiejar import DefaultCookiePolicy
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import logging
+logger = logging.getLogger(__name__)
+
+# The number of distinct hosts kept in the connection pool
+SERVICE_POOL_CONNECTIONS = 8
+
+# The maximum number of open connections kept per host
+SERVICE_POOL_MAXSIZE = 32
+
+# The number of seconds to wait on a service to connect or respond before giving up
+SERVICE_REQUEST_TIMEOUT = 10
+
+
+class ServiceSession(requests.Session):
+    """
+    A session that times out any request made without an explicit timeout so
+    an unresponsive service cannot hold up a worker indefinitely.
+    """
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", SERVICE_REQUEST_TIMEOUT)
+        return super().request(method, url, **kwargs)
+
+
+def build_session():
+    """
+    Builds a session for calling DBMI services that keeps connections to each
+    service open between requests. The session is shared by all users and
+    threads so it is set to never store cookies; anything user-specific must be
+    passed explicitly with each request.
+
+    :return: The session
+    :rtype: ServiceSession
+    """
+    session = ServiceSession()
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+    # Pool connections to each host
+    adapter = HTTPAdapter(pool_connections=SERVICE_POOL_CONNECTIONS, pool_maxsize=SERVICE_POOL_MAXSIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    return session
+
+
+# The session shared by all service clients in this process
+session = build_session()
@@ -0,0 +1,98 @@
+import inspect
+from functools import cache
+
+from django.core.exceptions import ValidationError
+from django.utils.module_loading import import_string
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+@cache
+def resolve(dotted_path: str) -> object:
+    """
+    Imports and returns the object referenced by the dotted path. Successful
+    lookups are cached so subsequent calls skip the import machinery.
+
+    :param dotted_path: The fully-qualified path to the object
+    :type dotted_path: str
+    :raises ImportError: If the module or object cannot be found
+    :return: The object
+    :rtype: object
+    """
+    return import_string(dotted_path)
+
+
+@cache
+def resolve_class(dotted_path: str) -> type:
+    """
+    Returns the class referenced by the dotted path, ensuring it is a concrete
+    class that can be instantiated. Successful lookups are cached.
+
+    :param dotted_path: The fully-qualified path to the class
+    :type dotted_path: str
+    :raises ValidationError: If the path does not reference a concrete class
+    :return: The class
+    :rtype: type
+    """
+    try:
+        cls = resolve(dotted_path)
+    except ImportError as e:
+        logger.exception(e, exc_info=True)
+        raise ValidationError(f"Invalid class name: {dotted_path}. Ensure it is a valid Python import path to a class.")
+
+    # Check it's actually a class
+    if not inspect.isclass(cls):
+        raise ValidationError(f"Invalid class name: {dotted_path}. Ensure it is a valid Python import path to a class.")
+
+    # Check if class is abstract
+    if inspect.isabstract(cls):
+        raise ValidationError(f"Invalid class name: {dotted_path}. Specified class is abstract and cannot be used.")
+
+    return cls
+
+
+@cache
+def resolve_callable(dotted_path: str) -> object:
+    """
+    Returns the callable referenced by the dotted path. Successful lookups are cached.
+
+    :param dotted_path: The fully-qualified path to the callable
+    :type dotted_path: str
+    :raises ValidationError: If the path does not reference a callable
+    :return: The callable
+    :rtype: object
+    """
+    try:
+        function = resolve(dotted_path)
+    except ImportError as e:
+        logger.exception(e, exc_info=True)
+        raise ValidationError(f"Invalid callable name: {dotted_path}. Ensure it is a valid Python import path to a callable.")
+
+    if not callable(function):
+        raise ValidationError(f"Invalid callable name: {dotted_path}. Specified object is not callable.")
+
+    return function
+
+
+def warm(dotted_paths, resolver=resolve) -> list[str]:
+    """
+    Resolves each of the passed dotted paths so they are cached ahead of use.
+    Paths that fail to resolve are logged and returned.
+
+    :param dotted_paths: The fully-qualified paths to resolve
+    :type dotted_paths: list
+    :param resolver: The resolver to use, defaults to resolve
+    :type resolver: function, optional
+    :return: The paths that could not be resolved
+    :rtype: list
+    """
+    failed = []
+    for dotted_path in set(filter(None, dotted_paths)):
+        try:
+            resolver(dotted_path)
+        except (ImportError, ValidationError) as e:
+            logger.warning(f"Could not resolve '{dotted_path}': {e}")
+            failed.append(dotted_path)
+
+    return failed
@@ -1,16 +1,23 @@
 from json import JSONDecodeError
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-import requests
 import json
 import furl
 import logging
 
 from dbmi_client.settings import dbmi_settings
 
+from hypatio.http_session import session
 from projects.models import DataProject
 
 logger = logging.getLogger(__name__)
 
+# The maximum number of concurrent requests made for bulk permission operations
+BULK_PERMISSION_MAX_WORKERS = 8
+
+# The timeout, in seconds, for each request made for bulk permission operations
+BULK_PERMISSION_TIMEOUT = 15
+
 class SciAuthZ:
     USER_PERMISSIONS_URL = None
     JWT_HEADERS = None
@@ -40,7 +47,7 @@ class SciAuthZ:
         permissions_url.query.params.add('search', 'Hypatio,MANAGE')
 
         try:
-            user_permissions = requests.get(permissions_url.url, headers=self.JWT_HEADERS).json()
+            user_permissions = session.get(permissions_url.url, headers=self.JWT_HEADERS).json()
         except JSONDecodeError:
             user_permissions = None
 
@@ -66,7 +73,7 @@ class SciAuthZ:
 
         try:
             while next_page:
-                user_permissions_request = requests.get(
+                user_permissions_request = session.get(
                     authz_url.url,
                     headers=self.JWT_HEADERS,
                 ).json()
@@ -98,7 +105,7 @@ class SciAuthZ:
             "item": 'Hypatio.' + project
         }
 
-        profile_permission = requests.post(
+        profile_permission = session.post(
             self.CREATE_PROFILE_PERMISSION,
             headers=modified_headers,
             data=data,
@@ -117,7 +124,7 @@ class SciAuthZ:
             "item": 'Hypatio.' + project
         }
 
-        view_permission = requests.post(self.CREATE_ITEM_PERMISSION, headers=modified_headers, data=context)
+        view_permission = session.post(self.CREATE_ITEM_PERMISSION, headers=modified_headers, data=context)
         return view_permission
 
     def remove_view_permission(self, project, grantee_email):
@@ -131,9 +138,81 @@ class SciAuthZ:
             "item": 'Hypatio.' + project
         }
 
-        view_permission = requests.post(self.REMOVE_ITEM_PERMISSION, headers=modified_headers, data=context)
+        view_permission = session.post(self.REMOVE_ITEM_PERMISSION, headers=modified_headers, data=context)
         return view_permission
 
+    def _bulk_permission_post(self, url, project, grantee_emails):
+        """
+        POSTs a permission change for each of the passed emails concurrently.
+
+        :param url: The AuthZ URL to POST to
+        :type url: str
+        :param project: The project key the permission is for
+        :type project: str
+        :param grantee_emails: The emails of the users the permission is for
+        :type grantee_emails: list
+        :return: A dictionary of error messages keyed by the email of each failed change
+        :rtype: dict
+        """
+        grantee_emails = list(dict.fromkeys(grantee_emails))
+        if not grantee_emails:
+            return {}
+
+        headers = dict(self.JWT_HEADERS, **{'Content-Type': 'application/x-www-form-urlencoded'})
+
+        def post(grantee_email):
+            context = {
+                "grantee_email": grantee_email,
+                "item": 'Hypatio.' + project
+            }
+
+            response = session.post(url, headers=headers, data=context, timeout=BULK_PERMISSION_TIMEOUT)
+            response.raise_for_status()
+
+        # Make the requests and collect failures
+        failures = {}
+        with ThreadPoolExecutor(max_workers=min(len(grantee_emails), BULK_PERMISSION_MAX_WORKERS)) as executor:
+            futures = {executor.submit(post, grantee_email): grantee_email for grantee_email in grantee_emails}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.exception(f'[HYPATIO][_bulk_permission_post] - Permission change failed for '
+                                     f'{futures[future]} on project {project}: {e}', exc_info=True)
+                    failures[futures[future]] = str(e)
+
+        return failures
+
+    def create_view_permissions(self, project, grantee_emails):
+        """
+        Creates VIEW permissions on the project for each of the passed emails.
+
+        :param project: The project key
+        :type project: str
+        :param grantee_emails: The emails of the users to grant VIEW to
+        :type grantee_emails: list
+        :return: A dictionary of error messages keyed by the email of each failed grant
+        :rtype: dict
+        """
+        logger.debug(f'[HYPATIO][create_view_permissions] - Creating VIEW permission for {len(grantee_emails)} users on project {project}.')
+
+        return self._bulk_permission_post(self.CREATE_ITEM_PERMISSION, project, grantee_emails)
+
+    def remove_view_permissions(self, project, grantee_emails):
+        """
+        Removes VIEW permissions on the project for each of the passed emails.
+
+        :param project: The project key
+        :type project: str
+        :param grantee_emails: The emails of the users to revoke VIEW from
+        :type grantee_emails: list
+        :return: A dictionary of error messages keyed by the email of each failed revocation
+        :rtype: dict
+        """
+        logger.debug(f'[HYPATIO][remove_view_permissions] - Removing VIEW permission for {len(grantee_emails)} users on project {project}.')
+
+        return self._bulk_permission_post(self.REMOVE_ITEM_PERMISSION, project, grantee_emails)
+
     def user_has_single_permission(self, permission, value, email=None):
 
         f = furl.furl(self.USER_PERMISSIONS_URL)
@@ -144,7 +223,7 @@ class SciAuthZ:
             f.args["email"] = email
 
         try:
-            user_permissions = requests.get(f.url, headers=self.JWT_HEADERS).json()
+            user_permissions = session.get(f.url, headers=self.JWT_HEADERS).json()
         except JSONDecodeError:
             logger.debug("[SCIAUTHZ][user_has_single_permission] - No Valid permissions returned.")
             return False
@@ -207,7 +286,7 @@ class SciAuthZ:
 
         try:
             while next_page:
-                user_permissions_request = requests.get(
+                user_permissions_request = session.get(
                     authz_url,
                     headers=self.JWT_HEADERS,
                 ).json()
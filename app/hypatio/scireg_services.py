@@ -1,17 +1,27 @@
-import requests
 import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 
 from furl import furl
 from json import JSONDecodeError
 
+from django.core.cache import cache
 from dbmi_client.settings import dbmi_settings
 
+from hypatio.http_session import session
+
 import logging
 logger = logging.getLogger(__name__)
 
 # Set the base API URL for registration related queries
 DBMI_REG_API_URL = furl(dbmi_settings.REG_URL) / "api" / "register"
 
+# The maximum number of concurrent requests made when fetching multiple profiles
+PROFILE_FETCH_MAX_WORKERS = 8
+
+# The number of seconds a fetched profile is cached for
+PROFILE_CACHE_TIMEOUT = 300
+
 def build_headers_with_jwt(user_jwt):
     return {"Authorization": "JWT " + user_jwt, 'Content-Type': 'application/json'}
 
@@ -26,7 +36,7 @@ def send_confirmation_email(user_jwt, current_uri):
         'project': 'hypatio',
     }
 
-    requests.post(send_confirm_email_url, headers=build_headers_with_jwt(user_jwt), data=json.dumps(email_confirm_data))
+    session.post(send_confirm_email_url, headers=build_headers_with_jwt(user_jwt), data=json.dumps(email_confirm_data))
 
 
 def get_user_email_confirmation_status(user_jwt):
@@ -35,7 +45,7 @@ def get_user_email_confirmation_status(user_jwt):
     Returns True or False.
     """
 
-    response = requests.get(DBMI_REG_API_URL.url, headers=build_headers_with_jwt(user_jwt))
+    response = session.get(DBMI_REG_API_URL.url, headers=build_headers_with_jwt(user_jwt))
 
     try:
         email_status = response.json()['results'][0]['email_confirmed']
@@ -52,7 +62,7 @@ def get_current_user_profile(user_jwt):
     f = furl(DBMI_REG_API_URL.url)
 
     try:
-        profile = requests.get(f.url, headers=build_headers_with_jwt(user_jwt)).json()
+        profile = session.get(f.url, headers=build_headers_with_jwt(user_jwt)).json()
 
     except JSONDecodeError:
         profile = {"count": 0}
@@ -68,13 +78,74 @@ def get_user_profile(user_jwt, email_of_profile, project_key):
     f.args["project"] = 'Hypatio.' + project_key
 
     try:
-        profile = requests.get(f.url, headers=build_headers_with_jwt(user_jwt)).json()
+        profile = session.get(f.url, headers=build_headers_with_jwt(user_jwt)).json()
     except JSONDecodeError:
         profile = {"count": 0}
 
     return profile
 
 
+def get_user_profile_cache_key(email_of_profile, project_key):
+    """
+    Returns the cache key for a user's profile as viewed for a project.
+    """
+    digest = hashlib.md5(email_of_profile.lower().encode()).hexdigest()
+    return f"scireg:profile:{project_key}:{digest}"
+
+
+def get_user_profiles(user_jwt, emails_of_profiles, project_key):
+    """
+    Fetches the profiles for each of the passed emails. Profiles are read from
+    the cache where possible and the remainder are requested from SciReg
+    concurrently. Profiles are cached per project since SciReg scopes profile
+    access to the project's permissions.
+
+    :param user_jwt: The JWT of the user making the requests
+    :type user_jwt: str
+    :param emails_of_profiles: The emails of the users whose profiles are needed
+    :type emails_of_profiles: list
+    :param project_key: The project the profiles are being viewed for
+    :type project_key: str
+    :return: A dictionary of profiles, or None if not found, keyed by email
+    :rtype: dict
+    """
+    emails_of_profiles = list(dict.fromkeys(emails_of_profiles))
+
+    # Check the cache first
+    cache_keys = {get_user_profile_cache_key(email, project_key): email for email in emails_of_profiles}
+    cached = cache.get_many(cache_keys.keys())
+    profiles = {cache_keys[key]: profile for key, profile in cached.items()}
+
+    missing = [email for email in emails_of_profiles if email not in profiles]
+    if missing:
+
+        def fetch(email):
+            try:
+                profile_json = get_user_profile(user_jwt, email, project_key)
+                return profile_json["results"][0] if profile_json.get("count") else None
+            except Exception as e:
+                logger.exception(f'Failed to get profile for "{email}" from SciReg: {e}', exc_info=True)
+                raise
+
+        with ThreadPoolExecutor(max_workers=min(len(missing), PROFILE_FETCH_MAX_WORKERS)) as executor:
+            futures = {email: executor.submit(fetch, email) for email in missing}
+
+        # Only cache successful lookups
+        fetched = {}
+        for email, future in futures.items():
+            try:
+                profiles[email] = fetched[email] = future.result()
+            except Exception:
+                profiles[email] = None
+
+        cache.set_many(
+            {get_user_profile_cache_key(email, project_key): profile for email, profile in fetched.items()},
+            PROFILE_CACHE_TIMEOUT
+        )
+
+    return profiles
+
+
 def get_distinct_countries_participating(user_jwt, participants, project_key):
     """
     Takes a QuerySet of participants' emails and returns a dictionary
@@ -93,7 +164,7 @@ def get_distinct_countries_participating(user_jwt, participants, project_key):
     }
 
     try:
-        countries = requests.post(url, headers=build_headers_with_jwt(user_jwt), data=json.dumps(data)).json()
+        countries = session.post(url, headers=build_headers_with_jwt(user_jwt), data=json.dumps(data)).json()
     except Exception:
         logger.error('Failed to get country list from SciReg.')
         return None
@@ -119,7 +190,7 @@ def get_names(user_jwt, participants, project_key):
     }
 
     try:
-        names = requests.post(url, headers=build_headers_with_jwt(user_jwt), data=json.dumps(data)).json()
+        names = session.post(url, headers=build_headers_with_jwt(user_jwt), data=json.dumps(data)).json()
     except Exception:
         logger.error('Failed to get names of participants from SciReg.')
         return None
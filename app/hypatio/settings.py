@@ -126,6 +126,26 @@ DATABASES = {
     }
 }
 
+# Cache
+# Cached project data is invalidated on change so it must be shared by all processes
+# to see changes immediately. Without Redis, each process keeps its own cache and
+# other processes see changes once their cached copies expire.
+
+REDIS_URL = environment.get_str("REDIS_URL", default=None)
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 # Password validation
 # https://docs.djangoproject.com/en/1.10/ref/settings/#auth-password-validators
 
@@ -338,6 +358,18 @@ Q_CLUSTER = {
 
 #####################################################################################
 
+#####################################################################################
+# Signed agreement form settings
+#####################################################################################
+
+# Generate signed agreement form documents and call handlers in a background task
+SIGNED_AGREEMENT_FORM_DEFERRED_PROCESSING = environment.get_bool("SIGNED_AGREEMENT_FORM_DEFERRED_PROCESSING", default=True)
+
+# The number of times deferred processing is attempted before it is marked as failed
+SIGNED_AGREEMENT_FORM_PROCESSING_MAX_ATTEMPTS = environment.get_int("SIGNED_AGREEMENT_FORM_PROCESSING_MAX_ATTEMPTS", default=5)
+
+#####################################################################################
+
 #####################################################################################
 # Logging settings
 #####################################################################################
@@ -0,0 +1,75 @@
+import time
+from unittest import mock
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+from django.test import SimpleTestCase
+
+from hypatio import auth0authenticate
+from hypatio.auth0authenticate import JWT_LEEWAY
+from hypatio.auth0authenticate import verify_jwt
+
+CLIENT_ID = "hypatio-client"
+DOMAIN = "dbmi.auth0.example.com"
+
+
+class VerifyJWTTestCase(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+    def setUp(self):
+        # Serve the test key as the auth client's signing key
+        signing_key = mock.Mock(key=self.private_key.public_key())
+        jwks_client = mock.Mock(**{"get_signing_key_from_jwt.return_value": signing_key})
+        patches = [
+            mock.patch.object(auth0authenticate, "dbmi_settings", mock.Mock(AUTH_CLIENTS={
+                CLIENT_ID: {"DOMAIN": DOMAIN},
+            })),
+            mock.patch.object(auth0authenticate, "get_jwks_client", return_value=jwks_client),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def token(self, **claims):
+        now = int(time.time())
+        payload = {
+            "sub": "auth0|user",
+            "email": "user@example.com",
+            "aud": CLIENT_ID,
+            "iss": f"https://{DOMAIN}/",
+            "iat": now,
+            "exp": now + 3600,
+        }
+        payload.update(claims)
+        return jwt.encode(payload, self.private_key, algorithm="RS256")
+
+    def test_valid_token(self):
+        claims = verify_jwt(self.token())
+        self.assertEqual(claims["email"], "user@example.com")
+
+    def test_expired_token(self):
+        now = int(time.time())
+        self.assertFalse(verify_jwt(self.token(iat=now - 7200, exp=now - JWT_LEEWAY - 60)))
+
+    def test_just_expired_token_within_leeway(self):
+        now = int(time.time())
+        self.assertTrue(verify_jwt(self.token(iat=now - 3600, exp=now - JWT_LEEWAY // 2)))
+
+    def test_skewed_token_within_leeway(self):
+        now = int(time.time())
+        self.assertTrue(verify_jwt(self.token(iat=now + JWT_LEEWAY // 2, nbf=now + JWT_LEEWAY // 2)))
+
+    def test_skewed_token_beyond_leeway(self):
+        now = int(time.time())
+        self.assertFalse(verify_jwt(self.token(nbf=now + JWT_LEEWAY + 60)))
+
+    def test_wrong_issuer(self):
+        self.assertFalse(verify_jwt(self.token(iss="https://elsewhere.example.com/")))
+
+    def test_wrong_audience(self):
+        # Tokens for clients that are not configured cannot be verified locally
+        self.assertIsNone(verify_jwt(self.token(aud="other-client")))
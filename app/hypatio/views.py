@@ -1,11 +1,11 @@
 
 from django.shortcuts import render
 from django.utils.functional import SimpleLazyObject
-from django.urls import resolve, Resolver404, reverse
+from django.urls import resolve, Resolver404
 
 from hypatio.auth0authenticate import public_user_auth_and_jwt
 from projects.apps import ProjectsConfig
-from projects.models import Group, DataProject
+from projects.catalog import get_catalog
 
 import logging
 logger = logging.getLogger(__name__)
@@ -35,8 +35,8 @@ def navigation_context(request):
     """
     def group_context():
 
-        # Check for an active project and determine its group
-        groups = Group.objects.filter(dataproject__isnull=False, dataproject__visible=True).distinct()
+        # Navigation is built from the catalog
+        catalog = get_catalog()
         active_group = None
 
         # Attempt to resolve the current URL
@@ -45,11 +45,10 @@ def navigation_context(request):
 
             # Check if projects
             if match and match.app_name == ProjectsConfig.name and "project_key" in match.kwargs:
-                project = DataProject.objects.filter(project_key=match.kwargs["project_key"]).first()
-                if project:
 
-                    # Check for group
-                    active_group = next((g for g in groups if project in g.dataproject_set.all()), None)
+                # Check for group
+                group_key = catalog["project_groups"].get(match.kwargs["project_key"])
+                active_group = catalog["groups"].get(group_key) if group_key else None
 
         except Resolver404:
             logger.debug(f"Path could not be resolved: {request.path}")
@@ -57,27 +56,9 @@ def navigation_context(request):
         except Exception as e:
             logger.exception(f"Group context error: {e}", exc_info=True)
 
-        # Pull out top-level groups
-        parent_groups_keys = groups.filter(parent__isnull=False).values_list('parent', flat=True)
-        parent_groups = Group.objects.filter(id__in=parent_groups_keys)
-
-        # Remove groups that will be placed under a parent group
-        groups = groups.filter(parent__isnull=True)
-
-        # For remaining groups, find those with only one active Project and set that link
-        for group in groups:
-
-            # Filter visible data projects
-            data_projects = group.dataproject_set.filter(visible=True)
-            if data_projects.count() == 1:
-
-                # Get the URL
-                data_project_url = reverse("projects:view-project", kwargs={"project_key": data_projects.first().project_key})
-                setattr(group, "group_url", data_project_url)
-
         return {
-            "parent_groups": parent_groups,
-            "groups": groups,
+            "parent_groups": catalog["navigation"]["parent_groups"],
+            "groups": catalog["navigation"]["groups"],
             "active_group": active_group,
         }
 
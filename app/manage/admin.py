@@ -1,6 +1,7 @@
 from django.contrib import admin
 
 from manage.models import ChallengeTaskSubmissionExport
+from manage.models import HostedFileImport
 
 
 class ChallengeTaskSubmissionExportAdmin(admin.ModelAdmin):
@@ -8,4 +9,11 @@ class ChallengeTaskSubmissionExportAdmin(admin.ModelAdmin):
     list_filter = ('data_project', 'requester', )
 
 
+class HostedFileImportAdmin(admin.ModelAdmin):
+    list_display = ('data_project', 'file_location', 'status', 'total_count', 'copied_count', 'failed_count', 'requester', 'created', )
+    list_filter = ('data_project', 'status', )
+    readonly_fields = ('created', 'modified', )
+
+
 admin.site.register(ChallengeTaskSubmissionExport, ChallengeTaskSubmissionExportAdmin)
+admin.site.register(HostedFileImport, HostedFileImportAdmin)
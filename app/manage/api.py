@@ -1,4 +1,6 @@
 from datetime import datetime
+import csv
+import itertools
 import json
 import logging
 import os
@@ -14,12 +16,25 @@ from dbmi_client import fileservice
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.exceptions import ObjectDoesNotExist
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import Count
+from django.db.models import Q
+from django.db.models.functions import TruncDate
+from django.db.models.functions import TruncMonth
+from django.db.models.functions import TruncWeek
 from django.http import HttpResponse
+from django.http import JsonResponse
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect
 from django.template.loader import render_to_string
 from django.core.files.storage import default_storage
+from django.utils import timezone
+from rest_framework import mixins
 from rest_framework import viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response
 from rest_framework import status
 
@@ -33,28 +48,54 @@ from hypatio.scireg_services import get_names
 from hypatio.file_services import host_file
 from manage.forms import EditHostedFileForm
 from manage.forms import HostSubmissionForm
+from manage.forms import HostedFileImportForm
 from manage.serializers import DataProjectWorkflowSerializer
 from manage.serializers import DataProjectWorkflowStateSerializer
+from manage.serializers import DataProjectStepStateSerializer
 from manage.utils import zip_submission_file
-from projects.templatetags import projects_extras
+from manage.datatables import KeysetDataTable
+from manage.datatables import invalidate_agreement_form_tables
+from manage.datatables import invalidate_tables
+from projects.api import queue_email
+from projects.signals import create_institutional_officials
+from projects.signals import sync_teams
+from projects.rendering import render_agreement_form
 
 from manage.models import ChallengeTaskSubmissionExport
+from manage.models import HostedFileImport
 from projects.models import AgreementForm
 from projects.models import ChallengeTaskSubmission
 from projects.models import DataProject
+from projects.models import DataProjectWorkflow
 from projects.models import HostedFile
+from projects.models import HostedFileDownload
+from projects.models import HostedFileSet
 from projects.models import Participant
 from projects.models import SignedAgreementForm
 from projects.models import Team
 from projects.models import TeamComment
-from projects.serializers import HostedFileSerializer, HostedFileDownloadSerializer
+from projects.serializers import HostedFileSerializer
 from projects.models import AGREEMENT_FORM_TYPE_MODEL, AGREEMENT_FORM_TYPE_FILE
+from projects.models import TEAM_ACTIVE, TEAM_READY
 from projects.models import InstitutionalOfficial
 from workflows.api import WorkflowStateViewSet
+from workflows.models import Step
+from workflows.models import StepState
+from workflows.models import StepStateQueueCount
 
 # Get an instance of a logger
 logger = logging.getLogger(__name__)
 
+# The periods hosted file downloads may be summarized by
+HOSTED_FILE_LOG_BUCKET_DAY = 'day'
+HOSTED_FILE_LOG_BUCKET_WEEK = 'week'
+HOSTED_FILE_LOG_BUCKET_MONTH = 'month'
+HOSTED_FILE_LOG_BUCKETS = {
+    HOSTED_FILE_LOG_BUCKET_DAY: TruncDate,
+    HOSTED_FILE_LOG_BUCKET_WEEK: TruncWeek,
+    HOSTED_FILE_LOG_BUCKET_MONTH: TruncMonth,
+}
+
 @user_auth_and_jwt
 def set_dataproject_registration_status(request):
     """
@@ -243,7 +284,7 @@ def get_static_agreement_form_html(request):
         if agreement_form.form_file_path is None or agreement_form.form_file_path == "":
             return HttpResponse("Error: form file path is missing.", status=400)
 
-        form_contents = projects_extras.get_html_form_file_contents(agreement_form.form_file_path)
+        form_contents = render_agreement_form(agreement_form)
 
     return HttpResponse(form_contents)
 
@@ -291,12 +332,18 @@ def get_hosted_file_edit_form(request):
     )
     return HttpResponse(response_html)
 
-@user_auth_and_jwt
-def get_hosted_file_logs(request):
+def get_managed_hosted_file(request, view_name):
     """
-    An HTTP GET endpoint for requests to get logs of an existing HostedFile.
+    Returns the HostedFile identified by the request's parameters if the
+    requesting user manages its project.
+
+    :param request: The current request
+    :type request: HttpRequest
+    :param view_name: The name of the calling view, for logging
+    :type view_name: str
+    :return: The HostedFile and None, or None and an error response
+    :rtype: tuple
     """
-
     user = request.user
     user_jwt = request.COOKIES.get("DBMI_JWT", None)
 
@@ -308,45 +355,158 @@ def get_hosted_file_logs(request):
 
     if not is_manager:
         logger.debug(
-            '[HYPATIO][DEBUG][get_hosted_file_logs] User {email} does not have MANAGE permissions for item {project_key}.'.format(
+            '[HYPATIO][DEBUG][{view_name}] User {email} does not have MANAGE permissions for item {project_key}.'.format(
+                view_name=view_name,
                 email=user.email,
                 project_key=project_key
             )
         )
-        return HttpResponse("Error: permissions.", status=403)
+        return None, HttpResponse("Error: permissions.", status=403)
 
     hosted_file_uuid = request.GET.get("hosted-file-uuid")
 
     try:
-        hosted_file = HostedFile.objects.get(project=project, uuid=hosted_file_uuid)
-    except ObjectDoesNotExist:
-        logger.debug(
-            '[HYPATIO][DEBUG][get_hosted_file_logs] User {email} does not have MANAGE permissions for item {project_key}.'.format(
-                email=user.email,
-                project_key=project_key
-            )
-        )
-        return HttpResponse("Error: file not found.", status=404)
+        return HostedFile.objects.select_related("project").get(project=project, uuid=hosted_file_uuid), None
+    except (ObjectDoesNotExist, DjangoValidationError):
+        logger.debug(f'[HYPATIO][DEBUG][{view_name}] File "{hosted_file_uuid}" not found for {project_key}.')
+        return None, HttpResponse("Error: file not found.", status=404)
     except Exception as e:
         logger.exception(
-            '[HYPATIO][EXCEPTION][get_hosted_file_logs] Could not perform fetch for '
-            'file download logs: {e}.'.format(e=e), exc_info=True, extra={
+            '[HYPATIO][EXCEPTION][{view_name}] Could not perform fetch for '
+            'file download logs: {e}.'.format(view_name=view_name, e=e), exc_info=True, extra={
                 'user': user.email, 'project': project_key, 'hosted_file': hosted_file_uuid
             }
         )
-        return HttpResponse("Error: fetch failed with error", status=500)
+        return None, HttpResponse("Error: fetch failed with error", status=500)
+
+
+def get_hosted_file_download_stats(hosted_file, bucket=HOSTED_FILE_LOG_BUCKET_DAY):
+    """
+    Returns the number of downloads and unique downloading users of the file
+    for each period it was downloaded in, most recent first.
+
+    :param hosted_file: The file
+    :type hosted_file: HostedFile
+    :param bucket: The length of each period, defaults to a day
+    :type bucket: str, optional
+    :return: A list of dicts with `period`, `downloads` and `users`
+    :rtype: list
+    """
+    return list(
+        HostedFileDownload.objects.filter(hosted_file=hosted_file)
+        .annotate(period=HOSTED_FILE_LOG_BUCKETS[bucket]("download_date"))
+        .values("period")
+        .annotate(downloads=Count("id"), users=Count("user", distinct=True))
+        .order_by("-period")
+    )
+
+
+@user_auth_and_jwt
+def get_hosted_file_logs(request):
+    """
+    An HTTP GET endpoint for requests to get logs of an existing HostedFile.
+    Download counts are summarized per day and individual downloads are
+    paged in from get_hosted_file_downloads.
+    """
+    hosted_file, response = get_managed_hosted_file(request, "get_hosted_file_logs")
+    if response:
+        return response
+
+    # Summarize downloads
+    stats = get_hosted_file_download_stats(hosted_file)
+    totals = HostedFileDownload.objects.filter(hosted_file=hosted_file).aggregate(
+        downloads=Count("id"), users=Count("user", distinct=True)
+    )
 
     response_html = render_to_string(
         'manage/hosted-file-logs.html',
         context={
-            'downloads': [HostedFileDownloadSerializer(downloads).data for downloads in
-                          hosted_file.hostedfiledownload_set.all().order_by('download_date')],
+            'stats': stats,
+            'totals': totals,
             'file': HostedFileSerializer(hosted_file).data,
+            'project_key': hosted_file.project.project_key,
         },
         request=request
     )
     return HttpResponse(response_html)
 
+
+@user_auth_and_jwt
+def get_hosted_file_downloads(request):
+    """
+    An HTTP GET endpoint returning a HostedFile's downloads. Passing a `bucket`
+    of day, week or month returns download and unique user counts for each
+    period. Otherwise, individual downloads are returned a page at a time in
+    response to DataTables server-side requests.
+    """
+    hosted_file, response = get_managed_hosted_file(request, "get_hosted_file_downloads")
+    if response:
+        return response
+
+    # Return aggregates, if requested
+    bucket = request.GET.get("bucket")
+    if bucket:
+        if bucket not in HOSTED_FILE_LOG_BUCKETS:
+            return HttpResponse("Error: invalid bucket.", status=400)
+
+        return JsonResponse({
+            "bucket": bucket,
+            "data": [
+                {"period": row["period"].isoformat(), "downloads": row["downloads"], "users": row["users"]}
+                for row in get_hosted_file_download_stats(hosted_file, bucket)
+            ],
+        })
+
+    table = KeysetDataTable(
+        request,
+        f"hosted-file-downloads:{hosted_file.id}",
+        hosted_file.project,
+        HostedFileDownload.objects.filter(hosted_file=hosted_file).select_related("user"),
+        orderings={
+            1: ['download_date'],
+            0: ['user__email', 'download_date'],
+        },
+    )
+
+    return table.response([
+        [download.user.email, download.download_date.isoformat()] for download in table.page()
+    ])
+
+
+class Echo:
+    """
+    A file-like object that returns what is written to it, for streaming CSV rows.
+    """
+    def write(self, value):
+        return value
+
+
+@user_auth_and_jwt
+def download_hosted_file_logs(request):
+    """
+    An HTTP GET endpoint that streams a CSV of every download of a HostedFile.
+    """
+    hosted_file, response = get_managed_hosted_file(request, "download_hosted_file_logs")
+    if response:
+        return response
+
+    downloads = HostedFileDownload.objects.filter(hosted_file=hosted_file).order_by(
+        "download_date", "id"
+    ).values_list("user__email", "download_date")
+
+    # Stream rows as they are read from the database
+    writer = csv.writer(Echo())
+    rows = itertools.chain(
+        [writer.writerow(["user", "download_date"])],
+        (writer.writerow([email, download_date.isoformat()]) for email, download_date in downloads.iterator(chunk_size=2000)),
+    )
+
+    response = StreamingHttpResponse(rows, content_type="text/csv")
+    response['Content-Disposition'] = 'attachment; filename="{}_downloads.csv"'.format(hosted_file.file_name)
+
+    return response
+
+
 @user_auth_and_jwt
 def process_hosted_file_edit_form_submission(request):
     """
@@ -579,6 +739,142 @@ def change_signed_form_status(request):
 
     return HttpResponse(200)
 
+
+@user_auth_and_jwt
+def change_signed_form_statuses(request):
+    """
+    An HTTP POST endpoint for approving or rejecting a set of a project's signed
+    forms at once. Forms are updated in a single transaction, permissions are
+    revoked once per affected participant after it commits and notifications
+    are queued to be sent after the changes are committed.
+    """
+    project_key = request.POST.get("project")
+    status = request.POST.get("status")
+    form_ids = request.POST.getlist("form_ids[]") or request.POST.getlist("form_ids")
+    administrator_message = request.POST.get("administrator_message")
+
+    try:
+        project = DataProject.objects.get(project_key=project_key)
+    except DataProject.DoesNotExist:
+        return HttpResponse("Error: project not found.", status=404)
+
+    user = request.user
+    user_jwt = request.COOKIES.get("DBMI_JWT", None)
+
+    sciauthz = SciAuthZ(user_jwt, user.email)
+    is_manager = sciauthz.user_has_manage_permission(project.project_key)
+
+    if not is_manager:
+        logger.debug(
+            '[HYPATIO][DEBUG][change_signed_form_statuses] User {email} does not have MANAGE permissions for item {project_key}.'.format(
+                email=user.email,
+                project_key=project.project_key
+            )
+        )
+        return HttpResponse("Error: permissions.", status=403)
+
+    statuses = {
+        "approved": "A",
+        "rejected": "R",
+    }
+    if status not in statuses:
+        logger.debug('[HYPATIO][change_signed_form_statuses] Given status "' + str(status) + '" not one of allowed statuses.')
+        return HttpResponse("Error: invalid status.", status=400)
+
+    logger.debug(f'[HYPATIO][change_signed_form_statuses] {user.email} changing status for {len(form_ids)} '
+                 f'signed forms to {status}')
+
+    # Only forms for this project may be changed
+    signed_forms = list(SignedAgreementForm.objects.filter(
+        id__in=[form_id for form_id in form_ids if str(form_id).isdigit()],
+        project=project,
+    ).select_related("user", "project", "agreement_form"))
+    not_found = sorted(set(map(str, form_ids)) - {str(signed_form.id) for signed_form in signed_forms})
+
+    # Leave forms that already have the status alone so nothing is applied or sent twice
+    unchanged = [signed_form.id for signed_form in signed_forms if signed_form.status == statuses[status]]
+    signed_forms = [signed_form for signed_form in signed_forms if signed_form.status != statuses[status]]
+
+    # Determine who loses access from rejections
+    failures = {}
+    solo_participants = []
+    active_teams = []
+    if status == "rejected":
+        participants = Participant.objects.filter(
+            project=project,
+            user__in={signed_form.user_id for signed_form in signed_forms},
+        ).select_related("team")
+
+        solo_participants = [participant for participant in participants if not participant.team]
+        active_teams = list({
+            participant.team.id: participant.team for participant in participants
+            if participant.team and participant.team.status == TEAM_ACTIVE
+        }.values())
+
+        # Everyone who loses VIEW permissions
+        revoked = Participant.objects.filter(
+            Q(id__in=[participant.id for participant in solo_participants]) |
+            Q(team__in=active_teams)
+        ).select_related("user")
+        revoked_emails = list({participant.user.email for participant in revoked})
+
+    with transaction.atomic():
+        for signed_form in signed_forms:
+            signed_form.status = statuses[status]
+
+        # Bulk updates do not fire signals so handle what saving each form would
+        SignedAgreementForm.objects.filter(id__in=[signed_form.id for signed_form in signed_forms]).update(
+            status=statuses[status]
+        )
+        if status == "approved":
+            create_institutional_officials(signed_forms)
+
+        else:
+            # Move Active teams down to Ready and mirror revoked permissions locally
+            Team.objects.filter(id__in=[team.id for team in active_teams]).update(
+                status=TEAM_READY, modified=timezone.now()
+            )
+            if active_teams and project.shares_teams:
+                sync_teams(project)
+
+            # Notify each affected participant and team
+            for signed_form in signed_forms:
+                queue_email(subject='DBMI Portal - Signed Form Rejected',
+                            recipients=[signed_form.user.email],
+                            email_template='email_signed_form_rejection_notification',
+                            extra={'signed_form': signed_form,
+                                   'administrator_message': administrator_message,
+                                   'site_url': settings.SITE_URL})
+
+            for team in active_teams:
+                queue_email(subject='DBMI Portal - Team Status Changed',
+                            recipients=list(team.participant_set.values_list("user__email", flat=True)),
+                            email_template='email_new_team_status_notification',
+                            extra={'status': "ready",
+                                   'reason': 'Your team has been temporarily disabled because of an issue with a team members\' forms. Challenge administrators will resolve this shortly.',
+                                   'project': project,
+                                   'site_url': settings.SITE_URL})
+
+        invalidate_agreement_form_tables(project)
+
+    # Only remove permissions in AuthZ once the forms are committed, then mirror them locally
+    if status == "rejected" and revoked_emails:
+        failures = sciauthz.remove_view_permissions(project.project_key, revoked_emails)
+        revoked.exclude(user__email__in=failures.keys()).update(permission=None, modified=timezone.now())
+        invalidate_tables(project.id)
+
+    if failures:
+        logger.error(f'[HYPATIO][change_signed_form_statuses] Permission changes failed for {len(failures)} '
+                     f'participant(s) of {project.project_key}: {", ".join(failures)}')
+
+    return JsonResponse({
+        "updated": [signed_form.id for signed_form in signed_forms],
+        "unchanged": unchanged,
+        "not_found": not_found,
+        "failed": failures,
+    })
+
+
 @user_auth_and_jwt
 def save_team_comment(request):
     """
@@ -655,42 +951,43 @@ def set_team_status(request):
 
     team = Team.objects.get(team_leader__email=team_leader, data_project=project)
 
-    # First change the team's status
-    if status == "pending":
-        team.status = "Pending"
-        team.save()
-    elif status == "ready":
-        team.status = "Ready"
-        team.save()
-    elif status == "active":
-        team.status = "Active"
-        team.save()
-    elif status == "deactivated":
-        team.status = "Deactivated"
-        team.save()
-    else:
+    # Map the status to the team status and the participant permission it implies
+    statuses = {
+        "pending": "Pending",
+        "ready": "Ready",
+        "active": "Active",
+        "deactivated": "Deactivated",
+    }
+    if status not in statuses:
         logger.debug('[HYPATIO][set_team_status] Given status "' + status + '" not one of allowed statuses.')
         return HttpResponse(500)
 
-    # If setting to Active, grant each team member access permissions.
-    if status == "active":
-        for member in team.participant_set.all():
-            sciauthz = SciAuthZ(request.COOKIES.get("DBMI_JWT", None), request.user.email)
-            sciauthz.create_view_permission(project_key, member.user.email)
-
-            # Add permission to Participant
-            member.permission = 'VIEW'
-            member.save()
+    # Change the team's status first so it is committed before any permissions change
+    team.status = statuses[status]
+    team.save()
+
+    # If setting to Active, grant each team member access permissions. If setting to Deactivated,
+    # revoke each team member's permissions. AuthZ is updated concurrently for the whole team.
+    failures = {}
+    if status in ("active", "deactivated"):
+        member_emails = list(team.participant_set.values_list("user__email", flat=True))
+        if status == "active":
+            failures = sciauthz.create_view_permissions(project_key, member_emails)
+        else:
+            failures = sciauthz.remove_view_permissions(project_key, member_emails)
+
+        # Mirror permissions locally for members AuthZ accepted
+        team.participant_set.exclude(user__email__in=failures.keys()).update(
+            permission='VIEW' if status == "active" else None,
+            modified=timezone.now(),
+        )
 
-    # If setting to Deactivated, revoke each team member's permissions.
-    elif status == "deactivated":
-        for member in team.participant_set.all():
-            sciauthz = SciAuthZ(request.COOKIES.get("DBMI_JWT", None), request.user.email)
-            sciauthz.remove_view_permission(project_key, member.user.email)
+        # Bulk updates do not fire signals
+        invalidate_tables(project.id)
 
-            # Remove permission from Participant
-            member.permission = None
-            member.save()
+    if failures:
+        logger.error(f'[HYPATIO][set_team_status] Permission changes failed for {len(failures)} '
+                     f'member(s) of team {team_leader}: {", ".join(failures)}')
 
     # Send an email notification to the team
     context = {'status': status,
@@ -705,7 +1002,7 @@ def set_team_status(request):
                                email_template='email_new_team_status_notification',
                                extra=context)
 
-    return HttpResponse(200)
+    return JsonResponse({"failed": failures})
 
 @user_auth_and_jwt
 def delete_team(request):
@@ -747,13 +1044,21 @@ def delete_team(request):
     logger.debug('[HYPATIO][delete_team] Removing all VIEW permissions for team members.')
 
     # First revoke all VIEW permissions
-    for member in team.participant_set.all():
-        sciauthz = SciAuthZ(request.COOKIES.get("DBMI_JWT", None), request.user.email)
-        sciauthz.remove_view_permission(project_key, member.user.email)
+    member_emails = list(team.participant_set.values_list("user__email", flat=True))
+    failures = sciauthz.remove_view_permissions(project_key, member_emails)
+    if failures:
+        logger.error(f'[HYPATIO][delete_team] Permission removal failed for {len(failures)} '
+                     f'member(s) of team {team_leader}: {", ".join(failures)}')
+
+    # Remove permission from Participants
+    with transaction.atomic():
+        team.participant_set.exclude(user__email__in=failures.keys()).update(
+            permission=None,
+            modified=timezone.now(),
+        )
 
-        # Remove permission from Participant
-        member.permission = None
-        member.save()
+        # Bulk updates do not fire signals
+        invalidate_tables(project.id)
 
     logger.debug('[HYPATIO][delete_team] Sending a notification to team members.')
 
@@ -776,7 +1081,7 @@ def delete_team(request):
 
     logger.debug('[HYPATIO][delete_team] Team ' + team_leader + ' for project ' + project_key + ' successfully deleted.')
 
-    return HttpResponse(200)
+    return JsonResponse({"failed": failures})
 
 @user_auth_and_jwt
 def download_team_submissions(request, project_key, team_leader_email):
@@ -1053,6 +1358,82 @@ def host_submission(request, fileservice_uuid):
 
         return HttpResponse("File updated.", status=200)
 
+@user_auth_and_jwt
+def import_hosted_files(request, project_key):
+    """
+    An HTTP POST endpoint that starts a bulk import of files into a project's
+    hosted files from either a bucket prefix or a list of Fileservice UUIDs.
+    Files are copied by a background task whose progress can be checked with
+    get_hosted_file_import.
+    """
+    # Check permissions in SciAuthZ.
+    user_jwt = request.COOKIES.get("DBMI_JWT", None)
+    sciauthz = SciAuthZ(user_jwt, request.user.email)
+    is_manager = sciauthz.user_has_manage_permission(project_key)
+
+    if not is_manager:
+        logger.debug("[import_hosted_files] - No Access for user " + request.user.email)
+        return HttpResponse("Error: permissions.", status=403)
+
+    if request.method != "POST":
+        return HttpResponse(status=405)
+
+    project = get_object_or_404(DataProject.objects.select_related("bucket"), project_key=project_key)
+
+    form = HostedFileImportForm(request.POST, project=project)
+    if not form.is_valid():
+        return HttpResponse(form.errors.as_json(), status=400)
+
+    # Get or create the set to add files to
+    hostedfileset = None
+    if form.cleaned_data["hostedfileset"]:
+        hostedfileset, _ = HostedFileSet.objects.get_or_create(project=project, title=form.cleaned_data["hostedfileset"])
+
+    hosted_file_import = HostedFileImport.objects.create(
+        data_project=project,
+        hostedfileset=hostedfileset,
+        requester=request.user,
+        file_location=form.cleaned_data["file_location"],
+    )
+
+    # Run the task
+    async_task(
+        'manage.tasks.import_hosted_files',
+        hosted_file_import.id,
+        source_prefix=form.cleaned_data["source_prefix"] or None,
+        file_uuids=form.cleaned_data["file_uuids"] or None,
+        enabled=form.cleaned_data["enabled"],
+    )
+
+    return JsonResponse({"id": hosted_file_import.id}, status=201)
+
+
+@user_auth_and_jwt
+def get_hosted_file_import(request, project_key, import_id):
+    """
+    An HTTP GET endpoint that returns the progress of a bulk import of hosted files.
+    """
+    # Check permissions in SciAuthZ.
+    user_jwt = request.COOKIES.get("DBMI_JWT", None)
+    sciauthz = SciAuthZ(user_jwt, request.user.email)
+    is_manager = sciauthz.user_has_manage_permission(project_key)
+
+    if not is_manager:
+        logger.debug("[get_hosted_file_import] - No Access for user " + request.user.email)
+        return HttpResponse("Error: permissions.", status=403)
+
+    hosted_file_import = get_object_or_404(HostedFileImport, id=import_id, data_project__project_key=project_key)
+
+    return JsonResponse({
+        "id": hosted_file_import.id,
+        "status": hosted_file_import.status,
+        "total": hosted_file_import.total_count,
+        "copied": hosted_file_import.copied_count,
+        "failed": hosted_file_import.failed_count,
+        "errors": hosted_file_import.errors,
+    })
+
+
 @user_auth_and_jwt
 def download_email_list(request):
     """
@@ -1386,6 +1767,78 @@ class DataProjectWorkflowStateViewSet(WorkflowStateViewSet):
         return queryset.filter(workflow__data_project_workflows__data_project__project_key=self.kwargs['data_project_key'])
 
 
+class StepStateQueuePagination(CursorPagination):
+    """
+    Keyset pagination for StepState queues, ordered oldest first.
+    """
+    ordering = ('created_at', 'id', )
+    page_size = 50
+    page_size_query_param = 'limit'
+    max_page_size = 250
+
+
+class DataProjectWorkflowQueueViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    An API view that returns the StepState objects for a DataProject's
+    workflows that are awaiting initialization or review by an administrator.
+    The queue is selected with the 'queue' query parameter and is either
+    'initialization' or 'review'.
+    """
+
+    permission_classes = [DataProjectManagerPermission]
+    serializer_class = DataProjectStepStateSerializer
+    pagination_class = StepStateQueuePagination
+
+    # The status and required relation for StepStates in each queue
+    queues = {
+        'initialization': (StepState.Status.Uninitialized.value, 'initialization_required', 'initialization'),
+        'review': (StepState.Status.Unreviewed.value, 'review_required', 'review'),
+    }
+
+    def get_workflow_ids(self):
+        """
+        Returns the IDs of the workflows for the DataProject.
+        """
+        return list(DataProjectWorkflow.objects.filter(
+            data_project__project_key=self.kwargs['data_project_key']
+        ).values_list('workflow_id', flat=True))
+
+    def get_queryset(self):
+        self.check_object_permissions(self.request, self.kwargs['data_project_key'])
+
+        # Determine the queue
+        queue = self.request.query_params.get('queue', 'review')
+        if queue not in self.queues:
+            raise ValidationError({'queue': f"Must be one of: {', '.join(self.queues)}"})
+        step_state_status, step_requirement, relation = self.queues[queue]
+
+        # Get steps that require action, so StepStates are found with the (status, step) index
+        step_ids = list(Step.objects.filter(
+            workflow_id__in=self.get_workflow_ids(),
+            **{step_requirement: True},
+        ).values_list('id', flat=True))
+
+        return StepState.objects.filter(
+            _status=step_state_status,
+            step_id__in=step_ids,
+            **{f'{relation}__isnull': True},
+        ).select_related('user', 'step')
+
+    @action(detail=False, methods=['get'])
+    def counts(self, request, data_project_key=None):
+        """
+        Returns the number of StepStates in each queue for the DataProject.
+        """
+        self.check_object_permissions(request, data_project_key)
+
+        # Fetch counts for all workflows
+        counts = StepStateQueueCount.get_counts(self.get_workflow_ids())
+
+        return Response({
+            queue: counts[step_state_status] for queue, (step_state_status, _, _) in self.queues.items()
+        }, status=status.HTTP_200_OK)
+
+
 class DataProjectFileViewSet(viewsets.ViewSet):
     """
     An API view that manages files for the DataProject.
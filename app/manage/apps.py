@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class ManageConfig(AppConfig):
     name = 'manage'
     default_auto_field = 'django.db.models.BigAutoField'
+
+    def ready(self):
+        """
+        Run any one-time only startup routines here
+        """
+        # Import signals
+        import manage.signals
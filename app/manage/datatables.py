@@ -0,0 +1,243 @@
+import hashlib
+import logging
+from functools import reduce
+from operator import or_
+
+from django.core.cache import cache
+from django.db.models import F
+from django.db.models import Q
+from django.http import JsonResponse
+
+from projects.models import DataProject
+
+logger = logging.getLogger(__name__)
+
+# The number of seconds cached counts and page cursors are kept for
+DATATABLES_CACHE_TIMEOUT = 300
+
+# The prefix used for annotating sort keys on the queryset
+SORT_KEY_PREFIX = "dt_key_"
+
+
+def get_table_version(project_id):
+    """
+    Returns the current version of the cached table data for a project.
+
+    :param project_id: The ID of the project
+    :type project_id: int
+    :return: The version
+    :rtype: int
+    """
+    key = f"datatables:{project_id}:version"
+    cache.add(key, 1, None)
+    return cache.get(key, 1)
+
+
+def invalidate_tables(project_id):
+    """
+    Invalidates cached counts and cursors for all of a project's tables.
+
+    :param project_id: The ID of the project
+    :type project_id: int
+    """
+    key = f"datatables:{project_id}:version"
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, None)
+
+
+def invalidate_agreement_form_tables(project):
+    """
+    Invalidates cached counts and cursors for the tables of every project that
+    a project's signed agreement forms count towards.
+
+    :param project: The project the forms were signed for
+    :type project: DataProject
+    """
+    invalidate_tables(project.id)
+
+    # Forms may count towards other projects that share agreement forms
+    if project.shares_agreement_forms:
+        for project_id in DataProject.objects.filter(shares_agreement_forms=True).values_list("id", flat=True):
+            invalidate_tables(project_id)
+
+
+class KeysetDataTable(object):
+    """
+    Serves server-side DataTables requests for a queryset using keyset
+    pagination. DataTables requests pages by offset, so the sort key of the
+    last row of each page is cached as the cursor for the page that follows it.
+    Paging through a table then seeks directly to the next page rather than
+    scanning past all preceding rows. Requests for pages without a cursor, such
+    as jumping directly to a page, fall back to an offset. Total and filtered
+    counts are cached until the project's tables are invalidated.
+    """
+
+    def __init__(self, request, name, project, queryset, orderings, search_field="user__email"):
+        """
+        :param request: The DataTables request
+        :type request: HttpRequest
+        :param name: The name of the table, used to scope cached data
+        :type name: str
+        :param project: The project the table belongs to
+        :type project: DataProject
+        :param queryset: The rows of the table
+        :type queryset: QuerySet
+        :param orderings: The ascending sort fields keyed by column index, the first is used by default
+        :type orderings: dict
+        :param search_field: The field to prefix search on, defaults to "user__email"
+        :type search_field: str, optional
+        """
+        self.name = name
+        self.project = project
+        self.queryset = queryset
+        self.search_field = search_field
+
+        # Get needed params
+        self.draw = int(request.GET['draw'])
+        self.start = int(request.GET['start'])
+        self.length = int(request.GET['length'])
+        self.search = request.GET.get('search[value]', '').strip()
+
+        # Check what we're sorting by and in what direction
+        order_column = int(request.GET.get('order[0][column]', -1))
+        self.descending = request.GET.get('order[0][dir]') == 'desc'
+        self.ordering = orderings.get(order_column, next(iter(orderings.values())))
+
+        # Set the cache scope for this table's current data
+        self.version = get_table_version(project.id)
+
+    def get_cache_key(self, *parts):
+        """
+        Returns a cache key scoped to this table and the current data version.
+        """
+        digest = hashlib.md5(":".join(str(p) for p in parts).encode()).hexdigest()
+        return f"datatables:{self.project.id}:{self.version}:{self.name}:{digest}"
+
+    def get_sort_keys(self):
+        """
+        Returns the sort keys as a list of (annotation, field, descending) with
+        the primary key appended to make the ordering total.
+        """
+        sort_keys = []
+        for index, field in enumerate(list(self.ordering) + ["pk"]):
+            descending = field.startswith("-") != self.descending
+            sort_keys.append((f"{SORT_KEY_PREFIX}{index}", field.lstrip("-"), descending))
+
+        return sort_keys
+
+    def get_filtered_queryset(self):
+        """
+        Returns the queryset with any search applied.
+        """
+        if self.search:
+            return self.queryset.filter(**{f"{self.search_field}__istartswith": self.search})
+
+        return self.queryset
+
+    def get_ordered_queryset(self, queryset):
+        """
+        Returns the queryset annotated with and ordered by its sort keys. Nulls
+        are explicitly ordered so seeks behave the same on any database.
+        """
+        sort_keys = self.get_sort_keys()
+        queryset = queryset.annotate(**{annotation: F(field) for annotation, field, _ in sort_keys})
+
+        return queryset.order_by(*[
+            F(annotation).desc(nulls_last=True) if descending else F(annotation).asc(nulls_first=True)
+            for annotation, _, descending in sort_keys
+        ])
+
+    @staticmethod
+    def get_seek_query(sort_keys, cursor):
+        """
+        Returns the filter for rows ordered after the cursor.
+
+        :param sort_keys: The sort keys as returned by get_sort_keys
+        :type sort_keys: list
+        :param cursor: The sort key values of the last row of the previous page
+        :type cursor: list
+        :return: The filter
+        :rtype: Q
+        """
+        queries = []
+        equal = Q()
+        for (annotation, _, descending), value in zip(sort_keys, cursor):
+
+            # Nulls sort first ascending and last descending
+            if value is None:
+                if not descending:
+                    queries.append(equal & Q(**{f"{annotation}__isnull": False}))
+                equal &= Q(**{f"{annotation}__isnull": True})
+
+            else:
+                if descending:
+                    queries.append(equal & (Q(**{f"{annotation}__lt": value}) | Q(**{f"{annotation}__isnull": True})))
+                else:
+                    queries.append(equal & Q(**{f"{annotation}__gt": value}))
+                equal &= Q(**{annotation: value})
+
+        return reduce(or_, queries) if queries else Q(pk__in=[])
+
+    def count(self, queryset, *parts):
+        """
+        Returns the count of the queryset, cached until the tables are invalidated.
+        """
+        key = self.get_cache_key("count", *parts)
+        count = cache.get(key)
+        if count is None:
+            count = queryset.count()
+            cache.set(key, count, DATATABLES_CACHE_TIMEOUT)
+
+        return count
+
+    def page(self):
+        """
+        Returns the rows of the requested page.
+
+        :return: The rows
+        :rtype: list
+        """
+        sort_keys = self.get_sort_keys()
+        queryset = self.get_ordered_queryset(self.get_filtered_queryset())
+
+        # Seek past the previous page if its cursor is known
+        cursor_key = self.get_cache_key("cursor", self.search, self.ordering, self.descending, self.start)
+        cursor = cache.get(cursor_key) if self.start else None
+        if cursor is not None:
+            rows = list(queryset.filter(self.get_seek_query(sort_keys, cursor))[:self.length])
+        else:
+            rows = list(queryset[self.start:self.start + self.length])
+
+        # Set the cursor for the following page
+        if rows:
+            cache.set(
+                self.get_cache_key("cursor", self.search, self.ordering, self.descending, self.start + len(rows)),
+                [getattr(rows[-1], annotation) for annotation, _, _ in sort_keys],
+                DATATABLES_CACHE_TIMEOUT
+            )
+
+        return rows
+
+    def response(self, data):
+        """
+        Returns the DataTables response for the passed rows.
+
+        :param data: The rendered rows of the page
+        :type data: list
+        :return: The response
+        :rtype: JsonResponse
+        """
+        records_total = self.count(self.queryset, "total")
+        records_filtered = self.count(self.get_filtered_queryset(), "filtered", self.search) \
+            if self.search else records_total
+
+        # Build DataTables response data
+        return JsonResponse(data={
+            'draw': self.draw,
+            'recordsTotal': records_total,
+            'recordsFiltered': records_filtered,
+            'data': data,
+            'error': None,
+        })
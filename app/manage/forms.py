@@ -1,3 +1,5 @@
+import uuid
+
 from django import forms
 from django.core.validators import RegexValidator
 from bootstrap_datepicker_plus.widgets import DateTimePickerInput
@@ -5,6 +7,8 @@ from dal import autocomplete
 
 from hypatio.forms import SanitizedCharField
 from projects.models import AgreementForm, DataProject
+from projects.models import Bucket
+from projects.models import ChallengeTaskSubmission
 from projects.models import HostedFile
 from projects.models import Team
 from projects.models import AGREEMENT_FORM_TYPE_FILE
@@ -58,6 +62,64 @@ class HostSubmissionForm(forms.ModelForm):
             'hostedfileset': autocomplete.ModelSelect2(url='projects:hostedfileset-autocomplete', forward=['project'], attrs={'class': 'form-control form-control-select2'})
         }
 
+class HostedFileImportForm(forms.Form):
+    """
+    Describes a bulk import of files into a project's hosted files from either
+    a bucket prefix or a list of Fileservice UUIDs.
+    """
+    source_prefix = SanitizedCharField(required=False, help_text="The URI of the prefix to import, e.g. s3://bucket/release/")
+    file_uuids = SanitizedCharField(required=False, widget=forms.Textarea, help_text="Fileservice UUIDs separated by whitespace or commas")
+    file_location = SanitizedCharField(max_length=100, validators=[file_path_validator])
+    hostedfileset = SanitizedCharField(required=False, max_length=100, help_text="The title of the file set to add the files to")
+    enabled = forms.BooleanField(required=False)
+
+    def __init__(self, *args, **kwargs):
+        self.project = kwargs.pop('project')
+        super(HostedFileImportForm, self).__init__(*args, **kwargs)
+
+    def clean_source_prefix(self):
+        source_prefix = self.cleaned_data.get("source_prefix")
+        if source_prefix:
+            try:
+                provider, bucket, _ = Bucket.split_uri(source_prefix)
+            except ValueError as e:
+                raise forms.ValidationError(str(e))
+
+            # Only files already in the project's own bucket may be imported
+            if provider != self.project.bucket.provider or bucket != self.project.bucket.name:
+                raise forms.ValidationError(f"Files may only be imported from the project's bucket: {self.project.bucket.uri}")
+
+        return source_prefix
+
+    def clean_file_uuids(self):
+        file_uuids = self.cleaned_data.get("file_uuids", "").replace(",", " ").split()
+        try:
+            file_uuids = [str(uuid.UUID(file_uuid)) for file_uuid in file_uuids]
+        except ValueError:
+            raise forms.ValidationError("Fileservice UUIDs must be valid UUIDs")
+
+        # Only files submitted to the project's challenge tasks may be imported
+        submitted = {
+            str(submission_uuid) for submission_uuid in ChallengeTaskSubmission.objects.filter(
+                uuid__in=file_uuids, challenge_task__data_project=self.project
+            ).values_list("uuid", flat=True)
+        }
+        missing = [file_uuid for file_uuid in file_uuids if file_uuid not in submitted]
+        if missing:
+            raise forms.ValidationError(f"Files are not submissions for this project: {', '.join(missing)}")
+
+        return file_uuids
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if not cleaned_data.get("source_prefix") and not cleaned_data.get("file_uuids"):
+            raise forms.ValidationError("Either a source prefix or Fileservice UUIDs are required")
+        if cleaned_data.get("source_prefix") and cleaned_data.get("file_uuids"):
+            raise forms.ValidationError("Only one of a source prefix or Fileservice UUIDs may be passed")
+
+        return cleaned_data
+
+
 class NotificationForm(forms.Form):
     """
     Determines the fields that will appear.
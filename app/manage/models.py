@@ -4,6 +4,7 @@ from django.contrib.auth.models import User
 from projects.models import DataProject
 from projects.models import ChallengeTask
 from projects.models import ChallengeTaskSubmission
+from projects.models import HostedFileSet
 
 
 class ChallengeTaskSubmissionExport(models.Model):
@@ -21,3 +22,32 @@ class ChallengeTaskSubmissionExport(models.Model):
 
     def __str__(self):
         return '%s' % (self.uuid)
+
+
+class HostedFileImport(models.Model):
+    """
+    Tracks the progress of a bulk import of files into a project's hosted files.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        RUNNING = 'running', 'Running'
+        COMPLETED = 'completed', 'Completed'
+        FAILED = 'failed', 'Failed'
+
+    data_project = models.ForeignKey(DataProject, on_delete=models.CASCADE)
+    hostedfileset = models.ForeignKey(HostedFileSet, blank=True, null=True, on_delete=models.SET_NULL)
+    requester = models.ForeignKey(User, on_delete=models.PROTECT)
+    file_location = models.CharField(max_length=100)
+    status = models.CharField(max_length=12, choices=Status.choices, default=Status.PENDING)
+    total_count = models.PositiveIntegerField(default=0)
+    copied_count = models.PositiveIntegerField(default=0)
+    failed_count = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=dict, blank=True)
+
+    # Meta
+    created = models.DateTimeField(auto_now_add=True)
+    modified = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return '%s - %s (%s)' % (self.data_project, self.file_location, self.status)
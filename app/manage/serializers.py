@@ -7,6 +7,7 @@ from projects.models import DataProjectWorkflow
 from workflows.serializers import WorkflowStateSerializer
 
 from workflows.serializers import WorkflowSerializer
+from workflows.serializers import StepSerializer
 from workflows.models import Workflow
 from workflows.models import WorkflowDependency
 from workflows.models import Step
@@ -39,4 +40,14 @@ class DataProjectWorkflowStateSerializer(serializers.ModelSerializer):
     class Meta:
         model = WorkflowState
         fields = '__all__'
-        read_only_fields = ['created_at', 'modified_at', ]
\ No newline at end of file
+        read_only_fields = ['created_at', 'modified_at', ]
+
+class DataProjectStepStateSerializer(serializers.ModelSerializer):
+    user = UserSerializer(read_only=True)
+    step = StepSerializer(read_only=True)
+    status = serializers.CharField(read_only=True)
+
+    class Meta:
+        model = StepState
+        fields = ['id', 'status', 'started_at', 'completed_at', 'user', 'step', 'workflow_state', 'created_at', 'modified_at', ]
+        read_only_fields = ['created_at', 'modified_at', ]
@@ -0,0 +1,34 @@
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from manage.datatables import invalidate_agreement_form_tables
+from manage.datatables import invalidate_tables
+from projects.models import Participant
+from projects.models import SignedAgreementForm
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=Participant)
+@receiver(post_delete, sender=Participant)
+def participant_tables_handler(sender, **kwargs):
+    """
+    This hook listens for Participant changes and invalidates the cached
+    counts and cursors of the project's participant tables.
+    """
+    instance = kwargs.get("instance")
+    invalidate_tables(instance.project_id)
+
+
+@receiver(post_save, sender=SignedAgreementForm)
+@receiver(post_delete, sender=SignedAgreementForm)
+def signed_agreement_form_tables_handler(sender, **kwargs):
+    """
+    This hook listens for SignedAgreementForm changes and invalidates the cached
+    counts and cursors of the participant tables of every project the form
+    counts towards.
+    """
+    instance = kwargs.get("instance")
+    invalidate_agreement_form_tables(instance.project)
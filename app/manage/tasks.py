@@ -4,15 +4,26 @@ import shutil
 import json
 import requests
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
 from datetime import datetime
 from django_q.tasks import Chain, async_task
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.db.models import F
 
 from projects.models import DataProject
 from projects.models import ChallengeTaskSubmission
 from projects.models import ChallengeTaskSubmissionDownload
+from projects.models import HostedFile
+from projects.availability import invalidate_availability
 from manage.models import ChallengeTaskSubmissionExport
+from manage.models import HostedFileImport
+from hypatio.file_services import copy_object
+from hypatio.file_services import get_file_uri
+from hypatio.file_services import get_s3_client
+from hypatio.file_services import HOST_FILE_MAX_CONCURRENCY
+from hypatio.file_services import list_objects
 from dbmi_client import fileservice
 from manage.api import zip_submission_file
 from contact.views import email_send
@@ -20,6 +31,12 @@ from contact.views import email_send
 import logging
 logger = logging.getLogger(__name__)
 
+# The number of files copied concurrently by a bulk import
+HOSTED_FILE_IMPORT_MAX_WORKERS = 4
+
+# The maximum length of a hosted file's name
+HOSTED_FILE_NAME_MAX_LENGTH = 100
+
 
 def export_task_submissions(project_id, requester):
     """
@@ -204,3 +221,114 @@ def export_task_submissions(project_id, requester):
             }
         )
         raise e
+
+
+def import_hosted_files(hosted_file_import_id, source_prefix=None, file_uuids=None, enabled=False):
+    """
+    Copies every object under the prefix, or every Fileservice file, into the
+    project's bucket concurrently and creates a HostedFile for each file that
+    was copied. Progress is recorded on the HostedFileImport as each copy
+    completes.
+
+    :param hosted_file_import_id: The ID of the HostedFileImport to run
+    :type hosted_file_import_id: int
+    :param source_prefix: The URI of the prefix to import, defaults to None
+    :type source_prefix: str, optional
+    :param file_uuids: The UUIDs of the Fileservice files to import, defaults to None
+    :type file_uuids: list, optional
+    :param enabled: Whether the created files should be enabled, defaults to False
+    :type enabled: bool, optional
+    :return: Whether the operation succeeded or not
+    :rtype: bool
+    """
+    hosted_file_import = HostedFileImport.objects.select_related("data_project__bucket").get(id=hosted_file_import_id)
+    imports = HostedFileImport.objects.filter(id=hosted_file_import_id)
+    project = hosted_file_import.data_project
+    imports.update(status=HostedFileImport.Status.RUNNING)
+
+    errors = {}
+    try:
+        # Collect the name and URI of each file to copy
+        sources = {}
+        if source_prefix:
+            for source_uri, _ in list_objects(source_prefix):
+                file_name = source_uri.rsplit("/", 1)[-1]
+                if file_name in sources:
+                    errors[source_uri] = f"Duplicate file name '{file_name}'"
+                else:
+                    sources[file_name] = source_uri
+
+        for file_uuid in file_uuids or []:
+            file = get_file_uri(file_uuid)
+            if not file:
+                errors[file_uuid] = "File not found in Fileservice"
+            elif file[0] in sources:
+                errors[file_uuid] = f"Duplicate file name '{file[0]}'"
+            else:
+                sources[file[0]] = file[1]
+
+        # Skip files that are already hosted at this location
+        existing = set(HostedFile.objects.filter(
+            project=project, file_location=hosted_file_import.file_location, file_name__in=sources.keys()
+        ).values_list("file_name", flat=True))
+        for file_name in list(sources):
+            if file_name in existing or len(file_name) > HOSTED_FILE_NAME_MAX_LENGTH or " " in file_name:
+                errors[sources.pop(file_name)] = f"File '{file_name}' already exists or has an invalid name"
+
+        imports.update(total_count=len(sources), failed_count=len(errors), errors=errors)
+
+        # Copy files concurrently with a shared client, recording progress as each completes. Each
+        # copy may use several connections for multipart copies so size the pool for all of them.
+        copied = []
+        client = get_s3_client(max_pool_connections=HOSTED_FILE_IMPORT_MAX_WORKERS * HOST_FILE_MAX_CONCURRENCY)
+        with ThreadPoolExecutor(max_workers=HOSTED_FILE_IMPORT_MAX_WORKERS) as executor:
+            futures = {
+                executor.submit(
+                    copy_object,
+                    source_uri,
+                    f"{project.bucket.uri}/{hosted_file_import.file_location}/{file_name}",
+                    client,
+                ): file_name
+                for file_name, source_uri in sources.items()
+            }
+            for future in as_completed(futures):
+                file_name = futures[future]
+                try:
+                    future.result()
+                    copied.append(file_name)
+                    imports.update(copied_count=F("copied_count") + 1)
+
+                except Exception as e:
+                    logger.exception(f"Hosted file import copy error: {e}", exc_info=True, extra={
+                        "project": project.project_key, "file_name": file_name,
+                    })
+                    errors[sources[file_name]] = str(e)
+                    imports.update(failed_count=F("failed_count") + 1, errors=errors)
+
+        # Create all hosted files at once
+        HostedFile.objects.bulk_create([
+            HostedFile(
+                project=project,
+                hostedfileset_id=hosted_file_import.hostedfileset_id,
+                long_name=file_name,
+                file_name=file_name,
+                file_location=hosted_file_import.file_location,
+                enabled=enabled,
+                bucket=project.bucket,
+            ) for file_name in sorted(copied)
+        ])
+
+        # Bulk inserts do not fire signals
+        invalidate_availability(project.id)
+
+        imports.update(status=HostedFileImport.Status.COMPLETED, errors=errors)
+        return True
+
+    except Exception as e:
+        logger.exception(f"Hosted file import error: {e}", exc_info=True, extra={
+            "project": project.project_key, "hosted_file_import_id": hosted_file_import_id,
+        })
+        errors["error"] = str(e)
+        imports.update(status=HostedFileImport.Status.FAILED, errors=errors)
+
+        return False
@@ -0,0 +1,91 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import RequestFactory
+from django.test import TestCase
+
+from manage.datatables import KeysetDataTable
+from manage.datatables import invalidate_tables
+from projects.models import DataProject
+from projects.models import Participant
+
+
+class KeysetDataTableTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.project = DataProject.objects.create(project_key="keyset-project", name="Keyset Project")
+
+        # Several participants share each permission to exercise tie-breaking
+        for index, permission in enumerate(["VIEW", None, "VIEW", "ADMIN", None, "VIEW", "ADMIN"]):
+            self.add_participant(f"user{index}@example.com", permission)
+
+    def add_participant(self, email, permission=None):
+        user = User.objects.create(username=email, email=email)
+        return Participant.objects.create(user=user, project=self.project, permission=permission)
+
+    def table(self, start, length=2, column=1, direction="asc", search=""):
+        request = RequestFactory().get("/", {
+            "draw": 1,
+            "start": start,
+            "length": length,
+            "search[value]": search,
+            "order[0][column]": column,
+            "order[0][dir]": direction,
+        })
+        return KeysetDataTable(
+            request,
+            "participants",
+            self.project,
+            Participant.objects.filter(project=self.project).select_related("user"),
+            orderings={
+                0: ["user__email"],
+                1: ["permission"],
+            },
+        )
+
+    def expected(self, direction="asc"):
+        # Nulls first ascending and last descending, ties broken by primary key
+        participants = sorted(Participant.objects.filter(project=self.project), key=lambda p: (
+            p.permission is not None, p.permission or "", p.pk
+        ))
+        return [p.pk for p in (reversed(participants) if direction == "desc" else participants)]
+
+    def paged(self, direction="asc", length=2):
+        pks = []
+        while True:
+            rows = self.table(len(pks), length=length, direction=direction).page()
+            if not rows:
+                return pks
+            pks.extend(row.pk for row in rows)
+
+    def test_ties_broken_by_pk(self):
+        self.assertEqual(self.paged(), self.expected())
+
+    def test_reverse_ordering(self):
+        self.assertEqual(self.paged(direction="desc"), self.expected(direction="desc"))
+
+    def test_pages_seek_from_cursor(self):
+        self.table(0).page()
+
+        # The first page sets the cursor that the second seeks from
+        table = self.table(2)
+        cursor_key = table.get_cache_key("cursor", table.search, table.ordering, table.descending, 2)
+        self.assertIsNotNone(cache.get(cursor_key))
+        self.assertEqual([row.pk for row in table.page()], self.expected()[2:4])
+
+    def test_cursors_invalidated(self):
+        self.table(0).page()
+
+        # A participant sorting first shifts every page once the tables are invalidated
+        self.add_participant("first@example.com")
+        invalidate_tables(self.project.id)
+
+        self.assertEqual([row.pk for row in self.table(2).page()], self.expected()[2:4])
+
+    def test_page_jump_falls_back_to_offset(self):
+        self.assertEqual([row.pk for row in self.table(4).page()], self.expected()[4:6])
+
+    def test_search(self):
+        self.add_participant("other@example.com", "VIEW")
+        table = self.table(0, length=10, column=0, search="OTHER")
+        self.assertEqual([row.user.email for row in table.page()], ["other@example.com"])
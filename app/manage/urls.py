@@ -20,6 +20,7 @@ from manage.api import get_hosted_file_edit_form
 from manage.api import process_hosted_file_edit_form_submission
 from manage.api import download_signed_form
 from manage.api import change_signed_form_status
+from manage.api import change_signed_form_statuses
 from manage.api import get_signed_form_status
 from manage.api import save_team_comment
 from manage.api import set_team_status
@@ -28,19 +29,25 @@ from manage.api import download_submission
 from manage.api import host_submission
 from manage.api import download_team_submissions
 from manage.api import download_email_list
+from manage.api import import_hosted_files
+from manage.api import get_hosted_file_import
 from manage.api import get_hosted_file_logs
+from manage.api import get_hosted_file_downloads
+from manage.api import download_hosted_file_logs
 from manage.api import grant_view_permission
 from manage.api import remove_view_permission
 from manage.api import sync_view_permissions
 from manage.api import export_submissions
 from manage.api import download_submissions_export
 from manage.api import DataProjectWorkflowStateViewSet
+from manage.api import DataProjectWorkflowQueueViewSet
 from manage.api import DataProjectFileViewSet
 
 app_name = ManageConfig.name
 
 router = routers.SimpleRouter()
 router.register(r'(?P<data_project_key>[^/]+)/workflow-state', DataProjectWorkflowStateViewSet, basename='dataproject-workflow-state')
+router.register(r'(?P<data_project_key>[^/]+)/workflow-queue', DataProjectWorkflowQueueViewSet, basename='dataproject-workflow-queue')
 router.register(r'(?P<data_project_key>[^/]+)/file', DataProjectFileViewSet, basename='dataproject-file')
 
 urlpatterns = [
@@ -52,10 +59,13 @@ urlpatterns = [
     re_path(r'^get-static-agreement-form-html/$', get_static_agreement_form_html, name='get-static-agreement-form-html'),
     re_path(r'^get-hosted-file-edit-form/$', get_hosted_file_edit_form, name='get-hosted-file-edit-form'),
     re_path(r'^get-hosted-file-logs/$', get_hosted_file_logs, name='get-hosted-file-logs'),
+    re_path(r'^get-hosted-file-downloads/$', get_hosted_file_downloads, name='get-hosted-file-downloads'),
+    re_path(r'^download-hosted-file-logs/$', download_hosted_file_logs, name='download-hosted-file-logs'),
     re_path(r'^process-hosted-file-edit-form-submission/$', process_hosted_file_edit_form_submission, name='process-hosted-file-edit-form-submission'),
     re_path(r'^download-signed-form/$', download_signed_form, name='download-signed-form'),
     re_path(r'^get-signed-form-status/$', get_signed_form_status, name='get-signed-form-status'),
     re_path(r'^change-signed-form-status/$', change_signed_form_status, name='change-signed-form-status'),
+    re_path(r'^change-signed-form-statuses/$', change_signed_form_statuses, name='change-signed-form-statuses'),
     re_path(r'^save-team-comment/$', save_team_comment, name='save-team-comment'),
     re_path(r'^set-team-status/$', set_team_status, name='set-team-status'),
     re_path(r'^delete-team/$', delete_team, name='delete-team'),
@@ -65,6 +75,8 @@ urlpatterns = [
     re_path(r'^export-submissions/(?P<project_key>[^/]+)/$', export_submissions, name='export-submissions'),
     re_path(r'^download-submissions-export/(?P<project_key>[^/]+)/(?P<fileservice_uuid>[^/]+)/$', download_submissions_export, name='download-submissions-export'),
     re_path(r'^host-submission/(?P<fileservice_uuid>[^/]+)/$', host_submission, name='host-submission'),
+    re_path(r'^import-hosted-files/(?P<project_key>[^/]+)/$', import_hosted_files, name='import-hosted-files'),
+    re_path(r'^get-hosted-file-import/(?P<project_key>[^/]+)/(?P<import_id>[0-9]+)/$', get_hosted_file_import, name='get-hosted-file-import'),
     re_path(r'^sync-view-permissions/(?P<project_key>[^/]+)/$', sync_view_permissions, name='sync-view-permissions'),
     re_path(r'^grant-view-permission/(?P<project_key>[^/]+)/(?P<user_email>[^/]+)/$', grant_view_permission, name='grant-view-permission'),
     re_path(r'^remove-view-permission/(?P<project_key>[^/]+)/(?P<user_email>[^/]+)/$', remove_view_permission, name='remove-view-permission'),
@@ -3,18 +3,17 @@ from datetime import datetime
 from hypatio.auth0authenticate import user_auth_and_jwt
 
 from django.conf import settings
-from django.contrib.auth.models import User
 from django.core.exceptions import ObjectDoesNotExist
-from django.db.models import Count
+from django.db.models import Exists
 from django.db.models import F
+from django.db.models import OuterRef
 from django.db.models import Q
-from django.http import HttpResponse, JsonResponse, HttpResponseRedirect
+from django.http import HttpResponse, HttpResponseRedirect
 from django.contrib import messages
 from django.shortcuts import render
 from django.utils.decorators import method_decorator
 from django.views.generic import TemplateView
 from django.views.generic.base import View
-from django.core.paginator import Paginator
 from django.urls import reverse
 from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
@@ -22,8 +21,9 @@ from dbmi_client import fileservice
 from django.shortcuts import get_object_or_404
 
 from hypatio.sciauthz_services import SciAuthZ
-from hypatio.scireg_services import get_user_profile, get_distinct_countries_participating
+from hypatio.scireg_services import get_user_profiles, get_distinct_countries_participating
 
+from manage.datatables import KeysetDataTable
 from manage.forms import NotificationForm
 from manage.models import ChallengeTaskSubmissionExport
 from manage.forms import UploadSignedAgreementFormForm
@@ -31,12 +31,18 @@ from manage.forms import UploadSignedAgreementFormFileForm
 from projects.models import AgreementForm, ChallengeTaskSubmission, DataProjectWorkflow
 from projects.models import DataProject
 from projects.models import Participant
+from projects.models import DataUseReportRequest
 from projects.models import Team
 from projects.models import TeamComment
 from projects.models import SignedAgreementForm
 from projects.models import HostedFile
 from projects.models import HostedFileDownload
+from projects.models import ParticipantActivity
 from projects.models import SIGNED_FORM_APPROVED
+from projects.compliance import get_agreement_form_compliance
+from projects.compliance import get_agreement_form_compliant_users
+from projects.compliance import signed_agreement_form_project_query
+from projects.snapshots import get_project
 from workflows.models import WorkflowState
 
 # Get an instance of a logger
@@ -101,7 +107,7 @@ class DataProjectManageView(TemplateView):
         project_key = self.kwargs['project_key']
 
         try:
-            self.project = DataProject.objects.get(project_key=project_key)
+            self.project = get_project(project_key)
         except ObjectDoesNotExist:
             error_message = "The project you searched for does not exist."
             return render(request, '404.html', {'error_message': error_message})
@@ -136,28 +142,23 @@ class DataProjectManageView(TemplateView):
         # Collect all user information from SciReg.
         # TODO ...
 
-        # Get counts of downloads by isolating which files this project has, grouping by user email, and counting on those emails.
-        user_download_counts = HostedFileDownload.objects\
-            .filter(hosted_file__project=self.project)\
-            .values('user__email')\
-            .annotate(user_downloads=Count('user__email'))
-
-        # Convert the download count queryset into a simple dictionary for quicker access later.
-        user_download_counts_dict = {}
-        for user in user_download_counts:
-            user_download_counts_dict[user['user__email']] = user['user_downloads']
-
-        # Get how many challengetasks a user has submitted for this project.
-        user_upload_counts = ChallengeTaskSubmission.objects\
-            .filter(challenge_task__data_project=self.project)\
-            .values('participant__user__email')\
-            .annotate(user_uploads=Count('participant__user__email'))
+        # Get download and upload counts for each user from their activity for this project.
+        user_activity = ParticipantActivity.get_activity(self.project)
 
         # If there are teams, calculate downloads and uploads by team members.
         if self.project.has_teams:
 
+            # If this is a project that is using shared teams, determine agreement form compliance for members
+            # This is required since shared teams don't implicitly have all forms completed.
+            compliance = None
+            if self.project.hide_incomplete_teams and self.project.teams_source:
+                compliance = get_agreement_form_compliance(
+                    self.project,
+                    Participant.objects.filter(team__data_project=self.project).values_list('user_id', flat=True),
+                )
+
             teams = []
-            for team in self.project.team_set.all():
+            for team in self.project.team_set.select_related('team_leader').prefetch_related('participant_set__user'):
 
                 # Allow hiding of teams
                 team_hidden = False
@@ -166,35 +167,24 @@ class DataProjectManageView(TemplateView):
                 team_uploads = 0
 
                 for participant in team.participant_set.all():
-                    try:
-                        team_downloads += user_download_counts_dict[participant.user.email]
-                    except KeyError:
-                        team_downloads += 0
-
-                    try:
-                        team_uploads += user_upload_counts.get(participant__user__email=participant.user.email)['user_uploads']
-                    except ObjectDoesNotExist:
-                        team_uploads += 0
+                    activity = user_activity.get(participant.user_id)
+                    if activity is not None:
+                        team_downloads += activity.download_count
+                        team_uploads += activity.submission_count
 
                     # If this is a project that is using shared teams, determine if this team should be hidden or not
-                    # This is required since shared teams don't implicitly have all forms completed.
-                    if self.project.hide_incomplete_teams and self.project.teams_source and not team_hidden:
-
-                        # Get all related signed agreement forms
-                        signed_agreement_forms = SignedAgreementForm.objects.filter(
-                            Q(user=participant.user, agreement_form__in=self.project.agreement_forms.all()) &
-                            (Q(project=self.project) | Q(project__shares_agreement_forms=True))
-                        )
-
-                        # Compare number of agreement forms
-                        if len(signed_agreement_forms) < len(self.project.agreement_forms.all()):
-                            logger.debug(f"{self.project.project_key}/{team.id}/{participant.user.email}: {len(signed_agreement_forms)} SignedAgreementForms: HIDDEN")
+                    if compliance is not None and not team_hidden:
+
+                        # Hide the team if any member is missing an agreement form
+                        missing_agreement_forms = compliance[participant.user_id].missing
+                        if missing_agreement_forms:
+                            logger.debug(f"{self.project.project_key}/{team.id}/{participant.user.email}: {len(missing_agreement_forms)} missing SignedAgreementForms: HIDDEN")
                             team_hidden = True
 
                 if not team_hidden:
                     teams.append({
                         'team_leader': team.team_leader.email,
-                        'member_count': team.participant_set.all().count(),
+                        'member_count': len(team.participant_set.all()),
                         'status': team.status,
                         'downloads': team_downloads,
                         'submissions': team_uploads,
@@ -274,108 +264,51 @@ class ProjectParticipants(View):
 
         # Pull the project
         try:
-            project = DataProject.objects.get(project_key=project_key)
-        except DataProject.NotFound:
+            project = get_project(project_key)
+        except DataProject.DoesNotExist:
             logger.exception('DataProject for key "{}" not found'.format(project_key))
             return HttpResponse(status=404)
 
-        # Get needed params
-        draw = int(request.GET['draw'])
-        start = int(request.GET['start'])
-        length = int(request.GET['length'])
-        order_column = int(request.GET['order[0][column]'])
-        order_direction = request.GET['order[0][dir]']
-
-        # Check for a search value
-        search = request.GET['search[value]']
-
-        # Get counts of downloads by isolating which files this project has, grouping by user email, and counting on those emails.
-        user_download_counts = HostedFileDownload.objects \
-            .filter(hosted_file__project=project) \
-            .values('user__email') \
-            .annotate(user_downloads=Count('user__email'))
-
-        # Convert the download count queryset into a simple dictionary for quicker access later.
-        user_download_counts_dict = {}
-        for user in user_download_counts:
-            user_download_counts_dict[user['user__email']] = user['user_downloads']
-
-        # Get how many challengetasks a user has submitted for this project.
-        user_upload_counts = ChallengeTaskSubmission.objects \
-            .filter(challenge_task__data_project=project) \
-            .values('participant__user__email') \
-            .annotate(user_uploads=Count('participant__user__email'))
-
-        # Check what we're sorting by and in what direction
-        if order_column == 0:
-            sort_order = ['user__email'] if order_direction == 'asc' else ['-user__email']
-        elif order_column == 3 and not project.has_teams or order_column == 4 and project.has_teams:
-            sort_order = ['permission', 'user__email'] if order_direction == 'asc' else ['-permission', '-user__email']
-        elif order_column == 6 and not project.has_teams or order_column == 7 and project.has_teams:
-            sort_order = ['modified', 'user__email'] if order_direction == 'asc' else ['-modified', '-user__email']
-        else:
-            sort_order = ['user__email'] if order_direction == 'asc' else ['-user__email']
+        # Set the sortable columns, accounting for the team column
+        offset = 1 if project.has_teams else 0
+        table = KeysetDataTable(
+            request,
+            "participants",
+            project,
+            project.participant_set.select_related("user", "team__team_leader"),
+            orderings={
+                0: ['user__email'],
+                3 + offset: ['permission', 'user__email'],
+                6 + offset: ['modified', 'user__email'],
+            },
+        )
+        participant_page = table.page()
+        page_user_ids = [participant.user_id for participant in participant_page]
 
-        # Get the entire list of current Project Participants
-        query_set = project.participant_set.order_by(*sort_order)
+        # Get download and upload counts for the users on this page from their activity for this project.
+        user_activity = ParticipantActivity.get_activity(project, page_user_ids)
 
-        # Setup paginator
-        paginator = Paginator(
-            query_set.filter(user__email__icontains=search) if search else query_set,
-            length
-        )
+        # Get all agreement forms
+        agreement_forms = list(project.agreement_forms.all())
+        required_agreement_forms = len(agreement_forms)
+        if project.data_use_report_agreement_form:
+            agreement_forms.append(project.data_use_report_agreement_form)
 
-        # Determine page index (1-index) from DT parameters
-        page = start / length + 1
-        participant_page = paginator.page(page)
+        # Fetch signed agreement forms for all participants on this page at once
+        compliance = get_agreement_form_compliance(
+            project, page_user_ids, agreement_forms
+        )
 
         participants = []
         for participant in participant_page:
 
-            try:
-                download_count = user_download_counts_dict[participant.user.email]
-            except KeyError:
-                download_count = 0
-
-            try:
-                upload_count = user_upload_counts.get(participant__user__email=participant.user.email)['user_uploads']
-            except ObjectDoesNotExist:
-                upload_count = 0
-
-            signed_agreement_forms = []
-            signed_accepted_agreement_forms = 0
-
-            # Get all agreement forms
-            agreement_forms = list(project.agreement_forms.all())
-            if project.data_use_report_agreement_form:
-                agreement_forms.append(project.data_use_report_agreement_form)
+            activity = user_activity.get(participant.user_id)
+            download_count = activity.download_count if activity else 0
+            upload_count = activity.submission_count if activity else 0
 
             # For each of the available agreement forms for this project, display only latest version completed by the user
-            for agreement_form in agreement_forms:
-
-                # Check if this project uses shared agreement forms
-                if project.shares_agreement_forms:
-
-                    # Fetch without a specific project
-                    signed_form = SignedAgreementForm.objects.filter(
-                        user__email=participant.user.email,
-                        agreement_form=agreement_form,
-                    ).last()
-
-                else:
-
-                    # Fetch only for this project
-                    signed_form = SignedAgreementForm.objects.filter(
-                        user__email=participant.user.email,
-                        project=project,
-                        agreement_form=agreement_form
-                    ).last()
-
-                if signed_form is not None:
-                    signed_agreement_forms.append(signed_form)
-
-                    if signed_form.status == 'A':
-                        signed_accepted_agreement_forms += 1
+            signed_agreement_forms = compliance[participant.user_id].latest_signed_forms()
+            signed_accepted_agreement_forms = len([f for f in signed_agreement_forms if f.status == 'A'])
 
             # Build the row of the table for this participant
             participant_row = [
@@ -394,7 +327,7 @@ class ProjectParticipants(View):
                     'email': participant.user.email.lower(),
                     'signed': signed_accepted_agreement_forms,
                     'team': True if project.has_teams else False,
-                    'required': project.agreement_forms.count()
+                    'required': required_agreement_forms
                 },
                 download_count,
                 upload_count,
@@ -407,16 +340,7 @@ class ProjectParticipants(View):
 
             participants.append(participant_row)
 
-        # Build DataTables response data
-        data = {
-            'draw': draw,
-            'recordsTotal': query_set.count(),
-            'recordsFiltered': paginator.count,
-            'data': participants,
-            'error': None,
-        }
-
-        return JsonResponse(data=data)
+        return table.response(participants)
 
 
 @method_decorator(user_auth_and_jwt, name='dispatch')
@@ -426,122 +350,64 @@ class ProjectPendingParticipants(View):
 
         # Pull the project
         try:
-            project = DataProject.objects.get(project_key=project_key)
-        except DataProject.NotFound:
+            project = get_project(project_key)
+        except DataProject.DoesNotExist:
             logger.exception('DataProject for key "{}" not found'.format(project_key))
             return HttpResponse(status=404)
 
-        # Get needed params
-        draw = int(request.GET['draw'])
-        start = int(request.GET['start'])
-        length = int(request.GET['length'])
-        order_column = int(request.GET['order[0][column]'])
-        order_direction = request.GET['order[0][dir]']
-
-        # Check for a search value
-        search = request.GET['search[value]']
-
-        # Check what we're sorting by and in what direction
-        if order_column == 0:
-            sort_order = ['email'] if order_direction == 'asc' else ['-email']
-        elif order_column == 3 and not project.has_teams or order_column == 4 and project.has_teams:
-            sort_order = ['modified', '-email'] if order_direction == 'asc' else ['-modified', 'email']
-        else:
-            sort_order = ['modified', '-email'] if order_direction == 'asc' else ['-modified', 'email']
-
         # Build the query
 
         # Find users with all agreement forms approved, but waiting final grant of access
-        participants_waiting_access = Participant.objects.filter(Q(project=project, permission__isnull=True))
-        for agreement_form in project.agreement_forms.all():
-
-            # Filter by the presence of this agreement form in either a pending or accepted state
-            agreement_form_query = Q(
-                user__signedagreementform__agreement_form=agreement_form,
-                user__signedagreementform__status="A",
-            )
-
-            # Ensure the agreement form is for this project or a project that shares agreement forms
-            agreement_form_query &= (
-                Q(user__signedagreementform__project=project) |
-                Q(user__signedagreementform__project__shares_agreement_forms=True)
-            )
-
-            # Filter
-            participants_waiting_access = participants_waiting_access.filter(agreement_form_query)
+        pending_participants = Participant.objects.filter(project=project, permission__isnull=True).annotate(
+            has_data_use_report_request=Exists(DataUseReportRequest.objects.filter(participant=OuterRef('pk'))),
+            has_pending_forms=Exists(SignedAgreementForm.objects.filter(
+                signed_agreement_form_project_query(project),
+                user=OuterRef('user'),
+                agreement_form__in=project.agreement_forms.all(),
+                status="P",
+            )),
+        )
+        waiting_access_query = Q(user__in=get_agreement_form_compliant_users(project))
 
         # Do not include users whose access was removed due to data use reporting requirements
         if project.data_use_report_agreement_form:
 
             # Ensure there exists no data use reporting request for this user
-            data_use_report_query = Q(datausereportrequest__isnull=True)
-            participants_waiting_access = participants_waiting_access.filter(data_use_report_query)
+            waiting_access_query &= Q(has_data_use_report_request=False)
 
         # Secondly, we want Participants with at least one pending SignedAgreementForm
-        participants_awaiting_approval = Participant.objects.filter(Q(project=project, permission__isnull=True)).filter(
-            Q(
-                user__signedagreementform__agreement_form__in=project.agreement_forms.all(),
-                user__signedagreementform__status="P",
-            ) & (
-                Q(user__signedagreementform__project=project) |
-                Q(user__signedagreementform__project__shares_agreement_forms=True)
-            )
+        awaiting_approval_query = Q(has_pending_forms=True)
+
+        # Set the sortable columns, accounting for the team column
+        offset = 1 if project.has_teams else 0
+        table = KeysetDataTable(
+            request,
+            "pending-participants",
+            project,
+            pending_participants.filter(
+                waiting_access_query | awaiting_approval_query
+            ).select_related("user", "team__team_leader"),
+            orderings={
+                3 + offset: ['modified', '-user__email'],
+                0: ['user__email'],
+            },
         )
+        participant_page = table.page()
 
-        # Add search if necessary
-        if search:
-            participants_waiting_access = participants_waiting_access.filter(user__email__icontains=search)
-            participants_awaiting_approval = participants_awaiting_approval.filter(user__email__icontains=search)
-
-        # We only want distinct Participants belonging to the users query
-        # Django won't sort on a related field after this union so we annotate each queryset with the user's email to sort on
-        query_set = participants_waiting_access.annotate(email=F("user__email")) \
-            .union(participants_awaiting_approval.annotate(email=F("user__email"))) \
-            .order_by(*sort_order)
-
-        # Setup paginator
-        paginator = Paginator(
-            query_set,
-            length,
+        # Fetch signed agreement forms for all participants on this page at once
+        agreement_forms = list(project.agreement_forms.all())
+        compliance = get_agreement_form_compliance(
+            project, [participant.user_id for participant in participant_page], agreement_forms
         )
 
-        # Determine page index (1-index) from DT parameters
-        page = start / length + 1
-        participant_page = paginator.page(page)
-
         participants = []
         for participant in participant_page:
 
-            signed_agreement_forms = []
-            signed_accepted_agreement_forms = 0
-
             # For each of the available agreement forms for this project, display only latest version completed by the user
-            for agreement_form in project.agreement_forms.all():
-
-                # Check if this project uses shared agreement forms
-                if project.shares_agreement_forms:
+            signed_agreement_forms = compliance[participant.user_id].latest_signed_forms()
 
-                    # Fetch without a specific project
-                    signed_form = SignedAgreementForm.objects.filter(
-                        user__email=participant.user.email,
-                        agreement_form=agreement_form,
-                    ).last()
-
-                else:
-
-                    # Fetch only for this project
-                    signed_form = SignedAgreementForm.objects.filter(
-                        user__email=participant.user.email,
-                        project=project,
-                        agreement_form=agreement_form
-                    ).last()
-
-                if signed_form is not None:
-                    signed_agreement_forms.append(signed_form)
-
-                    # Collect how many forms are approved to craft language for status
-                    if signed_form.status == 'A':
-                        signed_accepted_agreement_forms += 1
+            # Collect how many forms are approved to craft language for status
+            signed_accepted_agreement_forms = len([f for f in signed_agreement_forms if f.status == 'A'])
 
             # Build the row of the table for this participant
             participant_row = [
@@ -560,7 +426,7 @@ class ProjectPendingParticipants(View):
                     'email': participant.user.email.lower(),
                     'signed': signed_accepted_agreement_forms,
                     'team': True if project.has_teams else False,
-                    'required': project.agreement_forms.count()
+                    'required': len(agreement_forms)
                 },
                 participant.modified,
             ]
@@ -571,16 +437,7 @@ class ProjectPendingParticipants(View):
 
             participants.append(participant_row)
 
-        # Build DataTables response data
-        data = {
-            'draw': draw,
-            'recordsTotal': query_set.count(),
-            'recordsFiltered': paginator.count,
-            'data': participants,
-            'error': None,
-        }
-
-        return JsonResponse(data=data)
+        return table.response(participants)
 
 
 @method_decorator(user_auth_and_jwt, name='dispatch')
@@ -590,81 +447,55 @@ class ProjectDataUseReportParticipants(View):
 
         # Pull the project
         try:
-            project = DataProject.objects.get(project_key=project_key)
-        except DataProject.NotFound:
+            project = get_project(project_key)
+        except DataProject.DoesNotExist:
             logger.exception('DataProject for key "{}" not found'.format(project_key))
             return HttpResponse(status=404)
 
-        # Get needed params
-        draw = int(request.GET['draw'])
-        start = int(request.GET['start'])
-        length = int(request.GET['length'])
-        order_column = int(request.GET['order[0][column]'])
-        order_direction = request.GET['order[0][dir]']
-
-        # Check for a search value
-        search = request.GET['search[value]']
-
-        # Check what we're sorting by and in what direction
-        if order_column == 0:
-            sort_order = ['email'] if order_direction == 'asc' else ['-email']
-        elif order_column == 3 and not project.has_teams or order_column == 4 and project.has_teams:
-            sort_order = ['modified', '-email'] if order_direction == 'asc' else ['-modified', 'email']
-        else:
-            sort_order = ['modified', '-email'] if order_direction == 'asc' else ['-modified', 'email']
-
         # Build the query
 
         # Find users with all access but pending data use report agreement forms
-        participants_waiting_access = Participant.objects.filter(
-            Q(
-                project=project,
-                user__signedagreementform__agreement_form=project.data_use_report_agreement_form,
-                user__signedagreementform__status="P",
-            )
+        reporting_participants = Participant.objects.filter(project=project).annotate(
+            has_pending_data_use_report=Exists(SignedAgreementForm.objects.filter(
+                user=OuterRef('user'),
+                agreement_form=project.data_use_report_agreement_form,
+                status="P",
+            )),
         )
 
-        # Add search if necessary
-        if search:
-            participants_waiting_access = participants_waiting_access.filter(user__email__icontains=search)
-
-        # We only want distinct Participants belonging to the users query
-        # Django won't sort on a related field after this union so we annotate each queryset with the user's email to sort on
-        query_set = participants_waiting_access.annotate(email=F("user__email")) \
-            .order_by(*sort_order)
-
-        # Setup paginator
-        paginator = Paginator(
-            query_set,
-            length,
+        # Set the sortable columns, accounting for the team column
+        offset = 1 if project.has_teams else 0
+        table = KeysetDataTable(
+            request,
+            "data-use-report-participants",
+            project,
+            reporting_participants.filter(has_pending_data_use_report=True).select_related("user", "team__team_leader"),
+            orderings={
+                3 + offset: ['modified', '-user__email'],
+                0: ['user__email'],
+            },
         )
+        participant_page = table.page()
 
-        # Determine page index (1-index) from DT parameters
-        page = start / length + 1
-        participant_page = paginator.page(page)
+        # Get all agreement forms
+        agreement_forms = list(project.agreement_forms.all()) + [project.data_use_report_agreement_form]
+        required_agreement_forms = len(agreement_forms) - 1
+
+        # Fetch only for this project for all participants on this page at once
+        signed_forms_by_user = {}
+        for signed_form in SignedAgreementForm.objects.filter(
+                user__in=[participant.user_id for participant in participant_page],
+                project=project,
+                agreement_form__in=agreement_forms).select_related('agreement_form', 'project'):
+            signed_forms_by_user.setdefault(signed_form.user_id, []).append(signed_form)
 
         participants = []
         for participant in participant_page:
 
-            signed_agreement_forms = []
-            signed_accepted_agreement_forms = 0
-
-            # Get all agreement forms
-            agreement_forms = list(project.agreement_forms.all()) + [project.data_use_report_agreement_form]
-
-            # Fetch only for this project
-            signed_forms = SignedAgreementForm.objects.filter(
-                user__email=participant.user.email,
-                project=project,
-                agreement_form__in=agreement_forms,
-            )
-            for signed_form in signed_forms:
-                if signed_form is not None:
-                    signed_agreement_forms.append(signed_form)
+            signed_agreement_forms = signed_forms_by_user.get(participant.user_id, [])
 
-                # Collect how many forms are approved to craft language for status
-                if signed_form.status == 'A':
-                    signed_accepted_agreement_forms += 1
+            # Collect how many forms are approved to craft language for status
+            signed_accepted_agreement_forms = len([f for f in signed_agreement_forms if f.status == 'A'])
 
             # Build the row of the table for this participant
             participant_row = [
@@ -683,7 +514,7 @@ class ProjectDataUseReportParticipants(View):
                     'email': participant.user.email.lower(),
                     'signed': signed_accepted_agreement_forms,
                     'team': True if project.has_teams else False,
-                    'required': project.agreement_forms.count()
+                    'required': required_agreement_forms
                 },
                 participant.modified,
             ]
@@ -694,16 +525,7 @@ class ProjectDataUseReportParticipants(View):
 
             participants.append(participant_row)
 
-        # Build DataTables response data
-        data = {
-            'draw': draw,
-            'recordsTotal': query_set.count(),
-            'recordsFiltered': paginator.count,
-            'data': participants,
-            'error': None,
-        }
-
-        return JsonResponse(data=data)
+        return table.response(participants)
 
 @user_auth_and_jwt
 def team_notification(request, project_key=None):
@@ -848,74 +670,50 @@ def manage_team(request, project_key, team_leader, template_name='manage/team.ht
         return HttpResponse(403)
 
     try:
-        project = DataProject.objects.get(project_key=project_key)
+        project = get_project(project_key)
         team = Team.objects.get(data_project=project, team_leader__email=team_leader)
     except ObjectDoesNotExist:
         return render(request, '404.html')
 
-    num_required_forms = project.agreement_forms.count()
+    agreement_forms = list(project.agreement_forms.all())
+    num_required_forms = len(agreement_forms)
 
     # Collect all the team member information needed.
     team_member_details = []
-    team_participants = team.participant_set.all()
+    team_participants = list(team.participant_set.select_related('user'))
     team_accepted_forms = 0
 
-    for member in team_participants:
-        email = member.user.email
+    # Fetch profiles from DBMIReg and signed agreement forms for the whole team at once
+    user_infos = get_user_profiles(user_jwt, [member.user.email for member in team_participants], project_key)
+    compliance = get_agreement_form_compliance(project, [member.user_id for member in team_participants], agreement_forms)
 
-        # Make a request to DBMIReg to get this person's user information.
-        user_info_json = get_user_profile(user_jwt, email, project_key)
+    # Fetch internal signed agreement forms for the whole team
+    internal_signed_agreement_forms = {}
+    for signed_agreement_form in SignedAgreementForm.objects.filter(
+            agreement_form__internal=True,
+            user__in=[member.user_id for member in team_participants],
+            project=project).select_related('agreement_form', 'project').order_by('id'):
+        internal_signed_agreement_forms.setdefault(signed_agreement_form.user_id, []).append(signed_agreement_form)
 
-        if user_info_json['count'] != 0:
-            user_info = user_info_json["results"][0]
-        else:
-            user_info = None
+    for member in team_participants:
+        email = member.user.email
 
         # Check if this participant has access
         access_granted = member.permission == "VIEW"
 
-        signed_agreement_forms = []
-        signed_accepted_agreement_forms = 0
-
         # For each of the available agreement forms for this project, display only latest version completed by the user
-        for agreement_form in project.agreement_forms.all():
-
-            # If this project accepts agreement forms from other projects, check those
-            if project.shares_agreement_forms:
-
-                # Fetch without a specific project
-                signed_form = SignedAgreementForm.objects.filter(
-                    user__email=email,
-                    agreement_form=agreement_form,
-                ).last()
-
-            else:
-                # Fetch only for the current project
-                signed_form = SignedAgreementForm.objects.filter(
-                    user__email=email,
-                    project=project,
-                    agreement_form=agreement_form
-                ).last()
+        signed_agreement_forms = compliance[member.user_id].latest_signed_forms()
+        signed_accepted_agreement_forms = len([f for f in signed_agreement_forms if f.status == SIGNED_FORM_APPROVED])
+        team_accepted_forms += signed_accepted_agreement_forms
 
-            if signed_form is not None:
-                signed_agreement_forms.append(signed_form)
-
-                if signed_form.status == 'A':
-                    team_accepted_forms += 1
-                    signed_accepted_agreement_forms += 1
-
-            # Add internal signed agreement forms
-            for signed_agreement_form in SignedAgreementForm.objects.filter(
-                agreement_form__internal=True,
-                user__email=email,
-                project=project):
-
-                    # Add it
-                    signed_agreement_forms.append(signed_agreement_form)
+        # Add internal signed agreement forms
+        signed_agreement_forms.extend(
+            f for f in internal_signed_agreement_forms.get(member.user_id, []) if f not in signed_agreement_forms
+        )
 
         team_member_details.append({
             'email': email,
-            'user_info': user_info,
+            'user_info': user_infos.get(email),
             'signed_agreement_forms': signed_agreement_forms,
             'signed_accepted_agreement_forms': signed_accepted_agreement_forms,
             'participant': member,
@@ -923,19 +721,20 @@ def manage_team(request, project_key, team_leader, template_name='manage/team.ht
         })
 
     # Check whether this team has completed all the necessary forms and they have been accepted by challenge admins
-    total_required_forms_for_team = project.agreement_forms.count() * team_participants.count()
+    total_required_forms_for_team = num_required_forms * len(team_participants)
     team_has_all_forms_complete = total_required_forms_for_team == team_accepted_forms
 
     institution = project.institution
 
     # Get the comments made about this team by challenge administrators
-    comments = TeamComment.objects.filter(team=team)
+    comments = TeamComment.objects.filter(team=team).select_related('user')
 
     # Get a history of files downloaded and uploaded by members of this team
-    files = HostedFile.objects.filter(project=project)
-    team_users = User.objects.filter(participant__in=team_participants)
-    downloads = HostedFileDownload.objects.filter(hosted_file__in=files, user__in=team_users)
-    uploads = team.get_submissions()
+    downloads = HostedFileDownload.objects.filter(
+        hosted_file__project=project,
+        user__in=[member.user_id for member in team_participants],
+    ).select_related('user', 'hosted_file')
+    uploads = team.get_submissions().select_related('participant__user', 'challenge_task')
 
     context = {
         "user": user,
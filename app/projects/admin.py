@@ -1,22 +1,26 @@
 from django.contrib import admin
 from django.urls import reverse
 from django.utils.html import escape, mark_safe
+from django_q.tasks import async_task
 
 from projects.models import Group
 from projects.models import DataProject
 from projects.models import AgreementForm
 from projects.models import SignedAgreementForm
+from projects.models import SIGNED_FORM_PROCESSING_PENDING
 from projects.models import Team
 from projects.models import Participant
 from projects.models import Institution
 from projects.models import HostedFile
 from projects.models import HostedFileSet
 from projects.models import HostedFileDownload
+from projects.models import ParticipantActivity
 from projects.models import ChallengeTask
 from projects.models import ChallengeTaskSubmission
 from projects.models import ChallengeTaskSubmissionDownload
 from projects.models import Bucket
 from projects.models import InstitutionalOfficial
+from projects.models import InstitutionalMember
 from projects.models import DataUseReportRequest
 from projects.models import DataProjectWorkflow
 
@@ -41,9 +45,22 @@ class AgreementformAdmin(admin.ModelAdmin):
     readonly_fields = ('created', 'modified', )
 
 class SignedagreementformAdmin(admin.ModelAdmin):
-    list_display = ('user', 'agreement_form', 'date_signed', 'status', 'created', 'modified', )
+    list_display = ('user', 'agreement_form', 'date_signed', 'status', 'processing_status', 'created', 'modified', )
+    list_filter = ('processing_status', )
     search_fields = ('user__email', )
-    readonly_fields = ('created', 'modified', )
+    readonly_fields = ('processing_attempts', 'processing_error', 'created', 'modified', )
+    actions = ('reprocess', )
+
+    @admin.action(description="Queue document generation and handling")
+    def reprocess(self, request, queryset):
+        for signed_agreement_form_id in queryset.values_list('id', flat=True):
+
+            # Reset status and queue it up
+            SignedAgreementForm.objects.filter(id=signed_agreement_form_id).update(
+                processing_status=SIGNED_FORM_PROCESSING_PENDING,
+                processing_attempts=0,
+            )
+            async_task('projects.tasks.process_signed_agreement_form', signed_agreement_form_id)
 
 class TeamAdmin(admin.ModelAdmin):
     list_display = ('team_leader', 'data_project', 'created', 'modified', )
@@ -61,9 +78,20 @@ class InstitutionAdmin(admin.ModelAdmin):
     list_display = ('name', 'logo_path', 'created', 'modified', )
     readonly_fields = ('created', 'modified', )
 
+class InstitutionalMemberInline(admin.TabularInline):
+    model = InstitutionalMember
+    fields = ('email', 'created', )
+    readonly_fields = ('email', 'created', )
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
 class InstitutionalOfficialAdmin(admin.ModelAdmin):
     list_display = ('user', 'institution', 'project', 'created', 'modified', )
     readonly_fields = ('created', 'modified', )
+    inlines = (InstitutionalMemberInline, )
 
 class HostedFileAdmin(admin.ModelAdmin):
     list_display = ('long_name', 'project', 'hostedfileset', 'file_name', 'file_location', 'order', 'created', 'modified',)
@@ -80,6 +108,12 @@ class HostedFileDownloadAdmin(admin.ModelAdmin):
     list_display = ('user', 'hosted_file', 'download_date')
     search_fields = ('user__email', )
 
+class ParticipantActivityAdmin(admin.ModelAdmin):
+    list_display = ('user', 'project', 'download_count', 'submission_count', 'last_download', 'last_submission', )
+    list_filter = ('project', )
+    search_fields = ('user__email', )
+    readonly_fields = ('created', 'modified', )
+
 class ChallengeTaskAdmin(admin.ModelAdmin):
     list_display = ('data_project', 'title', 'enabled', 'opened_time', 'closed_time', 'created', 'modified', )
     readonly_fields = ('created', 'modified', )
@@ -113,6 +147,7 @@ admin.site.register(InstitutionalOfficial, InstitutionalOfficialAdmin)
 admin.site.register(HostedFile, HostedFileAdmin)
 admin.site.register(HostedFileSet, HostedFileSetAdmin)
 admin.site.register(HostedFileDownload, HostedFileDownloadAdmin)
+admin.site.register(ParticipantActivity, ParticipantActivityAdmin)
 admin.site.register(ChallengeTask, ChallengeTaskAdmin)
 admin.site.register(ChallengeTaskSubmission, ChallengeTaskSubmissionAdmin)
 admin.site.register(ChallengeTaskSubmissionDownload, ChallengeTaskSubmissionDownloadAdmin)
@@ -0,0 +1,144 @@
+import csv
+import io
+import json
+import logging
+
+from django.db import transaction
+from django.db.models import Exists
+from django.db.models import OuterRef
+from django.utils import timezone
+
+from manage.datatables import invalidate_tables
+from projects.models import ChallengeTaskSubmission
+from projects.models import HostedFileDownload
+from projects.models import Participant
+from projects.models import Team
+from projects.models import TEAM_DEACTIVATED
+from projects.signals import sync_teams
+
+logger = logging.getLogger(__name__)
+
+# The formats reports may be rendered in
+REPORT_FORMAT_JSON = 'json'
+REPORT_FORMAT_CSV = 'csv'
+REPORT_FORMATS = (REPORT_FORMAT_JSON, REPORT_FORMAT_CSV)
+
+
+def get_team_activity(project):
+    """
+    Returns the project's teams annotated with whether any member has made a
+    non-deleted submission or downloaded any of the project's hosted files.
+
+    :param project: The project
+    :type project: DataProject
+    :return: The teams annotated with `has_submissions` and `has_downloads`
+    :rtype: QuerySet
+    """
+    submissions = ChallengeTaskSubmission.objects.filter(
+        participant__team=OuterRef('pk'),
+        deleted=False,
+    )
+    downloads = HostedFileDownload.objects.filter(
+        hosted_file__project=project,
+        user__participant__team=OuterRef('pk'),
+    )
+
+    return Team.objects.filter(data_project=project).annotate(
+        has_submissions=Exists(submissions),
+        has_downloads=Exists(downloads),
+    ).select_related('team_leader')
+
+
+def get_participant_activity(project):
+    """
+    Returns the project's participants annotated with whether they have made a
+    non-deleted submission or downloaded any of the project's hosted files.
+
+    :param project: The project
+    :type project: DataProject
+    :return: The participants annotated with `has_submissions` and `has_downloads`
+    :rtype: QuerySet
+    """
+    submissions = ChallengeTaskSubmission.objects.filter(
+        participant=OuterRef('pk'),
+        deleted=False,
+    )
+    downloads = HostedFileDownload.objects.filter(
+        hosted_file__project=project,
+        user=OuterRef('user'),
+    )
+
+    return Participant.objects.filter(project=project).annotate(
+        has_submissions=Exists(submissions),
+        has_downloads=Exists(downloads),
+    ).select_related('user')
+
+
+def revoke_teams(project, teams):
+    """
+    Deactivates the passed teams with a single update. If the project shares its
+    teams, sharing projects are synced once afterwards rather than once per team.
+
+    :param project: The project the teams belong to
+    :type project: DataProject
+    :param teams: The teams to deactivate
+    :type teams: QuerySet
+    :return: The number of teams deactivated
+    :rtype: int
+    """
+    team_ids = list(teams.values_list('id', flat=True))
+    with transaction.atomic():
+        revoked = Team.objects.filter(id__in=team_ids).update(status=TEAM_DEACTIVATED, modified=timezone.now())
+
+        # Bulk updates do not fire signals so propagate to sharing projects here
+        if revoked and project.shares_teams:
+            sync_teams(project)
+
+    logger.debug(f"Revoked {revoked} teams for {project}")
+    return revoked
+
+
+def revoke_participants(project, participants):
+    """
+    Removes the VIEW permission from the passed participants in a single update.
+
+    :param project: The project the participants belong to
+    :type project: DataProject
+    :param participants: The participants to revoke
+    :type participants: QuerySet
+    :return: The number of participants revoked
+    :rtype: int
+    """
+    participant_ids = list(participants.values_list('id', flat=True))
+    revoked = Participant.objects.filter(id__in=participant_ids).update(permission=None, modified=timezone.now())
+
+    # Bulk updates do not fire signals
+    invalidate_tables(project.id)
+
+    logger.debug(f"Revoked {revoked} participants for {project}")
+    return revoked
+
+
+def render_report(report, rows_key, report_format=REPORT_FORMAT_JSON):
+    """
+    Renders an operation report. JSON reports include the entire report while
+    CSV reports include only the rows listed under the passed key.
+
+    :param report: The report
+    :type report: dict
+    :param rows_key: The key of the list of rows in the report
+    :type rows_key: str
+    :param report_format: The format to render, defaults to 'json'
+    :type report_format: str, optional
+    :return: The rendered report
+    :rtype: str
+    """
+    if report_format == REPORT_FORMAT_CSV:
+        rows = report[rows_key]
+        output = io.StringIO()
+        writer = csv.DictWriter(output, fieldnames=list(rows[0].keys()) if rows else [])
+        writer.writeheader()
+        writer.writerows(rows)
+        return output.getvalue()
+
+    return json.dumps(report)
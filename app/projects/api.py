@@ -1,12 +1,10 @@
 from copy import copy
 from datetime import datetime
 import json
-import importlib
 import logging
 
 from django.conf import settings
 from django.contrib import messages
-from django.contrib.auth.models import User
 from django.core import exceptions
 from django.core.exceptions import ObjectDoesNotExist
 from django.template.exceptions import TemplateDoesNotExist
@@ -16,8 +14,10 @@ from django.http import QueryDict
 from django.shortcuts import get_object_or_404
 from django.shortcuts import redirect
 from django.template import loader
-from django.core.files.base import ContentFile
+from django.db import transaction
 from django.urls import reverse
+from django.utils import timezone
+from django_q.tasks import async_task
 from dal import autocomplete
 
 from hypatio.auth0authenticate import user_auth_and_jwt
@@ -26,16 +26,18 @@ from hypatio import file_services as fileservice
 from hypatio.file_services import get_download_url
 from hypatio.sciauthz_services import SciAuthZ
 from hypatio.dbmiauthz_services import DBMIAuthz
-from projects.templatetags import projects_extras
+from projects.compliance import get_agreement_form_compliance
 from projects.utils import notify_supervisors_of_task_submission
 from projects.utils import notify_task_submitters
-from pdf.renderers import render_pdf
+from projects.tasks import render_signed_agreement_form_document
+from projects.tasks import call_signed_agreement_form_handler
 from projects.panels import DataProjectSignupPanel
 from projects.panels import SIGNUP_STEP_CURRENT_STATUS
 
 from projects.models import AgreementForm
 from projects.models import ChallengeTask
 from projects.models import ChallengeTaskSubmission
+from manage.datatables import invalidate_tables
 from projects.models import DataProject
 from projects.models import HostedFile
 from projects.models import HostedFileDownload
@@ -43,6 +45,7 @@ from projects.models import Participant
 from projects.models import SignedAgreementForm
 from projects.models import Team
 from projects.models import SIGNED_FORM_REJECTED, SIGNED_FORM_APPROVED
+from projects.models import SIGNED_FORM_PROCESSING_PENDING
 from projects.models import HostedFileSet
 from projects.models import InstitutionalOfficial
 
@@ -94,9 +97,6 @@ def finalize_team(request):
         )
         return HttpResponse("Error: permissions.", status=403)
 
-    team.status = 'Ready'
-    team.save()
-
     # Convert the comma separated string of emails into a list.
     supervisor_emails = project.project_supervisors.split(",")
 
@@ -104,15 +104,130 @@ def finalize_team(request):
                'project': project_key,
                'site_url': settings.SITE_URL}
 
-    email_success = email_send(
-        subject='DBMI Portal - Finalized Team',
-        recipients=supervisor_emails,
-        email_template='email_finalized_team_notification',
-        extra=context
-    )
+    with transaction.atomic():
+        team.status = 'Ready'
+        team.save()
+
+        # Notify supervisors in the background once the change is committed
+        queue_email(
+            subject='DBMI Portal - Finalized Team',
+            recipients=supervisor_emails,
+            email_template='email_finalized_team_notification',
+            extra=context
+        )
 
     return HttpResponse(200)
 
+def queue_email(subject, recipients, email_template, extra):
+    """
+    Queues an email to be sent by a background task once the current
+    transaction, if any, commits.
+
+    :param subject: The subject of the email
+    :type subject: str
+    :param recipients: The recipients of the email
+    :type recipients: list
+    :param email_template: The name of the email template
+    :type email_template: str
+    :param extra: The context for the template
+    :type extra: dict
+    """
+    transaction.on_commit(lambda: async_task(
+        'contact.views.email_send',
+        subject=subject,
+        recipients=recipients,
+        email_template=email_template,
+        extra=extra,
+    ))
+
+
+# The actions a team leader may take on pending team members
+TEAM_MEMBERS_APPROVE = 'approve'
+TEAM_MEMBERS_REJECT = 'reject'
+
+
+def update_pending_team_members(team, emails, action):
+    """
+    Approves or rejects the team's pending members with the passed emails in a
+    single transaction. Rejected members' participant records are removed.
+
+    :param team: The team
+    :type team: Team
+    :param emails: The emails of the pending members to update
+    :type emails: list
+    :param action: Whether to approve or reject the members
+    :type action: str
+    :return: The emails of the members that were updated
+    :rtype: list
+    """
+    with transaction.atomic():
+
+        # Lock the team while its membership changes
+        Team.objects.select_for_update().filter(id=team.id).first()
+
+        # Find the matching pending members
+        participants = Participant.objects.filter(
+            team=team,
+            team_pending=True,
+            user__email__in=emails,
+        )
+        updated_emails = list(participants.values_list("user__email", flat=True))
+
+        if action == TEAM_MEMBERS_APPROVE:
+            participants.update(
+                team_pending=False,
+                team_approved=True,
+                team_wait_on_leader=False,
+                team_wait_on_leader_email=None,
+                modified=timezone.now(),
+            )
+
+        elif action == TEAM_MEMBERS_REJECT:
+            participants.delete()
+
+        # Bulk updates do not fire signals
+        invalidate_tables(team.data_project_id)
+
+    logger.debug(f"[update_pending_team_members] Team {team}: {action} {len(updated_emails)} member(s)")
+    return updated_emails
+
+
+@user_auth_and_jwt
+def update_team_members(request):
+    """
+    An HTTP POST endpoint for team leaders to approve or reject any number of
+    pending requests to join their team at once.
+    """
+
+    project_key = request.POST.get("project_key")
+    action = request.POST.get("action")
+    participant_emails = request.POST.getlist("participants")
+
+    if action not in [TEAM_MEMBERS_APPROVE, TEAM_MEMBERS_REJECT]:
+        return HttpResponse("Error: invalid action.", status=400)
+
+    logger.debug(
+        f'[HYPATIO][DEBUG][update_team_members] User {request.user.email} is attempting to {action} '
+        f'{len(participant_emails)} member(s) of their team for project {project_key}.'
+    )
+
+    # Only team leaders may manage their team
+    try:
+        team = Team.objects.get(team_leader=request.user, data_project__project_key=project_key)
+    except ObjectDoesNotExist:
+        logger.error(
+            f"[HYPATIO][DEBUG][update_team_members] User {request.user.email} is not a team leader for {project_key}."
+        )
+        return HttpResponse("Error: permissions.", status=403)
+
+    updated_emails = update_pending_team_members(team, participant_emails, action)
+
+    return JsonResponse({
+        "updated": updated_emails,
+        "not_found": [email for email in participant_emails if email not in updated_emails],
+    })
+
+
 @user_auth_and_jwt
 def approve_team_join(request):
     """
@@ -122,8 +237,6 @@ def approve_team_join(request):
     project_key = request.POST.get("project_key")
     participant_email = request.POST.get("participant")
 
-    project = DataProject.objects.get(project_key=project_key)
-
     logger.debug(
         '[HYPATIO][DEBUG][approve_team_join] User {user} is attempting to approve {participant} to join their team for project {project_key}.'.format(
             user=request.user.email,
@@ -133,14 +246,8 @@ def approve_team_join(request):
     )
 
     try:
-        team = Team.objects.get(
-            team_leader=request.user,
-            data_project=project
-        )
+        team = Team.objects.get(team_leader=request.user, data_project__project_key=project_key)
     except ObjectDoesNotExist:
-        team = None
-
-    if request.user.email != team.team_leader.email:
         logger.error(
             "[HYPATIO][DEBUG][approve_team_join] User {email} is not the team leader and thus cannot add people.".format(
                 email=request.user.email
@@ -148,17 +255,9 @@ def approve_team_join(request):
         )
         return HttpResponse("Error: permissions.", status=403)
 
-    try:
-        participant_user = User.objects.get(email=participant_email)
-        participant = Participant.objects.get(
-            user=participant_user,
-            project=project
-        )
-    except ObjectDoesNotExist:
-        participant = None
-
-    participant.assign_approved(team)
-    participant.save()
+    if not update_pending_team_members(team, [participant_email], TEAM_MEMBERS_APPROVE):
+        logger.debug('Participant not found.')
+        return HttpResponse('Error.', status=404)
 
     return HttpResponse(200)
 
@@ -171,8 +270,6 @@ def reject_team_join(request):
     project_key = request.POST.get("project_key")
     participant_email = request.POST.get("participant")
 
-    project = DataProject.objects.get(project_key=project_key)
-
     logger.debug(
         '[HYPATIO][DEBUG][reject_team_join] User {user} is attempting to reject {participant} from joining their team for project {project_key}.'.format(
             user=request.user.email,
@@ -182,16 +279,8 @@ def reject_team_join(request):
     )
 
     try:
-        participant_user = User.objects.get(email=participant_email)
-        participant = Participant.objects.get(
-            user=participant_user,
-            project=project
-        )
+        team = Team.objects.get(team_leader=request.user, data_project__project_key=project_key)
     except ObjectDoesNotExist:
-        logger.debug('Participant not found.')
-        return HttpResponse('Error.', status=404)
-
-    if request.user.email != participant.team.team_leader.email:
         logger.error(
             "[HYPATIO][DEBUG][reject_team_join] User {email} is not the team leader and thus cannot reject people.".format(
                 email=request.user.email
@@ -199,7 +288,9 @@ def reject_team_join(request):
         )
         return HttpResponse("Error: permissions.", status=403)
 
-    participant.delete()
+    if not update_pending_team_members(team, [participant_email], TEAM_MEMBERS_REJECT):
+        logger.debug('Participant not found.')
+        return HttpResponse('Error.', status=404)
 
     return HttpResponse(200)
 
@@ -261,50 +352,48 @@ def join_team(request):
         project=project_key
     ))
 
-    try:
-        participant = Participant.objects.get(user=request.user, project=project)
-    except ObjectDoesNotExist:
-        participant = Participant(user=request.user, project=project)
-        participant.save()
+    with transaction.atomic():
+        participant, _ = Participant.objects.get_or_create(user=request.user, project=project)
 
-    try:
         # If this team leader has already created a team, add the person to the team in a pending status
-        team = Team.objects.get(team_leader__email__iexact=team_leader, data_project=project)
+        team = Team.objects.filter(team_leader__email__iexact=team_leader, data_project=project).first()
+        if team is not None:
+
+            # Only allow a new participant to join a team that is still in a pending or ready state
+            if team.status not in ['Pending', 'Ready']:
+                msg = "The team you are trying to join has already been finalized and is not accepting new members. " + \
+                      "If you would like to join this team, please have the team leader contact the challenge " + \
+                      "administrators for help."
+                messages.error(request, msg)
+
+                return redirect(reverse("projects:view-project", kwargs={"project_key": project_key}))
 
-        # Only allow a new participant to join a team that is still in a pending or ready state
-        if team.status in ['Pending', 'Ready']:
             participant.team = team
             participant.team_pending = True
             participant.save()
-        # Otherwise, let them know why they can't join the team
-        else:
-            msg = "The team you are trying to join has already been finalized and is not accepting new members. " + \
-                  "If you would like to join this team, please have the team leader contact the challenge " + \
-                  "administrators for help."
-            messages.error(request, msg)
 
-        return redirect(reverse("projects:view-project", kwargs={"project_key": project_key}))
-    except ObjectDoesNotExist:
-        # If this team leader has not yet created a team, mark the person as waiting
-        participant.team_wait_on_leader_email = team_leader
-        participant.team_wait_on_leader = True
-        participant.save()
-        team = None
+            # Send email to team leader informing them of a pending member
+            context = {'member_email': request.user.email,
+                       'project': project,
+                       'site_url': settings.SITE_URL}
 
-    # Send email to team leader informing them of a pending member
-    if team is not None:
-        context = {'member_email': request.user.email,
-                   'project': project,
-                   'site_url': settings.SITE_URL}
+            queue_email(subject='DBMI Portal - Pending Member',
+                        recipients=[team_leader],
+                        email_template='email_pending_member_notification',
+                        extra=context)
 
-        email_success = email_send(subject='DBMI Portal - Pending Member',
-                                   recipients=[team_leader],
-                                   email_template='email_pending_member_notification',
-                                   extra=context)
+        else:
+            # If this team leader has not yet created a team, mark the person as waiting
+            participant.team_wait_on_leader_email = team_leader
+            participant.team_wait_on_leader = True
+            participant.save()
 
-    # Create record to allow leader access to profile.
-    sciauthz = SciAuthZ(request.COOKIES.get("DBMI_JWT", None), request.user.email)
-    sciauthz.create_profile_permission(team_leader, project_key)
+        # Create record to allow leader access to profile once committed
+        user_jwt = request.COOKIES.get("DBMI_JWT", None)
+        user_email = request.user.email
+        transaction.on_commit(lambda: async_task(
+            'projects.tasks.create_profile_permission', user_jwt, user_email, team_leader, project_key
+        ))
 
     return redirect(reverse("projects:view-project", kwargs={"project_key": project_key}))
 
@@ -319,26 +408,28 @@ def create_team(request):
 
     logger.debug("[HYPATIO][create_team] User " + request.user.email + " is trying to create a team for project " + project_key + ".")
 
-    new_team, created = Team.objects.get_or_create(team_leader=request.user, data_project=project)
+    with transaction.atomic():
+        new_team, created = Team.objects.get_or_create(team_leader=request.user, data_project=project)
 
-    try:
-        participant = Participant.objects.get(user=request.user, project=project)
-    except ObjectDoesNotExist:
-        participant = Participant(user=request.user, project=project)
+        participant, _ = Participant.objects.get_or_create(user=request.user, project=project)
+        participant.assign_approved(new_team)
         participant.save()
 
-    participant.assign_approved(new_team)
-    participant.save()
+        # Find anyone whose waiting on this team leader and link them to the new team.
+        Participant.objects.filter(
+            team_wait_on_leader_email=request.user.email,
+            project=project
+        ).exclude(id=participant.id).update(
+            team=new_team,
+            team_pending=True,
+            team_wait_on_leader=False,
+            team_wait_on_leader_email=None,
+            team_approved=False,
+            modified=timezone.now(),
+        )
 
-    # Find anyone whose waiting on this team leader and link them to the new team.
-    waiting_participants = Participant.objects.filter(
-        team_wait_on_leader_email=request.user.email,
-        project=project
-    )
-
-    for participant in waiting_participants:
-        participant.assign_pending(new_team)
-        participant.save()
+        # Bulk updates do not fire signals
+        invalidate_tables(project.id)
 
     return redirect(reverse("projects:view-project", kwargs={"project_key": project_key}))
 
@@ -356,7 +447,7 @@ def download_dataset(request):
     project_key = file_to_download.project.project_key
 
     # Check if this file is enabled for download.
-    if not projects_extras.is_hostedfile_currently_enabled(file_to_download):
+    if not file_to_download.is_available():
         logger.debug("[download_dataset] - File not allowed for download attempted by " + request.user.email)
         return HttpResponse("You do not have access to download this file.", status=403)
 
@@ -437,7 +528,7 @@ def upload_challengetasksubmission_file(request):
             return HttpResponse('Task not found', status=400)
 
         # Only allow a submission if the task is still open.
-        if not projects_extras.is_challengetask_currently_enabled(task):
+        if not task.is_available():
             logger.error("[upload_challengetasksubmission_file] - User " + request.user.email + " is trying to submit task " + task.title + " after close time.")
             return HttpResponse("This task is no longer open for submissions", status=400)
 
@@ -723,57 +814,33 @@ def save_signed_agreement_form(request):
         logger.info(f"{agreement_form.short_name}/{request.user.email}: Signed agreement form automatically approved")
         signed_agreement_form.status = SIGNED_FORM_APPROVED
 
-    try:
-        # Check for a template
-        if agreement_form.template:
-
-            # Check required properties
-            if not agreement_form.form_file_path:
-                raise ValueError(f"AgreementForm does not have required property 'form_file_path'")
+    # Check if document generation and handling should be deferred to a background task
+    if settings.SIGNED_AGREEMENT_FORM_DEFERRED_PROCESSING and (agreement_form.template or agreement_form.handler):
 
-            # Convert hypens to underscore in context
-            safe_fields = {k.replace("-", "_"):v for k,v in fields.items()}
+        # Save the agreement form and queue up processing once it has been committed
+        signed_agreement_form.processing_status = SIGNED_FORM_PROCESSING_PENDING
+        signed_agreement_form.save()
 
-            # Render content of the agreement form
-            signed_agreement_form_content = loader.render_to_string(
-                template_name=agreement_form.form_file_path,
-                context=safe_fields,
-            )
+        transaction.on_commit(lambda: async_task(
+            'projects.tasks.process_signed_agreement_form', signed_agreement_form.id
+        ))
 
-            try:
-                # Attempt to load PDF template
-                loader.get_template(agreement_form.template)
-
-                # Set the filename
-                filename = f"{agreement_form.short_name}-{request.user.email}-{datetime.now().isoformat()}.pdf"
-
-                # Set context
-                context = {
-                    "content": signed_agreement_form_content
-                }
-
-                # Submit consent PDF
-                logger.debug(f"Rendering agreement form with template: {agreement_form.template}")
-                response = render_pdf(filename, request, agreement_form.template, context=context, options={})
-                signed_agreement_form.document = ContentFile(response.content, name=filename)
-
-            except TemplateDoesNotExist:
-                logger.exception(f"Agreement form template not found: {agreement_form.template}", extra={
-                    "agreement_form": agreement_form,
-                    "signed_agreement_form": signed_agreement_form,
-                })
-            except Exception as e:
-                logger.exception(f"Document could not be created: {e}", extra={
-                    "agreement_form": agreement_form,
-                    "signed_agreement_form": signed_agreement_form,
-                })
+        return HttpResponse(status=200)
 
+    try:
+        # Render the document, if any
+        signed_agreement_form.document = render_signed_agreement_form_document(signed_agreement_form, request)
+
+    except TemplateDoesNotExist:
+        logger.exception(f"Agreement form template not found: {agreement_form.template}", extra={
+            "agreement_form": agreement_form,
+            "signed_agreement_form": signed_agreement_form,
+        })
     except Exception as e:
-        logger.exception(
-            f"HYP/Projects/API: Fields error: {e}",
-            exc_info=True,
-            extra={"form": agreement_form.short_name, "fields": request.POST,}
-        )
+        logger.exception(f"Document could not be created: {e}", extra={
+            "agreement_form": agreement_form,
+            "signed_agreement_form": signed_agreement_form,
+        })
 
     # Save the agreement form
     signed_agreement_form.save()
@@ -781,13 +848,10 @@ def save_signed_agreement_form(request):
     # Check for a handler
     if agreement_form.handler:
         try:
-            # Build function components
-            module_name, handler_name = agreement_form.handler.rsplit('.', 1)
-            module = importlib.import_module(module_name)
-
             # Call handler
-            getattr(module, handler_name)(signed_agreement_form)
-            logger.debug(f"Handler '{agreement_form.handler}' called for SignedAgreementForm")
+            call_signed_agreement_form_handler(signed_agreement_form)
+            signed_agreement_form.handler_completed = True
+            signed_agreement_form.save(update_fields=["handler_completed", "modified"])
 
         except Exception as e:
             logger.exception(f"Error calling handler: {e}", exc_info=True)
@@ -868,15 +932,7 @@ def submit_user_permission_request(request):
     if project.automatic_authorization:
 
         # Grant this user access immediately if all agreement forms are accepted
-        for agreement_form in project.agreement_forms.all():
-            if not SignedAgreementForm.objects.filter(
-                agreement_form=agreement_form,
-                project=project,
-                user=request.user,
-                status="A"
-                ):
-                break
-        else:
+        if get_agreement_form_compliance(project, [request.user])[request.user.id].is_complete:
             participant.permission = "VIEW"
             participant.save()
 
@@ -885,10 +941,7 @@ def submit_user_permission_request(request):
 
         # Check if this is a member
         try:
-            official = InstitutionalOfficial.objects.get(
-                project=project,
-                member_emails__contains=request.user.email,
-            )
+            official = InstitutionalOfficial.get_for_member(project, request.user.email)
 
             # Check if they have access
             official_participant = Participant.objects.get(user=official.user)
@@ -904,15 +957,7 @@ def submit_user_permission_request(request):
                         signed_agreement_form.save()
 
                 # Grant this user access immediately if all agreement forms are accepted
-                for agreement_form in project.agreement_forms.all():
-                    if not SignedAgreementForm.objects.filter(
-                        agreement_form=agreement_form,
-                        project=project,
-                        user=request.user,
-                        status="A"
-                        ):
-                        break
-                else:
+                if get_agreement_form_compliance(project, [request.user])[request.user.id].is_complete:
                     participant.permission = "VIEW"
                     participant.save()
 
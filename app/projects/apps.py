@@ -1,4 +1,6 @@
 from django.apps import AppConfig
+from django.core.signals import request_started
+from django.db import DatabaseError
 from django.db.models.signals import post_migrate
 
 import logging
@@ -19,6 +21,25 @@ def check_fileservice(sender, **kwargs):
         raise SystemError('Fileservice group could not be created')
 
 
+def warm_agreement_form_paths(sender, **kwargs):
+    """
+    Resolves the form classes and handlers referenced by agreement forms so
+    they are cached before use. This is run once on the first request to
+    avoid querying the database during app initialization.
+    """
+    request_started.disconnect(warm_agreement_form_paths, dispatch_uid="warm_agreement_form_paths")
+
+    from hypatio.resolvers import resolve_callable, resolve_class, warm
+    from projects.models import AgreementForm
+
+    try:
+        warm(AgreementForm.objects.values_list("form_class", flat=True), resolve_class)
+        warm(AgreementForm.objects.values_list("handler", flat=True), resolve_callable)
+
+    except DatabaseError as e:
+        logger.warning(f"Could not warm agreement form paths: {e}")
+
+
 class ProjectsConfig(AppConfig):
     name = 'projects'
     default_auto_field = 'django.db.models.BigAutoField'
@@ -32,3 +53,6 @@ class ProjectsConfig(AppConfig):
 
         # Check Fileservice groups once
         post_migrate.connect(check_fileservice, sender=self)
+
+        # Warm agreement form classes and handlers once the database is available
+        request_started.connect(warm_agreement_form_paths, dispatch_uid="warm_agreement_form_paths")
@@ -0,0 +1,79 @@
+import logging
+
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+
+from projects.models import ChallengeTask
+from projects.models import HostedFile
+
+logger = logging.getLogger(__name__)
+
+# The maximum number of seconds a project's available files and tasks are cached for
+AVAILABILITY_CACHE_TIMEOUT = 3600
+
+
+def get_availability_version(project_id):
+    """
+    Returns the current version of the cached availability for a project.
+
+    :param project_id: The ID of the project
+    :type project_id: int
+    :return: The version
+    :rtype: int
+    """
+    key = f"projects:availability:{project_id}:version"
+    cache.add(key, 1, None)
+    return cache.get(key, 1)
+
+
+def invalidate_availability(project_id):
+    """
+    Invalidates the cached availability for a project.
+
+    :param project_id: The ID of the project
+    :type project_id: int
+    """
+    key = f"projects:availability:{project_id}:version"
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, None)
+
+
+def get_availability(project):
+    """
+    Returns the project's currently available hosted files and challenge
+    tasks. These are cached until the next time any file or task opens or
+    closes, so the cache expires exactly when availability changes, or until
+    a file or task is changed.
+
+    :param project: The project
+    :type project: DataProject
+    :return: A dict with the available `files` and `tasks` and the `expires` time, if any
+    :rtype: dict
+    """
+    key = f"projects:availability:{project.id}:{get_availability_version(project.id)}"
+    availability = cache.get(key)
+    if availability is None or (availability["expires"] and availability["expires"] <= timezone.now()):
+        now = timezone.now()
+
+        files = HostedFile.objects.filter(project=project)
+        tasks = ChallengeTask.objects.filter(data_project=project)
+
+        # Determine when this changes next
+        expires = min(filter(None, [files.next_boundary(now), tasks.next_boundary(now)]), default=None)
+
+        availability = {
+            "files": list(files.available(now).order_by(F('order').asc(nulls_last=True))),
+            "tasks": list(tasks.available(now)),
+            "expires": expires,
+        }
+
+        timeout = AVAILABILITY_CACHE_TIMEOUT
+        if expires:
+            timeout = max(1, min(timeout, int((expires - now).total_seconds()) + 1))
+
+        cache.set(key, availability, timeout)
+
+    return availability
@@ -0,0 +1,141 @@
+import logging
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db.models import F
+from django.urls import reverse
+
+from projects.models import DataProject
+from projects.models import Group
+
+logger = logging.getLogger(__name__)
+
+# The cache key for the project catalog
+CATALOG_CACHE_KEY = "projects:catalog"
+
+# The number of seconds the catalog is cached for
+CATALOG_CACHE_TIMEOUT = 3600
+
+
+def build_catalog():
+    """
+    Builds a compact listing of all visible projects by category and group
+    along with the groups shown in navigation. Listings contain only what is
+    needed to render catalog pages and navigation.
+
+    :return: The catalog
+    :rtype: dict
+    """
+    projects = DataProject.objects.filter(visible=True).select_related(
+        "institution", "group"
+    ).order_by(F("order").asc(nulls_last=True))
+    groups = {group.id: group for group in Group.objects.order_by("id")}
+
+    # Build the listing of each project and place it in its categories and group
+    catalog = {
+        "datasets": [],
+        "challenges": [],
+        "software": [],
+        "groups": {},
+        "navigation": {},
+        "project_groups": {},
+    }
+    group_projects = defaultdict(list)
+    for project in projects:
+        listing = {
+            "project_key": project.project_key,
+            "name": project.name,
+            "short_description": project.short_description,
+            "commercial_only": project.commercial_only,
+            "order": project.order,
+            "logo_path": project.institution.logo_path if project.institution else None,
+            "group": project.group.key if project.group else None,
+        }
+
+        if project.is_dataset:
+            catalog["datasets"].append(listing)
+        if project.is_challenge:
+            catalog["challenges"].append(listing)
+        if project.is_software:
+            catalog["software"].append(listing)
+        if project.group_id:
+            group_projects[project.group_id].append(listing)
+
+    def group_listing(group):
+        return {
+            "key": group.key,
+            "title": group.title,
+            "description": group.description,
+            "navigation_title": group.navigation_title,
+        }
+
+    for group in groups.values():
+        catalog["groups"][group.key] = dict(group_listing(group), projects=group_projects[group.id])
+
+    # Navigation includes groups with visible projects, with child groups placed under their parents
+    navigation_groups = [group for group in groups.values() if group_projects[group.id]]
+    parent_ids = {group.parent_id for group in navigation_groups if group.parent_id}
+
+    catalog["navigation"]["parent_groups"] = [
+        dict(group_listing(parent), active_project_child_groups=[
+            group_listing(child) for child in navigation_groups if child.parent_id == parent.id
+        ]) for parent in groups.values() if parent.id in parent_ids
+    ]
+
+    # Link directly to the project of top-level groups with only one
+    catalog["navigation"]["groups"] = []
+    for group in navigation_groups:
+        if not group.parent_id:
+            listing = group_listing(group)
+            if len(group_projects[group.id]) == 1:
+                listing["group_url"] = reverse(
+                    "projects:view-project", kwargs={"project_key": group_projects[group.id][0]["project_key"]}
+                )
+
+            catalog["navigation"]["groups"].append(listing)
+
+    # Map every project, visible or not, to its group if it is shown in navigation
+    navigation_group_keys = {group.id: group.key for group in navigation_groups}
+    catalog["project_groups"] = {
+        project_key: navigation_group_keys[group_id]
+        for project_key, group_id in DataProject.objects.filter(
+            group_id__in=navigation_group_keys.keys()
+        ).values_list("project_key", "group_id")
+    }
+
+    return catalog
+
+
+def get_catalog():
+    """
+    Returns the catalog of projects, building it if it is not cached.
+
+    :return: The catalog
+    :rtype: dict
+    """
+    catalog = cache.get(CATALOG_CACHE_KEY)
+    if catalog is None:
+        catalog = rebuild_catalog()
+
+    return catalog
+
+
+def rebuild_catalog():
+    """
+    Builds the catalog of projects and caches it.
+
+    :return: The catalog
+    :rtype: dict
+    """
+    catalog = build_catalog()
+    cache.set(CATALOG_CACHE_KEY, catalog, CATALOG_CACHE_TIMEOUT)
+
+    logger.debug(f"Rebuilt catalog of {sum(len(g['projects']) for g in catalog['groups'].values())} grouped projects")
+    return catalog
+
+
+def invalidate_catalog():
+    """
+    Drops the cached catalog so it is rebuilt when next needed.
+    """
+    cache.delete(CATALOG_CACHE_KEY)
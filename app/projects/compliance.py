@@ -0,0 +1,161 @@
+import logging
+from django.contrib.auth.models import User
+from django.db.models import Count
+from django.db.models import Q
+
+from projects.models import SignedAgreementForm
+from projects.models import SIGNED_FORM_APPROVED
+from projects.models import SIGNED_FORM_PENDING_APPROVAL
+
+logger = logging.getLogger(__name__)
+
+
+class AgreementFormCompliance():
+    """
+    Holds the state of a user's signed agreement forms with respect to the
+    agreement forms required by a DataProject.
+    """
+
+    def __init__(self, user_id, agreement_forms):
+        self.user_id = user_id
+        self.agreement_forms = agreement_forms
+
+        # All signed forms for each agreement form, oldest first
+        self.signed_forms = {agreement_form.id: [] for agreement_form in agreement_forms}
+
+    def latest(self, agreement_form):
+        """
+        Returns the most recently signed form for the agreement form, if any.
+        """
+        signed_forms = self.signed_forms.get(agreement_form.id)
+        return signed_forms[-1] if signed_forms else None
+
+    def latest_signed_forms(self):
+        """
+        Returns the most recently signed form for each agreement form that has been signed.
+        """
+        return [signed_forms[-1] for signed_forms in self.signed_forms.values() if signed_forms]
+
+    def has_status(self, agreement_form, *statuses):
+        """
+        Returns whether any signed form for the agreement form has one of the passed statuses.
+        """
+        return any(f.status in statuses for f in self.signed_forms.get(agreement_form.id, []))
+
+    @property
+    def approved(self):
+        """
+        The agreement forms for which the user has an approved signed form.
+        """
+        return [f for f in self.agreement_forms if self.has_status(f, SIGNED_FORM_APPROVED)]
+
+    @property
+    def pending(self):
+        """
+        The agreement forms for which the user has a signed form pending approval and none approved.
+        """
+        return [
+            f for f in self.agreement_forms
+            if self.has_status(f, SIGNED_FORM_PENDING_APPROVAL) and not self.has_status(f, SIGNED_FORM_APPROVED)
+        ]
+
+    @property
+    def missing(self):
+        """
+        The agreement forms for which the user has no pending or approved signed form.
+        """
+        return [
+            f for f in self.agreement_forms
+            if not self.has_status(f, SIGNED_FORM_PENDING_APPROVAL, SIGNED_FORM_APPROVED)
+        ]
+
+    @property
+    def is_complete(self):
+        """
+        Whether the user has an approved signed form for every agreement form.
+        """
+        return len(self.approved) == len(self.agreement_forms)
+
+
+def signed_agreement_form_project_query(project, prefix=""):
+    """
+    Returns the filter for signed agreement forms that count towards the passed
+    project. If the project shares agreement forms, forms signed for any other
+    project that shares agreement forms are accepted as well.
+
+    :param project: The project
+    :type project: DataProject
+    :param prefix: The lookup path to the SignedAgreementForm, defaults to ""
+    :type prefix: str, optional
+    :return: The filter
+    :rtype: Q
+    """
+    query = Q(**{f"{prefix}project": project})
+    if project.shares_agreement_forms:
+        query |= Q(**{f"{prefix}project__shares_agreement_forms": True})
+
+    return query
+
+
+def get_agreement_form_compliance(project, users, agreement_forms=None):
+    """
+    Determines which of the project's agreement forms are approved, pending or
+    missing for each of the passed users with a single query.
+
+    :param project: The project to evaluate compliance for
+    :type project: DataProject
+    :param users: The users, or user IDs, to evaluate
+    :type users: list
+    :param agreement_forms: The agreement forms to evaluate, defaults to the project's agreement forms
+    :type agreement_forms: list, optional
+    :return: A dictionary of compliance objects keyed by user ID
+    :rtype: dict
+    """
+    if agreement_forms is None:
+        agreement_forms = project.agreement_forms.all()
+    agreement_forms = list(agreement_forms)
+
+    # Set a compliance object for each user
+    user_ids = [getattr(user, "id", user) for user in users]
+    compliance = {user_id: AgreementFormCompliance(user_id, agreement_forms) for user_id in user_ids}
+    if not user_ids or not agreement_forms:
+        return compliance
+
+    # Fetch all relevant signed forms at once
+    signed_forms = SignedAgreementForm.objects.filter(
+        signed_agreement_form_project_query(project),
+        user_id__in=user_ids,
+        agreement_form__in=agreement_forms,
+    ).select_related("agreement_form", "project").order_by("id")
+
+    for signed_form in signed_forms:
+        compliance[signed_form.user_id].signed_forms[signed_form.agreement_form_id].append(signed_form)
+
+    return compliance
+
+
+def get_agreement_form_compliant_users(project):
+    """
+    Returns a queryset of the users that have an approved signed form for every
+    agreement form required by the project. The counting is done in a single
+    grouped query so it may be used as a subquery for filtering.
+
+    :param project: The project to evaluate compliance for
+    :type project: DataProject
+    :return: A queryset of User IDs
+    :rtype: QuerySet
+    """
+    agreement_forms = project.agreement_forms.all()
+    required = agreement_forms.count()
+    if not required:
+        return User.objects.values("id")
+
+    return SignedAgreementForm.objects.filter(
+        signed_agreement_form_project_query(project),
+        agreement_form__in=agreement_forms,
+        status=SIGNED_FORM_APPROVED,
+    ).values("user_id").annotate(
+        approved=Count("agreement_form", distinct=True),
+    ).filter(
+        approved=required,
+    ).values("user_id")
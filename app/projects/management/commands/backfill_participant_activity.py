@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from projects.models import DataProject
+from projects.models import ParticipantActivity
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Rebuild participant download and submission activity from the download and submission logs'
+
+    def add_arguments(self, parser):
+        # Optional arguments
+        parser.add_argument('-p', '--project_key', type=str, help='Limit the rebuild to this project', )
+
+    def handle(self, *args, **options):
+
+        # Determine scope
+        project_ids = None
+        if options['project_key']:
+
+            # Ensure it exists
+            if not DataProject.objects.filter(project_key=options['project_key']).exists():
+                raise CommandError(f'Project with key "{options["project_key"]}" does not exist')
+
+            project_ids = list(DataProject.objects.filter(project_key=options['project_key']).values_list('id', flat=True))
+
+        # Rebuild it
+        with transaction.atomic():
+            total = ParticipantActivity.rebuild(project_ids)
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt activity for {total} project participants"))
@@ -1,13 +1,11 @@
-import json
 from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
-from dbmi_client import fileservice
 
 from projects.models import DataProject
-from projects.models import Team, TEAM_ACTIVE, TEAM_DEACTIVATED
-from projects.models import Participant
-from projects.models import HostedFile
-from projects.models import HostedFileDownload
+from projects.analytics import get_team_activity
+from projects.analytics import get_participant_activity
+from projects.analytics import render_report
+from projects.analytics import REPORT_FORMATS, REPORT_FORMAT_JSON
 
 from contact.views import email_send
 
@@ -24,6 +22,8 @@ class Command(BaseCommand):
 
         # Optional arguments
         parser.add_argument('-r', '--recipient', type=str, help='The recipient for operation report', )
+        parser.add_argument('-f', '--format', type=str, choices=REPORT_FORMATS, default=REPORT_FORMAT_JSON,
+                            help='The format of the operation report', )
 
     def email_report(self, project_key, recipient, report, *args, **options):
         """
@@ -60,30 +60,11 @@ class Command(BaseCommand):
         # Determine if a team-based challenge or not
         if project.has_teams:
 
-            # Fetch teams
-            teams = Team.objects.filter(data_project=project)
+            # Fetch teams with their activity
+            teams = get_team_activity(project)
 
-            # Filter out teams without submissions
-            teams_without_submissions = [t for t in teams if not t.get_submissions()]
-
-            # Get all hosted files for the project
-            hosted_files = HostedFile.objects.filter(project=project)
-
-            # Track teams with no submissions but did download hosted files
-            teams_with_access_and_no_submissions = []
-
-            # Find teams with a user that downloaded any of the files for the project
-            for team in teams_without_submissions:
-
-                # Iterate participants
-                for participant in team.participant_set.all():
-
-                    # Find downloads
-                    if HostedFileDownload.objects.filter(hosted_file__in=hosted_files, user=participant.user):
-
-                        # Add them
-                        teams_with_access_and_no_submissions.append(team)
-                        break
+            # Find teams with a user that downloaded any of the files for the project but no submissions
+            teams_with_access_and_no_submissions = teams.filter(has_submissions=False, has_downloads=True)
 
             # Build report object
             report = {
@@ -92,40 +73,17 @@ class Command(BaseCommand):
                     {"team_leader": team.team_leader.email, "team_id": team.id}
                     for team in teams_with_access_and_no_submissions
                 ],
-                "total_active_teams": len(teams),
+                "total_active_teams": teams.count(),
             }
-
-            # Output
-            self.stdout.write(self.style.SUCCESS(json.dumps(report)))
-
-            # Check for recipient
-            if options['recipient']:
-
-                # Send it
-                self.email_report(options['project_key'], options['recipient'], json.dumps(report))
+            rows_key = "teams_with_downloads_and_no_submissions"
 
         else:
 
-            # Get all participants
-            participants = Participant.objects.filter(project=project)
-
-            # Filter out teams without submissions
-            participants_without_submissions = [p for p in participants if not p.get_submissions()]
-
-            # Get all hosted files for the project
-            hosted_files = HostedFile.objects.filter(project=project)
-
-            # Track teams with no submissions but did download hosted files
-            participants_with_access_and_no_submissions = []
-
-            # Find teams with a user that downloaded any of the files for the project
-            for participant in participants_without_submissions:
-
-                # Find downloads
-                if HostedFileDownload.objects.filter(hosted_file__in=hosted_files, user=participant.user):
+            # Fetch participants with their activity
+            participants = get_participant_activity(project)
 
-                    # Add them
-                    participants_with_access_and_no_submissions.append(participant)
+            # Find participants that downloaded any of the files for the project but no submissions
+            participants_with_access_and_no_submissions = participants.filter(has_submissions=False, has_downloads=True)
 
             # Build report object
             report = {
@@ -134,14 +92,16 @@ class Command(BaseCommand):
                     {"email": participant.user.email, "participant_id": participant.id}
                     for participant in participants_with_access_and_no_submissions
                 ],
-                "total_active_participants": len(participants),
+                "total_active_participants": participants.count(),
             }
+            rows_key = "participants_with_downloads_and_no_submissions"
 
-            # Output
-            self.stdout.write(self.style.SUCCESS(json.dumps(report)))
+        # Output
+        output = render_report(report, rows_key, options['format'])
+        self.stdout.write(self.style.SUCCESS(output))
 
-            # Check for recipient
-            if options['recipient']:
+        # Check for recipient
+        if options['recipient']:
 
-                # Send it
-                self.email_report(options['project_key'], options['recipient'], json.dumps(report))
+            # Send it
+            self.email_report(options['project_key'], options['recipient'], output)
@@ -1,11 +1,14 @@
-import json
-
 from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
 
 from projects.models import DataProject
-from projects.models import Team, TEAM_ACTIVE, TEAM_DEACTIVATED
-from projects.models import Participant
+from projects.models import TEAM_ACTIVE
+from projects.analytics import get_team_activity
+from projects.analytics import get_participant_activity
+from projects.analytics import revoke_teams
+from projects.analytics import revoke_participants
+from projects.analytics import render_report
+from projects.analytics import REPORT_FORMATS, REPORT_FORMAT_JSON
 from contact.views import email_send
 
 import logging
@@ -22,6 +25,8 @@ class Command(BaseCommand):
         # Optional arguments
         parser.add_argument('-r', '--recipient', type=str, help='The recipient for operation report', )
         parser.add_argument('-c', '--commit', action='store_true', help='Commit revocations for participants/teams', )
+        parser.add_argument('-f', '--format', type=str, choices=REPORT_FORMATS, default=REPORT_FORMAT_JSON,
+                            help='The format of the operation report', )
 
     def email_report(self, project_key, recipient, report, *args, **options):
         """
@@ -59,21 +64,11 @@ class Command(BaseCommand):
         # Determine if a team-based challenge or not
         if project.has_teams:
 
-            # Fetch teams
-            teams = Team.objects.filter(data_project=project, status=TEAM_ACTIVE)
+            # Fetch teams with their activity
+            teams = get_team_activity(project).filter(status=TEAM_ACTIVE)
 
             # Filter out teams without submissions
-            teams_without_submissions = [t for t in teams if not t.get_submissions()]
-
-            # Iterate the list
-            for team in teams_without_submissions:
-
-                # Check if only listing
-                if options['commit']:
-
-                    # Revoke access for the team
-                    team.status = TEAM_DEACTIVATED
-                    team.save()
+            teams_without_submissions = list(teams.filter(has_submissions=False))
 
             # Build report object
             report = {
@@ -82,35 +77,23 @@ class Command(BaseCommand):
                     {"team_leader": team.team_leader.email, "team_id": team.id}
                     for team in teams_without_submissions
                 ],
-                "total_active_teams": len(teams),
+                "total_active_teams": teams.count(),
             }
+            rows_key = "revoked_teams"
 
-            # Output
-            self.stdout.write(self.style.SUCCESS(json.dumps(report)))
-
-            # Check for recipient
-            if options['recipient']:
+            # Check if only listing
+            if options['commit']:
 
-                # Send it
-                self.email_report(options['project_key'], options['recipient'], json.dumps(report))
+                # Revoke access for the teams
+                revoke_teams(project, teams.filter(id__in=[team.id for team in teams_without_submissions]))
 
         else:
 
-            # Get all participants
-            participants = Participant.objects.filter(project=project, permission="VIEW")
+            # Fetch participants with their activity
+            participants = get_participant_activity(project).filter(permission="VIEW")
 
-            # Filter out teams without submissions
-            participants_without_submissions = [p for p in participants if not p.get_submissions()]
-
-            # Get all participants
-            for participant in participants_without_submissions:
-
-                # Check if only listing
-                if options['commit']:
-
-                    # Revoke access for the participant
-                    participant.permission = None
-                    participant.save()
+            # Filter out participants without submissions
+            participants_without_submissions = list(participants.filter(has_submissions=False))
 
             # Build report object
             report = {
@@ -119,14 +102,24 @@ class Command(BaseCommand):
                     {"email": participant.user.email, "participant_id": participant.id}
                     for participant in participants_without_submissions
                 ],
-                "total_active_participants": len(participants),
+                "total_active_participants": participants.count(),
             }
+            rows_key = "revoked_participants"
+
+            # Check if only listing
+            if options['commit']:
+
+                # Revoke access for the participants
+                revoke_participants(
+                    project, participants.filter(id__in=[participant.id for participant in participants_without_submissions])
+                )
 
-            # Output
-            self.stdout.write(self.style.SUCCESS(json.dumps(report)))
+        # Output
+        output = render_report(report, rows_key, options['format'])
+        self.stdout.write(self.style.SUCCESS(output))
 
-            # Check for recipient
-            if options['recipient']:
+        # Check for recipient
+        if options['recipient']:
 
-                # Send it
-                self.email_report(options['project_key'], options['recipient'], json.dumps(report))
+            # Send it
+            self.email_report(options['project_key'], options['recipient'], output)
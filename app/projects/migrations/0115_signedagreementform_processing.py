@@ -0,0 +1,33 @@
+# Generated by Django 4.2.23 on 2025-10-06 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0114_agreementform_automatic_approval'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='signedagreementform',
+            name='processing_status',
+            field=models.CharField(blank=True, choices=[('pending', 'Pending'), ('completed', 'Completed'), ('failed', 'Failed')], help_text='The status of deferred document generation and handling, if any', max_length=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='signedagreementform',
+            name='processing_attempts',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='signedagreementform',
+            name='processing_error',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='signedagreementform',
+            name='handler_completed',
+            field=models.BooleanField(default=False, help_text="Whether the agreement form's handler has been called for this signed agreement form"),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.23 on 2025-10-06 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0115_signedagreementform_processing'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='participant',
+            index=models.Index(fields=['project', 'modified'], name='projects_participant_mod_idx'),
+        ),
+    ]
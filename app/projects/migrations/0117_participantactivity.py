@@ -0,0 +1,58 @@
+# Generated by Django 4.2.23 on 2025-10-06 10:12
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_participant_activity(apps, schema_editor):
+    HostedFileDownload = apps.get_model('projects', 'HostedFileDownload')
+    ChallengeTaskSubmission = apps.get_model('projects', 'ChallengeTaskSubmission')
+    ParticipantActivity = apps.get_model('projects', 'ParticipantActivity')
+
+    activity = {}
+    for row in HostedFileDownload.objects.values('hosted_file__project_id', 'user_id').annotate(
+            total=models.Count('id'), last=models.Max('download_date')):
+        activity.setdefault((row['hosted_file__project_id'], row['user_id']), {}).update(
+            download_count=row['total'], last_download=row['last'],
+        )
+    for row in ChallengeTaskSubmission.objects.values('challenge_task__data_project_id', 'participant__user_id').annotate(
+            total=models.Count('uuid'), last=models.Max('upload_date')):
+        activity.setdefault((row['challenge_task__data_project_id'], row['participant__user_id']), {}).update(
+            submission_count=row['total'], last_submission=row['last'],
+        )
+
+    ParticipantActivity.objects.bulk_create(
+        [ParticipantActivity(project_id=project_id, user_id=user_id, **values) for (project_id, user_id), values in activity.items()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('projects', '0116_participant_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ParticipantActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('download_count', models.PositiveIntegerField(default=0)),
+                ('submission_count', models.PositiveIntegerField(default=0)),
+                ('last_download', models.DateTimeField(blank=True, null=True)),
+                ('last_submission', models.DateTimeField(blank=True, null=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('modified', models.DateTimeField(auto_now=True)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='participant_activity', to='projects.dataproject')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='participant_activity', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'participant activity',
+                'unique_together': {('project', 'user')},
+            },
+        ),
+        migrations.RunPython(backfill_participant_activity, migrations.RunPython.noop),
+    ]
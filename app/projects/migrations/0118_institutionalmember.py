@@ -0,0 +1,44 @@
+# Generated by Django 4.2.23 on 2025-10-06 10:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_institutional_members(apps, schema_editor):
+    InstitutionalOfficial = apps.get_model('projects', 'InstitutionalOfficial')
+    InstitutionalMember = apps.get_model('projects', 'InstitutionalMember')
+
+    members = []
+    for official in InstitutionalOfficial.objects.all():
+        emails = {email.strip().lower() for email in official.member_emails or [] if email and email.strip()}
+        members.extend(
+            InstitutionalMember(official_id=official.id, project_id=official.project_id, email=email)
+            for email in emails
+        )
+
+    InstitutionalMember.objects.bulk_create(members, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0117_participantactivity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InstitutionalMember',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email', models.EmailField(max_length=254)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('official', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='members', to='projects.institutionalofficial')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='institutional_members', to='projects.dataproject')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['project', 'email'], name='projects_instmember_email_idx')],
+                'unique_together': {('official', 'email')},
+            },
+        ),
+        migrations.RunPython(backfill_institutional_members, migrations.RunPython.noop),
+    ]
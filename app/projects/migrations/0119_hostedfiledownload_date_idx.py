@@ -0,0 +1,17 @@
+# Generated by Django 4.2.23 on 2025-10-06 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0118_institutionalmember'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='hostedfiledownload',
+            index=models.Index(fields=['hosted_file', 'download_date'], name='projects_hfdownload_date_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.23 on 2025-10-06 10:12
+
+from django.conf import settings
+from django.db import migrations
+
+INDEX_NAME = 'projects_user_email_prefix_idx'
+
+
+def create_user_email_index(apps, schema_editor):
+    # Participant tables prefix search on the user's email with istartswith
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    table = schema_editor.quote_name(User._meta.db_table)
+    name = schema_editor.quote_name(INDEX_NAME)
+
+    # MySQL compares with the column's case-insensitive collation, PostgreSQL upper-cases both sides
+    if schema_editor.connection.vendor == 'mysql':
+        schema_editor.execute(f'CREATE INDEX {name} ON {table} (email)')
+    elif schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'CREATE INDEX {name} ON {table} ((UPPER(email::text)) text_pattern_ops)')
+
+
+def drop_user_email_index(apps, schema_editor):
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    table = schema_editor.quote_name(User._meta.db_table)
+    name = schema_editor.quote_name(INDEX_NAME)
+
+    if schema_editor.connection.vendor == 'mysql':
+        schema_editor.execute(f'DROP INDEX {name} ON {table}')
+    elif schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('projects', '0119_hostedfiledownload_date_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_user_email_index, drop_user_email_index),
+    ]
@@ -1,6 +1,5 @@
 import uuid
 import re
-import importlib
 from datetime import datetime
 from typing import Optional, Tuple
 from collections import defaultdict, deque
@@ -18,6 +17,7 @@ from django.utils import timezone
 
 import projects
 from hypatio.models import SanitizedTextField
+from hypatio.resolvers import resolve_class
 from workflows.models import Workflow
 from workflows.models import WorkflowDependency
 from workflows.models import WorkflowState
@@ -48,6 +48,16 @@ SIGNED_FORM_STATUSES = (
     (SIGNED_FORM_REJECTED, 'Rejected'),
 )
 
+SIGNED_FORM_PROCESSING_PENDING = 'pending'
+SIGNED_FORM_PROCESSING_COMPLETED = 'completed'
+SIGNED_FORM_PROCESSING_FAILED = 'failed'
+
+SIGNED_FORM_PROCESSING_STATUSES = (
+    (SIGNED_FORM_PROCESSING_PENDING, 'Pending'),
+    (SIGNED_FORM_PROCESSING_COMPLETED, 'Completed'),
+    (SIGNED_FORM_PROCESSING_FAILED, 'Failed'),
+)
+
 AGREEMENT_FORM_TYPE_STATIC = 'STATIC'
 AGREEMENT_FORM_TYPE_EXTERNAL_LINK = 'EXTERNAL_LINK'
 AGREEMENT_FORM_TYPE_MODEL = 'MODEL'
@@ -302,9 +312,7 @@ class AgreementForm(models.Model):
                 return None
 
             # Create class from string
-            components = self.form_class.rsplit(".", 1)
-            module = importlib.import_module(components[0])
-            form_class = getattr(module, components[1])
+            form_class = resolve_class(self.form_class)
 
             # Instantiate object
             form = form_class(request, project, self, *args, **kwargs)
@@ -591,6 +599,79 @@ class InstitutionalOfficial(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     modified = models.DateTimeField(auto_now=True)
 
+    def get_member_lookup_emails(self):
+        """
+        Returns the official's member emails normalized for lookups.
+
+        :return: The emails
+        :rtype: set
+        """
+        return {email.strip().lower() for email in self.member_emails or [] if email and email.strip()}
+
+    def sync_members(self):
+        """
+        Updates the official's member lookup entries to match their current
+        list of member emails and project.
+        """
+        emails = self.get_member_lookup_emails()
+
+        # Remove members no longer listed and move the rest to the official's current project
+        self.members.exclude(email__in=emails).delete()
+        self.members.exclude(project_id=self.project_id).update(project_id=self.project_id)
+
+        # Add members newly listed
+        existing = set(self.members.values_list("email", flat=True))
+        InstitutionalMember.objects.bulk_create([
+            InstitutionalMember(official=self, project_id=self.project_id, email=email)
+            for email in emails - existing
+        ])
+
+    @classmethod
+    def get_for_member(cls, project, email):
+        """
+        Returns the official representing the member with the passed email on
+        the project.
+
+        :param project: The project
+        :type project: DataProject
+        :param email: The email of the member
+        :type email: str
+        :raises InstitutionalOfficial.DoesNotExist: If no official represents the member
+        :return: The official
+        :rtype: InstitutionalOfficial
+        """
+        official = cls.objects.filter(
+            members__project=project,
+            members__email=email.strip().lower(),
+        ).order_by("created").first()
+        if official is None:
+            raise cls.DoesNotExist(f"No InstitutionalOfficial for '{email}' on {project}")
+
+        return official
+
+
+class InstitutionalMember(models.Model):
+    """
+    An exact, indexed lookup entry for each of the members represented by an
+    InstitutionalOfficial. These are kept in sync with the official's list of
+    member emails whenever it is saved.
+    """
+    official = models.ForeignKey(InstitutionalOfficial, on_delete=models.CASCADE, related_name="members")
+    project = models.ForeignKey(DataProject, on_delete=models.CASCADE, related_name="institutional_members")
+    email = models.EmailField()
+
+    # Meta
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('official', 'email')
+        indexes = [
+            models.Index(fields=['project', 'email'], name='projects_instmember_email_idx'),
+        ]
+
+    def __str__(self):
+        return '%s - %s' % (self.email, self.official)
+
 
 def validate_pdf_file(value):
     """
@@ -624,6 +705,12 @@ class SignedAgreementForm(models.Model):
     fields = JSONField(null=True, blank=True)
     document = models.FileField(null=True, blank=True, upload_to=signed_agreement_form_document_path)
 
+    # Tracks deferred generation of the document and calling of the agreement form's handler
+    processing_status = models.CharField(max_length=20, null=True, blank=True, choices=SIGNED_FORM_PROCESSING_STATUSES, help_text="The status of deferred document generation and handling, if any")
+    processing_attempts = models.PositiveIntegerField(default=0)
+    processing_error = models.TextField(null=True, blank=True)
+    handler_completed = models.BooleanField(default=False, help_text="Whether the agreement form's handler has been called for this signed agreement form")
+
     # Meta
     created = models.DateTimeField(auto_now_add=True)
     modified = models.DateTimeField(auto_now=True)
@@ -729,6 +816,11 @@ class Participant(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     modified = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["project", "modified"], name="projects_participant_mod_idx"),
+        ]
+
     # TODO remove all these?
     def assign_pending(self, team):
         self.set_pending()
@@ -789,11 +881,77 @@ class HostedFileSet(models.Model):
         return self.project.project_key + ': ' + self.title
 
 
-class HostedFile(models.Model):
+class AvailabilityQuerySet(models.QuerySet):
+    """
+    A queryset for models that are made available by an enabled flag and an
+    optional window between an opened and a closed time.
+    """
+
+    def available(self, now=None):
+        """
+        Filters to objects that are enabled and within their availability window.
+
+        :param now: The time to check availability at, defaults to now
+        :type now: datetime, optional
+        :return: The available objects
+        :rtype: QuerySet
+        """
+        now = now or timezone.now()
+        return self.filter(
+            models.Q(opened_time__isnull=True) | models.Q(opened_time__lt=now),
+            models.Q(closed_time__isnull=True) | models.Q(closed_time__gt=now),
+            enabled=True,
+        )
+
+    def next_boundary(self, now=None):
+        """
+        Returns the next time any enabled object opens or closes, after which
+        the set of available objects changes.
+
+        :param now: The time to check from, defaults to now
+        :type now: datetime, optional
+        :return: The time of the next change, if any
+        :rtype: datetime
+        """
+        now = now or timezone.now()
+        enabled = self.filter(enabled=True)
+        boundaries = [
+            enabled.filter(opened_time__gt=now).aggregate(boundary=models.Min("opened_time"))["boundary"],
+            enabled.filter(closed_time__gt=now).aggregate(boundary=models.Min("closed_time"))["boundary"],
+        ]
+        return min(filter(None, boundaries), default=None)
+
+
+class AvailabilityMixin(object):
+    """
+    Adds an availability check matching AvailabilityQuerySet.available for a
+    single object.
+    """
+
+    def is_available(self, now=None):
+        """
+        Returns whether the object is enabled and within its availability window.
+
+        :param now: The time to check availability at, defaults to now
+        :type now: datetime, optional
+        :return: Whether it is available
+        :rtype: bool
+        """
+        if not self.enabled:
+            return False
+
+        now = now or timezone.now()
+        return (self.opened_time is None or self.opened_time < now) and \
+            (self.closed_time is None or self.closed_time > now)
+
+
+class HostedFile(AvailabilityMixin, models.Model):
     """
     Tracks the files belonging to projects that users will be able to download.
     """
 
+    objects = AvailabilityQuerySet.as_manager()
+
     project = models.ForeignKey(DataProject, on_delete=models.CASCADE)
 
     # This UUID should be used in all templates instead of the pk id.
@@ -846,6 +1004,11 @@ class HostedFileDownload(models.Model):
     hosted_file = models.ForeignKey(HostedFile, on_delete=models.PROTECT)
     download_date = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['hosted_file', 'download_date'], name='projects_hfdownload_date_idx'),
+        ]
+
 
 class TeamComment(models.Model):
     user = models.ForeignKey(User, on_delete=models.PROTECT)
@@ -861,12 +1024,14 @@ class TeamComment(models.Model):
         return '%s %s %s' % (self.user, self.team, self.date)
 
 
-class ChallengeTask(models.Model):
+class ChallengeTask(AvailabilityMixin, models.Model):
     """
     Describes a task that a data challenge might require. User's submissions for tasks are captured
     in the ChallengeTaskSubmission model.
     """
 
+    objects = AvailabilityQuerySet.as_manager()
+
     data_project = models.ForeignKey(DataProject, on_delete=models.CASCADE)
 
     # How should the task be displayed on the front end
@@ -952,6 +1117,104 @@ class ChallengeTaskSubmissionDownload(models.Model):
     download_date = models.DateTimeField(auto_now_add=True)
 
 
+class ParticipantActivity(models.Model):
+    """
+    A rollup of a user's download and submission activity for a project. These
+    are kept current as HostedFileDownloads and ChallengeTaskSubmissions are
+    created so activity can be read without aggregating those logs.
+    """
+
+    project = models.ForeignKey(DataProject, on_delete=models.CASCADE, related_name='participant_activity')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='participant_activity')
+    download_count = models.PositiveIntegerField(default=0)
+    submission_count = models.PositiveIntegerField(default=0)
+    last_download = models.DateTimeField(blank=True, null=True)
+    last_submission = models.DateTimeField(blank=True, null=True)
+
+    # Meta
+    created = models.DateTimeField(auto_now_add=True)
+    modified = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('project', 'user')
+        verbose_name_plural = 'participant activity'
+
+    def __str__(self):
+        return '%s - %s' % (self.user, self.project)
+
+    @classmethod
+    def _record(cls, project_id, user_id, **updates):
+        """
+        Applies the updates to the activity for the project and user, creating it if needed.
+        """
+        updates["modified"] = timezone.now()
+        if not cls.objects.filter(project_id=project_id, user_id=user_id).update(**updates):
+
+            # Create it and try again
+            cls.objects.get_or_create(project_id=project_id, user_id=user_id)
+            cls.objects.filter(project_id=project_id, user_id=user_id).update(**updates)
+
+    @classmethod
+    def record_download(cls, project_id, user_id, download_date):
+        """
+        Records a download of a project's hosted file by the user.
+        """
+        cls._record(project_id, user_id, download_count=models.F("download_count") + 1, last_download=download_date)
+
+    @classmethod
+    def record_submission(cls, project_id, user_id, upload_date):
+        """
+        Records a submission to a project's challenge task by the user.
+        """
+        cls._record(project_id, user_id, submission_count=models.F("submission_count") + 1, last_submission=upload_date)
+
+    @classmethod
+    def get_activity(cls, project, users=None) -> dict:
+        """
+        Returns the activity for the project keyed by user ID, for all or only the passed users.
+        """
+        activity = cls.objects.filter(project=project)
+        if users is not None:
+            activity = activity.filter(user__in=users)
+
+        return {a.user_id: a for a in activity}
+
+    @classmethod
+    def rebuild(cls, project_ids=None):
+        """
+        Recalculates activity from HostedFileDownloads and ChallengeTaskSubmissions,
+        for all or only the passed projects.
+        """
+        downloads = HostedFileDownload.objects.all()
+        submissions = ChallengeTaskSubmission.objects.all()
+        if project_ids is not None:
+            downloads = downloads.filter(hosted_file__project_id__in=project_ids)
+            submissions = submissions.filter(challenge_task__data_project_id__in=project_ids)
+
+        # Aggregate the logs
+        activity = defaultdict(dict)
+        for row in downloads.values("hosted_file__project_id", "user_id").annotate(
+                total=models.Count("id"), last=models.Max("download_date")):
+            activity[(row["hosted_file__project_id"], row["user_id"])].update(
+                download_count=row["total"], last_download=row["last"],
+            )
+        for row in submissions.values("challenge_task__data_project_id", "participant__user_id").annotate(
+                total=models.Count("uuid"), last=models.Max("upload_date")):
+            activity[(row["challenge_task__data_project_id"], row["participant__user_id"])].update(
+                submission_count=row["total"], last_submission=row["last"],
+            )
+
+        # Replace existing activity
+        existing = cls.objects.all() if project_ids is None else cls.objects.filter(project_id__in=project_ids)
+        existing.delete()
+        cls.objects.bulk_create(
+            [cls(project_id=project_id, user_id=user_id, **values) for (project_id, user_id), values in activity.items()],
+            batch_size=1000,
+        )
+
+        return len(activity)
+
+
 class Group(models.Model):
     """
     An optional grouping for projects.
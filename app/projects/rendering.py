@@ -0,0 +1,88 @@
+import hashlib
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.base import Node
+from django.template.base import TextNode
+from django.template.base import Variable
+from django.template.defaulttags import AutoEscapeControlNode
+from django.template.defaulttags import CommentNode
+from django.template.defaulttags import LoadNode
+from django.template.defaulttags import NowNode
+from django.template.loader import get_template
+from django.templatetags.static import StaticNode
+from django.utils.safestring import mark_safe
+
+logger = logging.getLogger(__name__)
+
+# The number of seconds rendered agreement forms are cached for
+AGREEMENT_FORM_CACHE_TIMEOUT = 86400
+
+
+def get_agreement_form_cache_key(agreement_form):
+    """
+    Returns the cache key for the rendered contents of the agreement form. The
+    key changes whenever the form, or the path of its form file, is modified.
+
+    :param agreement_form: The agreement form
+    :type agreement_form: AgreementForm
+    :return: The cache key
+    :rtype: str
+    """
+    path = hashlib.md5(agreement_form.form_file_path.encode()).hexdigest()
+    modified = agreement_form.modified.timestamp() if agreement_form.modified else None
+    return f"projects:agreement-form:{agreement_form.id}:{path}:{modified}"
+
+
+def is_static_template(template):
+    """
+    Returns whether the template renders the same regardless of its context,
+    i.e. it contains only text and tags that read no variables.
+
+    :param template: The template, as returned by the template loader
+    :type template: Template
+    :return: Whether the template reads no variables
+    :rtype: bool
+    """
+    for node in template.template.nodelist.get_nodes_by_type(Node):
+        if isinstance(node, (TextNode, CommentNode, LoadNode, NowNode, AutoEscapeControlNode)):
+            continue
+
+        # Static files are fine as long as their path is not a variable
+        if isinstance(node, StaticNode) and not isinstance(node.path.var, Variable):
+            continue
+
+        return False
+
+    return True
+
+
+def render_agreement_form(agreement_form, context=None):
+    """
+    Renders the agreement form's form file. Forms that read no variables are
+    the same for every user, so their contents are cached until the agreement
+    form is modified and reused whatever the context. Forms that read the
+    context are rendered on each call from the compiled template kept by the
+    template loader.
+
+    :param agreement_form: The agreement form
+    :type agreement_form: AgreementForm
+    :param context: The context to render the form with, defaults to None
+    :type context: dict, optional
+    :return: The rendered form
+    :rtype: SafeString
+    """
+    # Pick up changes to form files during development
+    template = get_template(agreement_form.form_file_path)
+    if settings.DEBUG or (context and not is_static_template(template)):
+        return template.render(context)
+
+    key = get_agreement_form_cache_key(agreement_form)
+    contents = cache.get(key)
+    if contents is None:
+        logger.debug(f"Rendering agreement form '{agreement_form.form_file_path}'")
+        contents = template.render()
+        cache.set(key, str(contents), AGREEMENT_FORM_CACHE_TIMEOUT)
+
+    return mark_safe(contents)
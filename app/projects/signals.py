@@ -1,7 +1,12 @@
+import threading
+
+from django.db.models.signals import m2m_changed
+from django.db.models.signals import post_delete
 from django.db.models.signals import post_save
 from django.db.models.signals import pre_save
 from django.dispatch import receiver
 from django.db import transaction
+from django.utils import timezone
 
 from projects.models import DataProject
 from projects.models import Team
@@ -9,6 +14,22 @@ from projects.models import Participant
 from projects.models import SignedAgreementForm
 from projects.models import TEAM_ACTIVE, TEAM_DEACTIVATED, TEAM_READY
 from projects.models import InstitutionalOfficial
+from projects.models import InstitutionalMember
+from projects.models import HostedFileDownload
+from projects.models import ChallengeTaskSubmission
+from projects.models import ParticipantActivity
+from projects.models import AgreementForm
+from projects.models import Bucket
+from projects.models import ChallengeTask
+from projects.models import DataProjectWorkflow
+from projects.models import HostedFile
+from projects.models import HostedFileSet
+from projects.models import Institution
+from projects.models import Group
+from projects.availability import invalidate_availability
+from projects.catalog import invalidate_catalog
+from projects.snapshots import invalidate_all_projects
+from projects.snapshots import invalidate_project
 
 import logging
 logger = logging.getLogger(__name__)
@@ -41,11 +62,15 @@ def team_post_save_handler(sender, **kwargs):
     if instance.data_project.shares_teams:
         logger.debug(f"Team is a source for other projects: {instance}")
 
-        # Sync
-        sync_teams(instance.data_project)
+        # Sync only the team that changed
+        sync_teams(instance.data_project, team=instance)
+
 
+# Tracks whether a team sync is already running on this thread
+_sync_teams_state = threading.local()
 
-def sync_teams(project):
+
+def sync_teams(project, team=None):
     """
     This method accepts a project and performs a sync of the project's teams
     and participants. If this project shares teams, all ACTIVE teams and their
@@ -54,71 +79,207 @@ def sync_teams(project):
     access revocations if they are unapproved for the source project as that
     change is automatically propogated out to sharing projects' teams.
 
+    Calls made while a sync is already in progress on the current thread are
+    ignored, as the running sync already covers any downstream projects.
+
     :param project: The source project
     :type project: DataProject
+    :param team: Limit the sync to this team of the source project, defaults to None
+    :type team: Team, optional
     """
-    # Load active teams for the source project that are not yet copied
+    # Guard against re-entry from signals fired during the sync
+    if getattr(_sync_teams_state, "active", False):
+        logger.debug(f"Team Sync: Sync already in progress, skipping DataProject/{project}")
+        return
+
+    _sync_teams_state.active = True
+    try:
+        with transaction.atomic():
+
+            # Process the source project and any sharing projects that share their teams in turn
+            pending = [(project, team)]
+            synced_project_ids = set()
+            while pending:
+                source_project, source_team = pending.pop(0)
+                if source_project.id in synced_project_ids:
+                    continue
+                synced_project_ids.add(source_project.id)
+
+                # Sync and queue up downstream projects
+                sharing_projects = _sync_project_teams(source_project, source_team)
+                pending.extend((p, None) for p in sharing_projects if p.shares_teams)
+
+    finally:
+        _sync_teams_state.active = False
+
+
+def _sync_project_teams(project, team=None):
+    """
+    Performs the sync of teams and participants from the passed project to all
+    projects that use it as their teams source. Missing teams and participants
+    are determined with a handful of queries and created in bulk, and copies of
+    deactivated teams are deactivated with a single update.
+
+    :param project: The source project
+    :type project: DataProject
+    :param team: Limit the sync to this team of the source project, defaults to None
+    :type team: Team, optional
+    :return: The projects that use the source project's teams
+    :rtype: list
+    """
+    # Get projects that use this project's teams
+    sharing_projects = list(DataProject.objects.filter(teams_source=project))
+    if not sharing_projects:
+        return sharing_projects
+
+    # Determine the source teams to consider
+    source_teams = project.team_set.all()
+    if team is not None:
+        source_teams = source_teams.filter(id=team.id)
+
+    # Load active teams for the source project
     logger.debug("Team Sync: Processing new teams")
-    for team in project.team_set.filter(status=TEAM_ACTIVE):
-
-        # Iterate projects that use this project's teams
-        for sharing_project in DataProject.objects.filter(teams_source=project):
-
-            # Check if already created
-            shared_team = Team.objects.filter(data_project=sharing_project, source=team).first()
-            if not shared_team:
-                logger.debug(f"Team Sync: Team/{team} not shared with DataProject/{sharing_project}, creating")
-
-                # Create the team
-                shared_team = Team(
-                    source=team,
-                    data_project=sharing_project,
-                    team_leader=team.team_leader,
-                    status=TEAM_READY,
-                )
-                shared_team.save()
-
-            else:
-                logger.debug(f"Team Sync: Team/{team} already shared with DataProject/{sharing_project}")
-
-            # Iterate participants in the source team
-            for participant in team.participant_set.all():
-
-                # See if they already exist
-                shared_participant = Participant.objects.filter(
-                    user=participant.user,
-                    project=sharing_project,
-                    team=shared_team,
-                )
-
-                if not shared_participant:
-                    logger.debug(f"Team Sync: Participant/{participant} not shared with DataProject/{sharing_project}, creating")
-
-                    # Create a new one
-                    shared_participant = Participant(
-                        user=participant.user,
-                        project=sharing_project,
-                        team=shared_team,
-                        team_wait_on_leader_email=participant.team_wait_on_leader_email,
-                        team_wait_on_leader=participant.team_wait_on_leader,
-                        team_pending=participant.team_pending,
-                        team_approved=participant.team_approved,
-                    )
-                    shared_participant.save()
-
-                else:
-                    logger.debug(f"Team Sync: Participant/{participant} already shared with DataProject/{sharing_project}")
-
-    # Load deactivated teams for the source project that have been copied
+    active_teams = list(source_teams.filter(status=TEAM_ACTIVE).only("id", "team_leader_id"))
+    if active_teams:
+
+        # Find which active teams have already been copied to each sharing project
+        shared_team_ids = {
+            (data_project_id, source_id): shared_team_id
+            for shared_team_id, data_project_id, source_id in Team.objects.filter(
+                data_project__in=sharing_projects,
+                source__in=active_teams,
+            ).values_list("id", "data_project_id", "source_id")
+        }
+
+        # Create the teams that are missing
+        missing_teams = [
+            Team(
+                source_id=active_team.id,
+                data_project_id=sharing_project.id,
+                team_leader_id=active_team.team_leader_id,
+                status=TEAM_READY,
+            )
+            for sharing_project in sharing_projects
+            for active_team in active_teams
+            if (sharing_project.id, active_team.id) not in shared_team_ids
+        ]
+        if missing_teams:
+            logger.debug(f"Team Sync: Creating {len(missing_teams)} shared teams for DataProject/{project}")
+            Team.objects.bulk_create(missing_teams)
+
+            # Reload to get identifiers for the new teams
+            shared_team_ids = {
+                (data_project_id, source_id): shared_team_id
+                for shared_team_id, data_project_id, source_id in Team.objects.filter(
+                    data_project__in=sharing_projects,
+                    source__in=active_teams,
+                ).values_list("id", "data_project_id", "source_id")
+            }
+
+        # Find which participants already exist on the shared teams
+        shared_participants = set(
+            Participant.objects.filter(
+                team_id__in=shared_team_ids.values(),
+            ).values_list("user_id", "project_id", "team_id")
+        )
+
+        # Create the participants that are missing
+        missing_participants = []
+        for participant in Participant.objects.filter(team__in=active_teams):
+            for sharing_project in sharing_projects:
+                shared_team_id = shared_team_ids[(sharing_project.id, participant.team_id)]
+                if (participant.user_id, sharing_project.id, shared_team_id) in shared_participants:
+                    continue
+
+                missing_participants.append(Participant(
+                    user_id=participant.user_id,
+                    project_id=sharing_project.id,
+                    team_id=shared_team_id,
+                    team_wait_on_leader_email=participant.team_wait_on_leader_email,
+                    team_wait_on_leader=participant.team_wait_on_leader,
+                    team_pending=participant.team_pending,
+                    team_approved=participant.team_approved,
+                ))
+
+        if missing_participants:
+            logger.debug(f"Team Sync: Creating {len(missing_participants)} shared participants for DataProject/{project}")
+            Participant.objects.bulk_create(missing_participants)
+
+    # Deactivate copies of deactivated teams for the source project
     logger.debug("Team Sync: Processing deactivated teams")
-    for team in project.team_set.filter(status=TEAM_DEACTIVATED):
+    deactivated = Team.objects.filter(
+        source__in=source_teams.filter(status=TEAM_DEACTIVATED),
+    ).exclude(
+        status=TEAM_DEACTIVATED,
+    ).update(
+        status=TEAM_DEACTIVATED,
+        modified=timezone.now(),
+    )
+    if deactivated:
+        logger.debug(f"Team Sync: Deactivated {deactivated} shared teams for DataProject/{project}")
+
+    return sharing_projects
+
+
+def create_institutional_officials(signed_forms):
+    """
+    Creates an InstitutionalOfficial for each of the approved signed forms that
+    was signed by an institutional official, skipping any user who is already
+    an official for the form's project. Existing officials are checked with a
+    single query and new officials and their members are created with a
+    single insert each.
 
-        # Iterate copied teams
-        for shared_team in Team.objects.filter(source=team):
+    :param signed_forms: The signed forms
+    :type signed_forms: list
+    :return: The officials created
+    :rtype: list
+    """
+    officials = {}
+    for signed_form in signed_forms:
+
+        # Check for specific types of forms that require additional handling
+        institute_name, official_email, member_emails = signed_form.get_institutional_signer_details()
+        if signed_form.status == "A" and institute_name and official_email and member_emails:
+            logger.debug(f"Pre-save institutional official AgreementForm: {signed_form}")
+
+            officials.setdefault((signed_form.user_id, signed_form.project_id), InstitutionalOfficial(
+                user=signed_form.user,
+                institution=institute_name,
+                project=signed_form.project,
+                signed_agreement_form=signed_form,
+                member_emails=member_emails,
+            ))
+
+    if not officials:
+        return []
+
+    # Ensure they don't already exist
+    existing = InstitutionalOfficial.objects.filter(
+        user_id__in={user_id for user_id, _ in officials},
+        project_id__in={project_id for _, project_id in officials},
+    ).values_list("user_id", "project_id")
+    for user_id, project_id in existing:
+        if officials.pop((user_id, project_id), None):
+            logger.debug(f"InstitutionalOfficial already exists for {user_id}/{project_id}")
+
+    # Create officials. Primary keys are not set on bulk created objects on
+    # MySQL so fetch them back before creating their member lookup entries.
+    InstitutionalOfficial.objects.bulk_create(officials.values())
+    created = [
+        official for official in InstitutionalOfficial.objects.filter(
+            user_id__in={user_id for user_id, _ in officials},
+            project_id__in={project_id for _, project_id in officials},
+        )
+        if (official.user_id, official.project_id) in officials
+    ]
+    InstitutionalMember.objects.bulk_create([
+        InstitutionalMember(official=official, project_id=official.project_id, email=email)
+        for official in created
+        for email in official.get_member_lookup_emails()
+    ])
+
+    return created
 
-            # Set as deactivated
-            shared_team.status = TEAM_DEACTIVATED
-            shared_team.save()
 
 @receiver(pre_save, sender=SignedAgreementForm)
 def signed_agreement_form_pre_save_handler(sender, **kwargs):
@@ -132,23 +293,116 @@ def signed_agreement_form_pre_save_handler(sender, **kwargs):
     instance = kwargs.get("instance")
     logger.debug(f"Pre-save: {instance}")
 
-    # Check for specific types of forms that require additional handling
-    institute_name, official_email, member_emails = instance.get_institutional_signer_details()
-    if instance.status == "A" and institute_name and official_email and member_emails:
-        logger.debug(f"Pre-save institutional official AgreementForm: {instance}")
+    create_institutional_officials([instance])
+
 
-        # Ensure they don't already exist
-        if InstitutionalOfficial.objects.filter(user=instance.user, project=instance.project).exists():
-            logger.debug(f"InstitutionalOfficial already exists for {instance.user}/{instance.project}")
+@receiver(post_save, sender=InstitutionalOfficial)
+def institutional_official_post_save_handler(sender, **kwargs):
+    """
+    This hook keeps an official's member lookup entries in sync with their
+    list of member emails.
+    """
+    kwargs.get("instance").sync_members()
 
-        else:
 
-            # Create official and member objects
-            official = InstitutionalOfficial.objects.create(
-                user=instance.user,
-                institution=institute_name,
-                project=instance.project,
-                signed_agreement_form=instance,
-                member_emails=member_emails,
-            )
-            official.save()
+@receiver(post_save, sender=HostedFile)
+@receiver(post_delete, sender=HostedFile)
+def hosted_file_availability_handler(sender, **kwargs):
+    """
+    This hook listens for changes to hosted files and invalidates their
+    project's cached availability.
+    """
+    invalidate_availability(kwargs.get("instance").project_id)
+
+
+@receiver(post_save, sender=ChallengeTask)
+@receiver(post_delete, sender=ChallengeTask)
+def challenge_task_availability_handler(sender, **kwargs):
+    """
+    This hook listens for changes to challenge tasks and invalidates their
+    project's cached availability.
+    """
+    invalidate_availability(kwargs.get("instance").data_project_id)
+
+
+@receiver(post_save, sender=HostedFileDownload)
+def hosted_file_download_post_save_handler(sender, **kwargs):
+    """
+    This hook listens for new HostedFileDownloads and records them in the
+    downloading user's activity for the file's project.
+    """
+    instance = kwargs.get("instance")
+    if kwargs.get("created"):
+        ParticipantActivity.record_download(instance.hosted_file.project_id, instance.user_id, instance.download_date)
+
+
+@receiver(post_save, sender=ChallengeTaskSubmission)
+def challenge_task_submission_post_save_handler(sender, **kwargs):
+    """
+    This hook listens for new ChallengeTaskSubmissions and records them in the
+    submitting user's activity for the task's project.
+    """
+    instance = kwargs.get("instance")
+    if kwargs.get("created"):
+        ParticipantActivity.record_submission(
+            instance.participant.project_id, instance.participant.user_id, instance.upload_date
+        )
+
+
+@receiver(post_save, sender=DataProject)
+@receiver(post_delete, sender=DataProject)
+@receiver(post_save, sender=AgreementForm)
+@receiver(post_delete, sender=AgreementForm)
+@receiver(post_save, sender=Institution)
+@receiver(post_delete, sender=Institution)
+@receiver(post_save, sender=Bucket)
+@receiver(post_delete, sender=Bucket)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+@receiver(m2m_changed, sender=DataProject.agreement_forms.through)
+def project_snapshots_handler(sender, **kwargs):
+    """
+    This hook listens for changes to projects or configuration shared between
+    projects and invalidates all snapshots. Projects may be renamed and shared
+    configuration may be referenced by any number of projects.
+    """
+    invalidate_all_projects()
+
+
+@receiver(post_save, sender=ChallengeTask)
+@receiver(post_delete, sender=ChallengeTask)
+@receiver(post_save, sender=DataProjectWorkflow)
+@receiver(post_delete, sender=DataProjectWorkflow)
+def project_configuration_snapshot_handler(sender, **kwargs):
+    """
+    This hook listens for changes to a project's configuration and invalidates
+    the project's snapshot.
+    """
+    instance = kwargs.get("instance")
+    invalidate_project(instance.data_project_id)
+
+
+@receiver(post_save, sender=HostedFileSet)
+@receiver(post_delete, sender=HostedFileSet)
+def hosted_file_set_snapshot_handler(sender, **kwargs):
+    """
+    This hook listens for changes to a project's file sets and invalidates
+    the project's snapshot.
+    """
+    instance = kwargs.get("instance")
+    invalidate_project(instance.project_id)
+
+
+@receiver(post_save, sender=DataProject)
+@receiver(post_delete, sender=DataProject)
+@receiver(post_save, sender=Institution)
+@receiver(post_delete, sender=Institution)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def project_catalog_handler(sender, **kwargs):
+    """
+    This hook listens for changes to projects, institutions and groups and
+    invalidates the catalog once the change is committed so it is not rebuilt
+    from data that is about to change.
+    """
+    transaction.on_commit(invalidate_catalog)
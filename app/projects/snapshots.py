@@ -0,0 +1,97 @@
+import logging
+
+from django.core.cache import cache
+
+from projects.models import DataProject
+
+logger = logging.getLogger(__name__)
+
+# The number of seconds a project snapshot is cached for
+PROJECT_SNAPSHOT_TIMEOUT = 3600
+
+# The cache key for the version shared by all project snapshots
+PROJECT_SNAPSHOT_VERSION_KEY = "projects:snapshot:version"
+
+
+def get_snapshot_version():
+    """
+    Returns the current version of project snapshots.
+
+    :return: The version
+    :rtype: int
+    """
+    cache.add(PROJECT_SNAPSHOT_VERSION_KEY, 1, None)
+    return cache.get(PROJECT_SNAPSHOT_VERSION_KEY, 1)
+
+
+def get_snapshot_key(project_key):
+    """
+    Returns the cache key for the current snapshot of the project.
+
+    :param project_key: The key of the project
+    :type project_key: str
+    :return: The cache key
+    :rtype: str
+    """
+    return f"projects:snapshot:{get_snapshot_version()}:{project_key}"
+
+
+def get_project(project_key):
+    """
+    Returns the DataProject for the key along with its configuration: its
+    institution, bucket, agreement forms, challenge tasks, file sets and
+    workflows. The project is read from a cached snapshot when available and
+    each call returns a separate copy.
+
+    Snapshots are invalidated when the project or its configuration changes
+    but callers that update the project, or that check its registration and
+    authorization settings before writing, should fetch it from the database.
+
+    :param project_key: The key of the project
+    :type project_key: str
+    :raises DataProject.DoesNotExist: If the project does not exist
+    :return: The project
+    :rtype: DataProject
+    """
+    key = get_snapshot_key(project_key)
+    project = cache.get(key)
+    if project is None:
+        project = DataProject.objects.select_related(
+            "institution",
+            "bucket",
+            "group",
+            "teams_source",
+            "data_use_report_agreement_form",
+        ).prefetch_related(
+            "agreement_forms",
+            "challengetask_set",
+            "hostedfileset_set",
+            "workflows__workflow",
+        ).get(project_key=project_key)
+
+        cache.set(key, project, PROJECT_SNAPSHOT_TIMEOUT)
+
+    return project
+
+
+def invalidate_project(project_id):
+    """
+    Invalidates the snapshot of a single project.
+
+    :param project_id: The ID of the project
+    :type project_id: int
+    """
+    project_key = DataProject.objects.filter(id=project_id).values_list("project_key", flat=True).first()
+    if project_key:
+        cache.delete(get_snapshot_key(project_key))
+
+
+def invalidate_all_projects():
+    """
+    Invalidates the snapshots of all projects.
+    """
+    try:
+        cache.incr(PROJECT_SNAPSHOT_VERSION_KEY)
+    except ValueError:
+        cache.add(PROJECT_SNAPSHOT_VERSION_KEY, 1, None)
+
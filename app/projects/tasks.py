@@ -9,11 +9,24 @@ from django.conf import settings
 from django.urls import reverse
 from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
+from django.template import loader
+from django.core.files.base import ContentFile
+from django.utils import timezone as django_timezone
+from django_q.models import Schedule
+from django_q.tasks import schedule
 from furl import furl
 
+from hypatio.resolvers import resolve_callable
+from hypatio.sciauthz_services import SciAuthZ
+from pdf.renderers import render_pdf
 from projects.models import DataProject
 from projects.models import Participant
 from projects.models import DataUseReportRequest
+from projects.models import SignedAgreementForm
+from projects.models import SIGNED_FORM_PROCESSING_PENDING
+from projects.models import SIGNED_FORM_PROCESSING_COMPLETED
+from projects.models import SIGNED_FORM_PROCESSING_FAILED
+from projects.rendering import render_agreement_form
 
 import logging
 logger = logging.getLogger(__name__)
@@ -109,3 +122,174 @@ def send_data_use_report_request(data_use_report_request, subject='[ACTION REQUI
     except Exception as e:
         logger.exception(f"Error sending request: {e}", exc_info=True)
         return False
+
+
+def render_signed_agreement_form_document(signed_agreement_form, request=None):
+    """
+    Renders the PDF document for a signed agreement form using the agreement
+    form's template and the fields that were submitted with it.
+
+    :param signed_agreement_form: The signed agreement form to render
+    :type signed_agreement_form: SignedAgreementForm
+    :param request: The current request, if any, defaults to None
+    :type request: HttpRequest, optional
+    :raises ValueError: If the agreement form is missing required properties
+    :raises TemplateDoesNotExist: If the agreement form's template does not exist
+    :return: The rendered document, if the agreement form has a template
+    :rtype: ContentFile
+    """
+    agreement_form = signed_agreement_form.agreement_form
+
+    # Check for a template
+    if not agreement_form.template:
+        return None
+
+    # Check required properties
+    if not agreement_form.form_file_path:
+        raise ValueError(f"AgreementForm does not have required property 'form_file_path'")
+
+    # Convert hypens to underscore in context
+    safe_fields = {k.replace("-", "_"): v for k, v in (signed_agreement_form.fields or {}).items()}
+
+    # Render content of the agreement form, reusing the cached contents of forms without fields
+    signed_agreement_form_content = render_agreement_form(agreement_form, context=safe_fields)
+
+    # Attempt to load PDF template
+    loader.get_template(agreement_form.template)
+
+    # Set the filename
+    filename = f"{agreement_form.short_name}-{signed_agreement_form.user.email}-{datetime.now().isoformat()}.pdf"
+
+    # Set context
+    context = {
+        "content": signed_agreement_form_content
+    }
+
+    # Render consent PDF
+    logger.debug(f"Rendering agreement form with template: {agreement_form.template}")
+    response = render_pdf(filename, request, agreement_form.template, context=context, options={})
+
+    return ContentFile(response.content, name=filename)
+
+
+def call_signed_agreement_form_handler(signed_agreement_form):
+    """
+    Calls the handler specified by the agreement form, if any, for the signed agreement form.
+
+    :param signed_agreement_form: The signed agreement form to handle
+    :type signed_agreement_form: SignedAgreementForm
+    """
+    agreement_form = signed_agreement_form.agreement_form
+
+    # Check for a handler
+    if not agreement_form.handler:
+        return
+
+    # Call handler
+    resolve_callable(agreement_form.handler)(signed_agreement_form)
+    logger.debug(f"Handler '{agreement_form.handler}' called for SignedAgreementForm")
+
+
+def process_signed_agreement_form(signed_agreement_form_id):
+    """
+    Generates the document and calls the handler for a signed agreement form
+    that was saved with deferred processing. Completed steps are recorded on
+    the signed agreement form so this task may be safely run more than once.
+    Failures are retried with a backoff until the maximum number of attempts
+    is reached, after which the signed agreement form is marked as failed.
+
+    :param signed_agreement_form_id: The ID of the SignedAgreementForm to process
+    :type signed_agreement_form_id: int
+    :return: Whether the operation succeeded or not
+    :rtype: bool
+    """
+    try:
+        signed_agreement_form = SignedAgreementForm.objects.select_related(
+            "agreement_form", "user",
+        ).get(id=signed_agreement_form_id)
+    except SignedAgreementForm.DoesNotExist:
+        logger.error(f"SignedAgreementForm/{signed_agreement_form_id} does not exist")
+        return False
+
+    # Check if already processed
+    if signed_agreement_form.processing_status != SIGNED_FORM_PROCESSING_PENDING:
+        logger.debug(f"SignedAgreementForm/{signed_agreement_form_id} is not pending processing, skipping")
+        return True
+
+    # Record the attempt
+    signed_agreement_form.processing_attempts += 1
+    signed_agreement_form.save(update_fields=["processing_attempts", "modified"])
+
+    try:
+        # Render and upload the document if not already done
+        if signed_agreement_form.agreement_form.template and not signed_agreement_form.document:
+            signed_agreement_form.document = render_signed_agreement_form_document(signed_agreement_form)
+            signed_agreement_form.save(update_fields=["document", "modified"])
+
+        # Call the handler if not already done
+        if signed_agreement_form.agreement_form.handler and not signed_agreement_form.handler_completed:
+            call_signed_agreement_form_handler(signed_agreement_form)
+            signed_agreement_form.handler_completed = True
+            signed_agreement_form.save(update_fields=["handler_completed", "modified"])
+
+        # Mark as completed
+        signed_agreement_form.processing_status = SIGNED_FORM_PROCESSING_COMPLETED
+        signed_agreement_form.processing_error = None
+        signed_agreement_form.save(update_fields=["processing_status", "processing_error", "modified"])
+
+        return True
+
+    except Exception as e:
+        logger.exception(f"SignedAgreementForm/{signed_agreement_form_id} processing error: {e}", exc_info=True, extra={
+            "signed_agreement_form": signed_agreement_form,
+            "attempts": signed_agreement_form.processing_attempts,
+        })
+
+        # Record the error
+        signed_agreement_form.processing_error = str(e)
+
+        # Retry with a backoff if not out of attempts
+        if signed_agreement_form.processing_attempts < settings.SIGNED_AGREEMENT_FORM_PROCESSING_MAX_ATTEMPTS:
+            schedule(
+                "projects.tasks.process_signed_agreement_form",
+                signed_agreement_form_id,
+                schedule_type=Schedule.ONCE,
+                next_run=django_timezone.now() + timedelta(minutes=2 ** signed_agreement_form.processing_attempts),
+            )
+        else:
+            signed_agreement_form.processing_status = SIGNED_FORM_PROCESSING_FAILED
+
+        signed_agreement_form.save(update_fields=["processing_status", "processing_error", "modified"])
+
+    return False
+
+
+def create_profile_permission(user_jwt, user_email, grantee_email, project_key):
+    """
+    Grants the grantee access to the user's profile for the project. This is
+    queued when a user requests to join a team so the team leader can review
+    them without blocking the request on AuthZ.
+
+    :param user_jwt: The JWT of the user whose profile is being shared
+    :type user_jwt: str
+    :param user_email: The email of the user whose profile is being shared
+    :type user_email: str
+    :param grantee_email: The email of the user being granted access
+    :type grantee_email: str
+    :param project_key: The project the permission is for
+    :type project_key: str
+    :return: Whether the permission was created or not
+    :rtype: bool
+    """
+    try:
+        response = SciAuthZ(user_jwt, user_email).create_profile_permission(grantee_email, project_key)
+        response.raise_for_status()
+
+        return True
+
+    except Exception as e:
+        logger.exception(f"Profile permission for {grantee_email} on {user_email} failed: {e}", exc_info=True, extra={
+            "project": project_key,
+        })
+
+    return False
@@ -1,14 +1,13 @@
-import datetime
 from furl import furl
 import logging
 
 from django import template
 from django.conf import settings
-from django.utils.timezone import utc
 from django.template.loader import render_to_string
 from dbmi_client.authn import login_redirect_url
 
 from hypatio.dbmiauthz_services import DBMIAuthz
+from projects.rendering import render_agreement_form
 
 register = template.Library()
 
@@ -20,8 +19,8 @@ def get_html_form_file_contents(form_file_path):
     return render_to_string(form_file_path)
 
 @register.simple_tag
-def get_agreement_form_template(form_file_path, context={}):
-    return render_to_string(form_file_path, context=context)
+def get_agreement_form_contents(agreement_form, context={}):
+    return render_agreement_form(agreement_form, context=context)
 
 @register.filter
 def get_login_url(current_uri):
@@ -41,41 +40,11 @@ def get_login_url(current_uri):
 
 @register.simple_tag
 def is_hostedfile_currently_enabled(hostedfile):
-
-    # If the file is not marked as enabled, it should not be displayed.
-    if not hostedfile.enabled:
-        return False
-
-    # If there is an opened and closed time, the current time must be within that window
-    if hostedfile.opened_time is not None and hostedfile.closed_time is not None:
-        return (datetime.datetime.utcnow().replace(tzinfo=utc) > hostedfile.opened_time) and (datetime.datetime.utcnow().replace(tzinfo=utc) < hostedfile.closed_time)
-
-    if hostedfile.opened_time is not None:
-        return datetime.datetime.utcnow().replace(tzinfo=utc) > hostedfile.opened_time
-
-    if hostedfile.closed_time is not None:
-        return datetime.datetime.utcnow().replace(tzinfo=utc) < hostedfile.closed_time
-
-    return True
+    return hostedfile.is_available()
 
 @register.simple_tag
 def is_challengetask_currently_enabled(challengetask):
-
-    # If the task is not marked as enabled, it should not be displayed.
-    if not challengetask.enabled:
-        return False
-
-    # If there is an opened and closed time, the current time must be within that window
-    if challengetask.opened_time is not None and challengetask.closed_time is not None:
-        return (datetime.datetime.utcnow().replace(tzinfo=utc) > challengetask.opened_time) and (datetime.datetime.utcnow().replace(tzinfo=utc) < challengetask.closed_time)
-
-    if challengetask.opened_time is not None:
-        return datetime.datetime.utcnow().replace(tzinfo=utc) > challengetask.opened_time
-
-    if challengetask.closed_time is not None:
-        return datetime.datetime.utcnow().replace(tzinfo=utc) < challengetask.closed_time
-
-    return True
+    return challengetask.is_available()
 
 
 @register.simple_tag(takes_context=True)
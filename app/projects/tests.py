@@ -1,4 +1,115 @@
+from unittest import mock
+
 from django.contrib.auth.models import User
+from django.template import engines
+from django.test import SimpleTestCase
 from django.test import TestCase
 
-# TODO
\ No newline at end of file
+from projects import signals
+from projects.models import DataProject
+from projects.models import Participant
+from projects.models import Team
+from projects.models import TEAM_ACTIVE, TEAM_DEACTIVATED, TEAM_READY
+from projects.rendering import is_static_template
+from projects.signals import sync_teams
+
+
+class StaticTemplateTestCase(SimpleTestCase):
+
+    def assertStatic(self, source, static=True):
+        template = engines["django"].from_string(source)
+        self.assertEqual(is_static_template(template), static, source)
+
+    def test_text(self):
+        self.assertStatic("<p>Data Use Agreement</p>")
+
+    def test_static_tags(self):
+        self.assertStatic("{% load static %}{% autoescape off %}{% now 'Y' %}{% endautoescape %}")
+        self.assertStatic("{% load static %}<a href=\"{% static 'agreementforms/dua.pdf' %}\">DUA</a>")
+
+    def test_variables(self):
+        self.assertStatic("<p>{{ participant_name|default:'' }}</p>", static=False)
+        self.assertStatic("{% load static %}{% static path %}", static=False)
+
+    def test_nested_variables(self):
+        self.assertStatic("{% autoescape off %}{{ content }}{% endautoescape %}", static=False)
+        self.assertStatic("{% if institutional_official %}<p>Official</p>{% endif %}", static=False)
+
+
+class SyncTeamsTestCase(TestCase):
+
+    def setUp(self):
+        self.source = DataProject.objects.create(project_key="source", has_teams=True, shares_teams=True)
+        self.sharing_projects = [
+            DataProject.objects.create(project_key=f"sharing-{index}", has_teams=True, teams_source=self.source)
+            for index in range(2)
+        ]
+
+        # A team on the source project with a leader and a member
+        self.leader = User.objects.create(username="leader@example.com", email="leader@example.com")
+        self.member = User.objects.create(username="member@example.com", email="member@example.com")
+        self.team = Team.objects.create(team_leader=self.leader, data_project=self.source)
+        for user in [self.leader, self.member]:
+            Participant.objects.create(user=user, project=self.source, team=self.team, team_approved=True)
+
+    def shared_teams(self):
+        return Team.objects.filter(source=self.team).order_by("data_project_id")
+
+    def test_create(self):
+        self.assertFalse(self.shared_teams().exists())
+
+        # Activating the team copies it and its participants to each sharing project
+        self.team.status = TEAM_ACTIVE
+        self.team.save()
+
+        shared_teams = self.shared_teams()
+        self.assertEqual([t.data_project_id for t in shared_teams], [p.id for p in self.sharing_projects])
+        for shared_team in shared_teams:
+            self.assertEqual(shared_team.status, TEAM_READY)
+            self.assertEqual(shared_team.team_leader, self.leader)
+            self.assertEqual(
+                set(shared_team.participant_set.values_list("user_id", "project_id", "team_approved")),
+                {(self.leader.id, shared_team.data_project_id, True), (self.member.id, shared_team.data_project_id, True)},
+            )
+
+    def test_update(self):
+        self.team.status = TEAM_ACTIVE
+        self.team.save()
+
+        # New members are added to existing copies without duplicating anything
+        user = User.objects.create(username="new@example.com", email="new@example.com")
+        Participant.objects.create(user=user, project=self.source, team=self.team)
+        sync_teams(self.source)
+        sync_teams(self.source)
+
+        self.assertEqual(self.shared_teams().count(), len(self.sharing_projects))
+        for shared_team in self.shared_teams():
+            self.assertEqual(
+                sorted(shared_team.participant_set.values_list("user_id", flat=True)),
+                sorted([self.leader.id, self.member.id, user.id]),
+            )
+
+    def test_deactivate(self):
+        self.team.status = TEAM_ACTIVE
+        self.team.save()
+
+        self.team.status = TEAM_DEACTIVATED
+        self.team.save()
+
+        self.assertEqual(set(self.shared_teams().values_list("status", flat=True)), {TEAM_DEACTIVATED})
+
+    def test_reentry(self):
+        sync_project_teams = signals._sync_project_teams
+        synced = []
+
+        # Syncs started from within a sync, as signals would, are skipped
+        def reentrant_sync_project_teams(project, team=None):
+            synced.append(project.id)
+            sync_teams(project, team=team)
+            return sync_project_teams(project, team=team)
+
+        with mock.patch.object(signals, "_sync_project_teams", side_effect=reentrant_sync_project_teams):
+            sync_teams(self.source)
+
+        self.assertEqual(synced, [self.source.id])
+        self.assertFalse(signals._sync_teams_state.active)
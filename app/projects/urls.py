@@ -11,6 +11,7 @@ from projects.api import leave_team
 from projects.api import create_team
 from projects.api import approve_team_join
 from projects.api import reject_team_join
+from projects.api import update_team_members
 from projects.api import finalize_team
 from projects.api import download_dataset
 from projects.api import upload_challengetasksubmission_file
@@ -36,6 +37,7 @@ urlpatterns = [
     re_path(r'^leave_team/$', leave_team, name='leave_team'),
     re_path(r'^approve_team_join/$', approve_team_join, name='approve_team_join'),
     re_path(r'^reject_team_join/$', reject_team_join, name='reject_team_join'),
+    re_path(r'^update_team_members/$', update_team_members, name='update_team_members'),
     re_path(r'^create_team/$', create_team, name='create_team'),
     re_path(r'^finalize_team/$', finalize_team, name='finalize_team'),
     re_path(r'^data_use_report/(?P<request_id>[^/]+)/?$', data_use_report, name='data_use_report'),
@@ -0,0 +1,123 @@
+import logging
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Prefetch
+from django.utils.functional import cached_property
+
+from projects.compliance import get_agreement_form_compliance
+from projects.models import InstitutionalOfficial
+from projects.models import Participant
+from projects.models import SignedAgreementForm
+from projects.models import SIGNED_FORM_APPROVED
+from projects.models import SIGNED_FORM_PENDING_APPROVAL
+from projects.models import TEAM_READY
+
+logger = logging.getLogger(__name__)
+
+
+class UserProjectContext():
+    """
+    Holds everything about a user's involvement in a DataProject that is needed
+    to build the project's page: their participant record, team, agreement
+    forms and institutional officials. Each is fetched the first time it is
+    needed and reused for the rest of the request.
+    """
+
+    def __init__(self, user, project):
+        self.user = user
+        self.project = project
+
+    @cached_property
+    def participant(self):
+        """
+        The user's participant record for the project, if any, with their team
+        and its members.
+        """
+        if not self.user.is_authenticated:
+            return None
+
+        try:
+            return Participant.objects.select_related(
+                "team__team_leader",
+            ).prefetch_related(
+                Prefetch("team__participant_set", queryset=Participant.objects.select_related("user").order_by("id")),
+            ).get(user=self.user, project=self.project)
+        except ObjectDoesNotExist:
+            return None
+
+    @property
+    def team(self):
+        """
+        The user's team on the project, if any.
+        """
+        return self.participant.team if self.participant else None
+
+    @property
+    def team_members(self):
+        """
+        The participants on the user's team.
+        """
+        return list(self.team.participant_set.all()) if self.team else []
+
+    @property
+    def team_pending_members(self):
+        """
+        The participants on the user's team who have not yet been approved by its leader.
+        """
+        return [member for member in self.team_members if not member.team_approved]
+
+    @property
+    def is_on_ready_team(self):
+        """
+        Whether the user is on one of the project's teams that is ready for approval.
+        """
+        return self.team is not None and self.team.data_project_id == self.project.id and self.team.status == TEAM_READY
+
+    @cached_property
+    def agreement_forms(self):
+        """
+        The project's agreement forms in the order they are to be signed.
+        """
+        agreement_forms = sorted(self.project.agreement_forms.all(), key=lambda f: f.name.casefold(), reverse=True)
+        return sorted(agreement_forms, key=lambda f: f.order)
+
+    @cached_property
+    def compliance(self):
+        """
+        The state of the user's signed forms for each of the project's agreement forms.
+        """
+        return get_agreement_form_compliance(self.project, [self.user], self.agreement_forms)[self.user.id]
+
+    @cached_property
+    def signed_forms(self):
+        """
+        The user's pending or approved signed agreement forms for the project.
+        """
+        return list(SignedAgreementForm.objects.filter(
+            project=self.project,
+            user=self.user,
+            status__in=[SIGNED_FORM_PENDING_APPROVAL, SIGNED_FORM_APPROVED]
+        ).select_related("agreement_form", "project"))
+
+    @cached_property
+    def institutional_official(self):
+        """
+        The institutional official representing the user on the project, if any.
+        """
+        if not self.project.institutional_signers:
+            return None
+
+        try:
+            return InstitutionalOfficial.get_for_member(self.project, self.user.email)
+        except ObjectDoesNotExist:
+            return None
+
+    @cached_property
+    def official(self):
+        """
+        The institutional official record of the user, if they are one.
+        """
+        try:
+            return InstitutionalOfficial.objects.select_related("signed_agreement_form").get(user=self.user)
+        except ObjectDoesNotExist:
+            return None
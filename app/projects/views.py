@@ -1,11 +1,13 @@
 import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import dateutil.parser
 from furl import furl
 
 from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
-from django.db.models import F
+from django.db import connections
 from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
 from django.shortcuts import render
@@ -23,21 +25,22 @@ from hypatio.scireg_services import get_user_email_confirmation_status
 from profile.forms import RegistrationForm
 from hypatio.auth0authenticate import public_user_auth_and_jwt
 from hypatio.auth0authenticate import user_auth_and_jwt
-from projects.models import AGREEMENT_FORM_TYPE_EXTERNAL_LINK, TEAM_ACTIVE, TEAM_READY, DataProjectWorkflow
+from projects.models import AGREEMENT_FORM_TYPE_EXTERNAL_LINK, TEAM_ACTIVE, DataProjectWorkflow
 from projects.models import AGREEMENT_FORM_TYPE_STATIC
 from projects.models import AGREEMENT_FORM_TYPE_MODEL
 from projects.models import AGREEMENT_FORM_TYPE_FILE
 from projects.models import AGREEMENT_FORM_TYPE_BLANK
 from projects.models import ChallengeTaskSubmission
 from projects.models import DataProject
-from projects.models import HostedFile
 from projects.models import Participant
 from projects.models import AgreementForm
 from projects.models import SignedAgreementForm
-from projects.models import Group
-from projects.models import InstitutionalOfficial
 from projects.models import DataUseReportRequest
 from projects.models import SIGNED_FORM_APPROVED
+from projects.snapshots import get_project
+from projects.catalog import get_catalog
+from projects.user_context import UserProjectContext
+from projects.availability import get_availability
 from projects.panels import SIGNUP_STEP_COMPLETED_STATUS
 from projects.panels import SIGNUP_STEP_CURRENT_STATUS
 from projects.panels import SIGNUP_STEP_FUTURE_STATUS
@@ -120,7 +123,7 @@ def list_data_projects(request, template_name='projects/list-data-projects.html'
     """
 
     context = {}
-    context['projects'] = DataProject.objects.filter(is_dataset=True, visible=True).order_by(F('order').asc(nulls_last=True))
+    context['projects'] = get_catalog()['datasets']
 
     return render(request, template_name, context=context)
 
@@ -132,7 +135,7 @@ def list_data_challenges(request, template_name='projects/list-data-challenges.h
     """
 
     context = {}
-    context['projects'] = DataProject.objects.filter(is_challenge=True, visible=True).order_by(F('order').asc(nulls_last=True))
+    context['projects'] = get_catalog()['challenges']
 
     return render(request, template_name, context=context)
 
@@ -144,7 +147,7 @@ def list_software_projects(request, template_name='projects/list-software-projec
     """
 
     context = {}
-    context['projects'] = DataProject.objects.filter(is_software=True, visible=True).order_by(F('order').asc(nulls_last=True))
+    context['projects'] = get_catalog()['software']
 
     return render(request, template_name, context=context)
 
@@ -166,10 +169,9 @@ class GroupView(TemplateView):
         # Get the project key from the URL.
         group_key = self.kwargs['group_key']
 
-        # If this project does not exist, display a 404 Error.
-        try:
-            self.group = Group.objects.get(key=group_key)
-        except ObjectDoesNotExist:
+        # If this group does not exist, display a 404 Error.
+        self.group = get_catalog()['groups'].get(group_key)
+        if self.group is None:
             error_message = "The group you searched for does not exist."
             return render(request, '404.html', {'error_message': error_message})
 
@@ -185,7 +187,7 @@ class GroupView(TemplateView):
 
         # Add the project to the context.
         context['group'] = self.group
-        context['projects'] = DataProject.objects.filter(group=self.group, visible=True).order_by(F('order').asc(nulls_last=True))
+        context['projects'] = self.group['projects']
 
         return context
 
@@ -198,9 +200,10 @@ class DataProjectView(TemplateView):
 
     project = None
     user_jwt = None
-    participant = None
+    user_context = None
     current_step = None
     email_verified = None
+    prefetched = None
     template_name = 'projects/project.html'
 
     def dispatch(self, request, *args, **kwargs):
@@ -213,7 +216,7 @@ class DataProjectView(TemplateView):
 
         # If this project does not exist, display a 404 Error.
         try:
-            self.project = DataProject.objects.get(project_key=project_key)
+            self.project = get_project(project_key)
         except ObjectDoesNotExist:
             error_message = "The project you searched for does not exist."
             return render(request, '404.html', {'error_message': error_message})
@@ -221,18 +224,71 @@ class DataProjectView(TemplateView):
         # Add the user's jwt to the class instance.
         self.user_jwt = request.COOKIES.get("DBMI_JWT", None)
 
-        # Add the participant to the class instance if available.
-        if request.user.is_authenticated:
-            try:
-                self.participant = Participant.objects.get(
-                    user=self.request.user,
-                    project=self.project
-                )
-            except ObjectDoesNotExist:
-                pass
+        # Add the user's participant record, team and forms to the class instance as they are needed.
+        self.user_context = UserProjectContext(request.user, self.project)
+
+        # Look up everything needed from external services at once
+        self.prefetched = {}
+        if not self.project.informational_only and request.user.is_authenticated and self.user_jwt:
+            self.prefetched = self.prefetch_services()
 
         return super(DataProjectView, self).dispatch(request, *args, **kwargs)
 
+    def prefetch_services(self):
+        """
+        Makes the independent calls to AuthZ and SciReg needed to build the page
+        concurrently so the page waits on the slowest of them rather than all of
+        them in turn. Each call is bounded by the service request timeout. A call
+        that fails is unknown rather than negative, so it is made again in the
+        request's own thread and any second failure is raised.
+
+        :return: The results keyed by name
+        :rtype: dict
+        """
+        def call(function, *args, **kwargs):
+            try:
+                return function(*args, **kwargs)
+            finally:
+                # Worker threads get their own database connections
+                connections.close_all()
+
+        calls = {
+            'has_manage_permissions': (
+                DBMIAuthz.user_has_manage_permission, [], {
+                    'request': self.request, 'project_key': self.project.project_key
+                }
+            ),
+            'has_view_permission': (
+                DBMIAuthz.user_has_view_permission, [], {
+                    'request': self.request, 'project_key': self.project.project_key
+                }
+            ),
+            'email_verified': (get_user_email_confirmation_status, [self.user_jwt], {}),
+            'profile': (reg.get_dbmi_user, [self.request, self.request.user.email], {}),
+        }
+
+        with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+            futures = {
+                name: executor.submit(call, function, *args, **kwargs)
+                for name, (function, args, kwargs) in calls.items()
+            }
+
+        results = {}
+        for name, future in futures.items():
+            if future.exception() is None:
+                results[name] = future.result()
+                continue
+
+            # Retry it rather than assume the result
+            logger.warning(
+                f"[{self.project.project_key}] Failed prefetching '{name}' for {self.request.user.email}, retrying",
+                exc_info=future.exception()
+            )
+            function, args, kwargs = calls[name]
+            results[name] = function(*args, **kwargs)
+
+        return results
+
     def get_context_data(self, **kwargs):
         """
         Dynamically builds the context for rendering the view based on information
@@ -268,17 +324,13 @@ class DataProjectView(TemplateView):
 
         # Check the users current permissions on this project.
         if self.request.user.is_authenticated:
-            context['has_manage_permissions'] = DBMIAuthz.user_has_manage_permission(
-                request=self.request, project_key=self.project.project_key
-            )
+            context['has_manage_permissions'] = bool(self.prefetched.get('has_manage_permissions'))
             # If user has MANAGE, VIEW is implicit
             context['has_view_permission'] = context['has_manage_permissions'] or \
-                                             DBMIAuthz.user_has_view_permission(
-                                                 request=self.request, project_key=self.project.project_key
-                                             )
+                                             bool(self.prefetched.get('has_view_permission'))
 
         # Require users to verify their email no matter what before they access a project.
-        self.email_verified = get_user_email_confirmation_status(self.user_jwt)
+        self.email_verified = bool(self.prefetched.get('email_verified'))
         if not self.email_verified:
             self.get_signup_context(context)
             return context
@@ -357,7 +409,7 @@ class DataProjectView(TemplateView):
         self.setup_panel_complete_profile(context)
 
         # Check if this project uses shared teams
-        if self.project.teams_source and not Participant.objects.filter(user=self.request.user, team__data_project=self.project, team__status=TEAM_READY).exists():
+        if self.project.teams_source and not self.user_context.is_on_ready_team:
 
             # Show panel
             self.setup_panel_shared_teams(context)
@@ -389,15 +441,8 @@ class DataProjectView(TemplateView):
         Prepares context for institional signer status, if applicable
         """
         # Check if this project/agreement form accepts institutional signers
-        if self.project.institutional_signers:
-            try:
-                # Check for one
-                context["institutional_official"] = InstitutionalOfficial.objects.get(
-                    project=self.project,
-                    member_emails__contains=self.request.user.email,
-                )
-            except ObjectDoesNotExist:
-                pass
+        if self.user_context.institutional_official:
+            context["institutional_official"] = self.user_context.institutional_official
 
     def get_participate_context(self, context):
         """
@@ -491,8 +536,11 @@ class DataProjectView(TemplateView):
         Builds the context needed for users to complete or update their SciReg profile.
         This is a required step.
         """
-        # Fetch their profile, if any, from dbmi-reg
-        profile_data = reg.get_dbmi_user(self.request, self.request.user.email)
+        # Fetch their profile, if any, from dbmi-reg unless it was already
+        if 'profile' in self.prefetched:
+            profile_data = self.prefetched['profile']
+        else:
+            profile_data = reg.get_dbmi_user(self.request, self.request.user.email)
 
         # Set defaults
         email_confirmed = profile_data and profile_data.get("email_confirmed", False)
@@ -577,34 +625,17 @@ class DataProjectView(TemplateView):
         if self.project.agreement_forms.count() == 0:
             return
 
-        agreement_forms = self.project.agreement_forms.order_by('order', '-name')
+        agreement_forms = self.user_context.agreement_forms
+
+        # Determine which forms have been signed, including shared forms if accepted by this project
+        missing_agreement_forms = self.user_context.compliance.missing
 
         # Each form will be a separate step.
         for agreement_form in agreement_forms:
             logger.debug(f"{self.project.project_key}/{agreement_form.short_name}: Checking panel signed agreement form")
 
-            # Only include Pending or Approved forms when searching.
-            signed_forms = SignedAgreementForm.objects.filter(
-                user=self.request.user,
-                project=self.project,
-                agreement_form=agreement_form,
-                status__in=["P", "A"]
-            )
-            logger.debug(f"{self.project.project_key}/{agreement_form.short_name}: Found {len(signed_forms)} signed P/A forms")
-
-            # If this project accepts agreement forms from other projects, check those too
-            if not signed_forms and self.project.shares_agreement_forms:
-
-                # Fetch without a specific project
-                signed_forms = SignedAgreementForm.objects.filter(
-                    user=self.request.user,
-                    agreement_form=agreement_form,
-                    status__in=["P", "A"]
-                )
-                logger.debug(f"{self.project.project_key}/{agreement_form.short_name}: Found {len(signed_forms)} shared signed P/A forms")
-
-            # If the form has already been signed, then the step should be complete.
-            step_complete = signed_forms.count() > 0
+            # If the form has already been signed (pending or approved), then the step should be complete.
+            step_complete = agreement_form not in missing_agreement_forms
             logger.debug(f"{self.project.project_key}/{agreement_form.short_name}: Step is completed: {step_complete}")
 
             # If the form lives externally, then the step will be marked as permanent because we cannot tell if it was completed.
@@ -693,7 +724,7 @@ class DataProjectView(TemplateView):
         step_status = self.get_step_status('request_access', False)
 
         # If the user does not have a participant record, they have not yet requested access.
-        requested_access = self.participant is not None
+        requested_access = self.user_context.participant is not None
 
         panel = DataProjectSignupPanel(
             title='Request Access',
@@ -718,16 +749,9 @@ class DataProjectView(TemplateView):
         if not self.project.has_teams:
             return
 
-        team = None
-        team_has_pending_members = None
-
         # If a user has a Participant record, then they have already been associated with a team.
-        if self.participant is not None:
-            team = self.participant.team
-            team_has_pending_members = Participant.objects.filter(
-                team=self.participant.team,
-                team_approved=False
-            )
+        team = self.user_context.team
+        team_has_pending_members = self.user_context.team_pending_members
 
         # This step is never completed.
         step_status = self.get_step_status('setup_team', False)
@@ -738,7 +762,7 @@ class DataProjectView(TemplateView):
             template='projects/signup/setup-team.html',
             status=step_status,
             additional_context={
-                'participant': self.participant,
+                'participant': self.user_context.participant,
                 'team': team,
                 'team_has_pending_members': team_has_pending_members
             }
@@ -757,7 +781,7 @@ class DataProjectView(TemplateView):
             return
 
         additional_context = {}
-        additional_context['team'] = self.participant.team
+        additional_context['team'] = self.user_context.team
 
         panel = DataProjectInformationalPanel(
             title='Team Members',
@@ -779,11 +803,7 @@ class DataProjectView(TemplateView):
             return
 
         # Get this user's signed agreement forms that have a pending or approved state.
-        signed_forms = SignedAgreementForm.objects.filter(
-            project=self.project,
-            user=self.request.user,
-            status__in=["P", "A"]
-        )
+        signed_forms = self.user_context.signed_forms
 
         panel = DataProjectInformationalPanel(
             title='Signed Agreement Forms',
@@ -821,42 +841,44 @@ class DataProjectView(TemplateView):
         for any files not belonging to a set.
         """
 
-        # Create a panel for each HostedFileSet
-        for file_set in self.project.hostedfileset_set.all().order_by(F('order').asc(nulls_last=True)):
+        # Fetch all of the project's available files at once and group them by set
+        files = get_availability(self.project)["files"]
+        files_by_set = defaultdict(list)
+        for file in files:
+            files_by_set[file.hostedfileset_id].append(file)
 
-            files = file_set.hostedfile_set.all().order_by(F('order').asc(nulls_last=True))
+        # Create a panel for each HostedFileSet
+        file_sets = sorted(
+            self.project.hostedfileset_set.all(),
+            key=lambda file_set: (file_set.order is None, file_set.order or 0)
+        )
+        for file_set in file_sets:
 
             panel = DataProjectActionablePanel(
                 title=file_set.title + ' Downloads',
                 bootstrap_color='default',
                 template='projects/participate/available-downloads.html',
-                additional_context={'files': files}
+                additional_context={'files': files_by_set[file_set.id]}
             )
 
             context['actionable_panels'].append(panel)
 
         # Add another panel for files that do not belong to a HostedFileSet
-        files_without_a_set = HostedFile.objects.filter(
-            project=self.project,
-            hostedfileset=None,
-            enabled=True
-        )
-
-        if files_without_a_set.count() > 0:
+        files_without_a_set = files_by_set[None]
 
-            files_without_a_set_sorted = files_without_a_set.order_by(F('order').asc(nulls_last=True))
+        if files_without_a_set:
 
             panel = DataProjectActionablePanel(
                 title='Available Downloads',
                 bootstrap_color='default',
                 template='projects/participate/available-downloads.html',
-                additional_context={'files': files_without_a_set_sorted}
+                additional_context={'files': files_without_a_set}
             )
 
             context['actionable_panels'].append(panel)
 
         # If no files at all, display an appropriate message.
-        if not self.project.hostedfile_set.all().exists():
+        if not files:
 
             panel = DataProjectActionablePanel(
                 title='Downloads',
@@ -872,23 +894,22 @@ class DataProjectView(TemplateView):
         Builds the context needed for the institutional official to manage
         the members that they provide signing authority for.
         """
-        try:
-            # Check for an institutional official linked to this user
-            official = InstitutionalOfficial.objects.get(user=self.request.user)
+        # Check for an institutional official linked to this user
+        official = self.user_context.official
+        if official is None:
+            return
 
-            # Add a panel
-            panel = DataProjectInstitutionalOfficialPanel(
-                title='Institutional Official',
-                bootstrap_color='default',
-                template='projects/participate/institutional-official.html',
-                additional_context={
-                    "official": official,
-                }
-            )
+        # Add a panel
+        panel = DataProjectInstitutionalOfficialPanel(
+            title='Institutional Official',
+            bootstrap_color='default',
+            template='projects/participate/institutional-official.html',
+            additional_context={
+                "official": official,
+            }
+        )
 
-            context['actionable_panels'].append(panel)
-        except ObjectDoesNotExist:
-            pass
+        context['actionable_panels'].append(panel)
 
     def panel_workflows(self, context):
         """
@@ -915,41 +936,43 @@ class DataProjectView(TemplateView):
         is an optional step depending on the DataProject.
         """
 
-        tasks = self.project.challengetask_set.all()
-
         # Do not include this panel if this project does not have any tasks.
-        if tasks.count() == 0:
+        if not self.project.challengetask_set.exists():
             return
 
+        # Only tasks open for submissions are displayed
+        tasks = get_availability(self.project)["tasks"]
+
         # If the user does not yet have a participant record, create one:
-        if self.participant is None:
-            self.participant = Participant(user=self.request.user, project=self.project)
-            self.participant.save()
+        participant = self.user_context.participant
+        if participant is None:
+            participant = Participant(user=self.request.user, project=self.project)
+            participant.save()
+            self.user_context.participant = participant
 
         additional_context = {}
         task_details = []
 
-        for task in tasks:
-
-            if self.participant.team is not None:
+        # Get the submissions for all tasks already submitted by the team or individual at once
+        submissions = ChallengeTaskSubmission.objects.filter(
+            challenge_task__in=tasks,
+            deleted=False
+        ).select_related('participant__user')
 
-                # Get the submissions for this task already submitted by the team or individual.
-                submissions = ChallengeTaskSubmission.objects.filter(
-                    challenge_task=task,
-                    participant__in=self.participant.team.participant_set.all(),
-                    deleted=False
-                )
+        if participant.team_id is not None:
+            submissions = submissions.filter(participant__team_id=participant.team_id)
+        else:
+            submissions = submissions.filter(participant=participant)
 
-            else:
+        # Group them by task
+        submissions_by_task = defaultdict(list)
+        for submission in submissions:
+            submissions_by_task[submission.challenge_task_id].append(submission)
 
-                # Get the submissions for this task already submitted by the individual.
-                submissions = ChallengeTaskSubmission.objects.filter(
-                    challenge_task=task,
-                    participant=self.participant,
-                    deleted=False
-                )
+        for task in tasks:
 
-            total_submissions = submissions.count()
+            task_submissions = submissions_by_task[task.id]
+            total_submissions = len(task_submissions)
 
             if task.max_submissions is None:
                 submissions_left = None
@@ -958,7 +981,7 @@ class DataProjectView(TemplateView):
 
             task_context = {
                 'task': task,
-                'submissions': submissions,
+                'submissions': task_submissions,
                 'total_submissions': total_submissions,
                 'submissions_left': submissions_left
             }
@@ -990,20 +1013,22 @@ class DataProjectView(TemplateView):
         # Additional requirements if a DataProject requires teams.
         if self.project.has_teams:
 
+            participant = self.user_context.participant
+
             # Make sure the user has a Participant record.
-            if self.participant is None:
+            if participant is None:
                 return False
 
             # Make sure the user is on a team.
-            if self.participant.team is None:
+            if participant.team is None:
                 return False
 
             # Make sure the team leader has accepted this user onto their team.
-            if not self.participant.team_approved:
+            if not participant.team_approved:
                 return False
 
             # Make sure the team has been approved by administrators.
-            if not self.participant.team.status == 'Active':
+            if not participant.team.status == 'Active':
                 return False
 
         # If no issues, then the user been granted access.
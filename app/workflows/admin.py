@@ -14,6 +14,7 @@ from workflows.models import FileUploadStep
 from workflows.models import StepStateInitialization
 from workflows.models import StepStateReview
 from workflows.models import StepStateVersion
+from workflows.models import StepStateQueueCount
 from workflows.models import MediaTypeGroup
 
 @admin.register(Workflow)
@@ -81,6 +82,17 @@ class StepStateVersionAdmin(admin.ModelAdmin):
     readonly_fields = ('created_at', 'modified_at', )
 
 
+@admin.register(StepStateQueueCount)
+class StepStateQueueCountAdmin(admin.ModelAdmin):
+    list_display = ('workflow', 'status', 'count', 'modified_at', )
+    readonly_fields = ('created_at', 'modified_at', )
+    actions = ('rebuild', )
+
+    @admin.action(description="Recalculate counts for selected workflows")
+    def rebuild(self, request, queryset):
+        StepStateQueueCount.rebuild(workflow_ids=set(queryset.values_list('workflow_id', flat=True)))
+
+
 @admin.register(MediaType)
 class MediaTypeAdmin(admin.ModelAdmin):
     list_display = ('value', 'created_at', 'modified_at', )
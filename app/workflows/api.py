@@ -138,7 +138,7 @@ class WorkflowStateViewSet(viewsets.ModelViewSet):
                 _status=StepState.Status.Uninitialized.value,
                 step__initialization_required=True,
                 initialization__isnull=True
-            ).distinct()
+            )
 
             # Filter off those
             filter_conditions &= Q(id__in=step_states.values_list('workflow_state__id', flat=True))
@@ -152,7 +152,7 @@ class WorkflowStateViewSet(viewsets.ModelViewSet):
                 _status=StepState.Status.Unreviewed.value,
                 step__review_required=True,
                 review__isnull=True,
-            ).distinct()
+            )
 
             # Filter off those
             filter_conditions &= Q(id__in=step_states.values_list('workflow_state__id', flat=True))
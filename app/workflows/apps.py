@@ -1,4 +1,35 @@
 from django.apps import AppConfig
+from django.core.signals import request_started
+from django.db import DatabaseError
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+def warm_controller_classes(sender, **kwargs):
+    """
+    Resolves the controller and form classes referenced by workflows and steps
+    so they are cached before use. This is run once on the first request to
+    avoid querying the database during app initialization.
+    """
+    request_started.disconnect(warm_controller_classes, dispatch_uid="warm_controller_classes")
+
+    from hypatio.resolvers import resolve_class, warm
+    from workflows.models import Workflow, Step, FormStep
+
+    try:
+        # Collect all referenced classes
+        paths = list(Workflow.objects.values_list("controller", flat=True))
+        for controller, initialization_controller, review_controller in Step.objects.values_list(
+            "controller", "initialization_controller", "review_controller"
+        ):
+            paths.extend([controller, initialization_controller, review_controller])
+        paths.extend(FormStep.objects.values_list("form_class_name", flat=True))
+
+        warm(paths, resolve_class)
+
+    except DatabaseError as e:
+        logger.warning(f"Could not warm workflow controller classes: {e}")
 
 
 class WorkflowsConfig(AppConfig):
@@ -8,3 +39,24 @@ class WorkflowsConfig(AppConfig):
     def ready(self):
         # Implicitly connect signal handlers decorated with @receiver.
         from workflows import signals
+
+        # Import all controller modules so every subclass is registered
+        import workflows.controllers.initializations
+        import workflows.controllers.review
+        import workflows.controllers.steps
+        import workflows.controllers.workflows
+        from workflows.controllers import clear_controller_choices
+        from hypatio.resolvers import resolve_class, warm
+
+        # Cache controller choices and classes now that all are loaded
+        clear_controller_choices()
+        for get_choices in (
+            workflows.controllers.initializations.get_step_initialization_controller_choices,
+            workflows.controllers.review.get_step_review_controller_choices,
+            workflows.controllers.steps.get_step_controller_choices,
+            workflows.controllers.workflows.get_workflow_controller_choices,
+        ):
+            warm([path for path, _ in get_choices()], resolve_class)
+
+        # Warm classes referenced in the database once it is available
+        request_started.connect(warm_controller_classes, dispatch_uid="warm_controller_classes")
@@ -13,15 +13,31 @@ def get_all_subclasses(cls):
     return subclasses
 
 
+# Choices for each controller class, cached once computed
+_controller_choices = {}
+
+
 def get_controller_choices(controller_class):
     """
     Returns a list of tuples containing a class's fully-qualified name and its short name.
     """
-    choices = []
-    for subclass in get_all_subclasses(controller_class):
-        full_name = f"{subclass.__module__}.{subclass.__name__}"
-        choices.append((full_name, subclass.name()))
-    return sorted(choices)
+    choices = _controller_choices.get(controller_class)
+    if choices is None:
+        choices = []
+        for subclass in get_all_subclasses(controller_class):
+            full_name = f"{subclass.__module__}.{subclass.__name__}"
+            choices.append((full_name, subclass.name()))
+        choices = _controller_choices[controller_class] = sorted(choices)
+
+    return list(choices)
+
+
+def clear_controller_choices():
+    """
+    Clears cached controller choices. This should be called once all controller
+    modules have been imported so choices include every subclass.
+    """
+    _controller_choices.clear()
 
 
 class BaseController(ABC):
@@ -0,0 +1,56 @@
+# Generated by Django 4.2.23 on 2025-10-08 14:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+QUEUE_STATUSES = ('uninitialized', 'unreviewed')
+
+
+def populate_queue_counts(apps, schema_editor):
+    Workflow = apps.get_model('workflows', 'Workflow')
+    StepState = apps.get_model('workflows', 'StepState')
+    StepStateQueueCount = apps.get_model('workflows', 'StepStateQueueCount')
+
+    # Count step states currently in queue statuses
+    counts = {
+        (row['step__workflow_id'], row['_status']): row['total']
+        for row in StepState.objects.filter(_status__in=QUEUE_STATUSES)
+        .values('step__workflow_id', '_status')
+        .annotate(total=models.Count('id'))
+    }
+
+    StepStateQueueCount.objects.bulk_create([
+        StepStateQueueCount(workflow_id=workflow_id, status=status, count=counts.get((workflow_id, status), 0))
+        for workflow_id in Workflow.objects.values_list('id', flat=True)
+        for status in QUEUE_STATUSES
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflows', '0010_mediatypegroup'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='stepstate',
+            index=models.Index(fields=['_status', 'step'], name='workflows_ss_status_step_idx'),
+        ),
+        migrations.CreateModel(
+            name='StepStateQueueCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('uninitialized', 'Uninitialized'), ('current', 'Current'), ('unreviewed', 'Unreviewed'), ('completed', 'Completed'), ('indefinite', 'Indefinite')], max_length=128)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('modified_at', models.DateTimeField(auto_now=True)),
+                ('workflow', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='queue_counts', to='workflows.workflow')),
+            ],
+            options={
+                'unique_together': {('workflow', 'status')},
+            },
+        ),
+        migrations.RunPython(populate_queue_counts, migrations.RunPython.noop),
+    ]
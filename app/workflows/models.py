@@ -1,7 +1,5 @@
 import uuid
 import re
-import importlib
-import inspect
 from enum import Enum
 from collections import defaultdict
 from collections import deque
@@ -18,6 +16,7 @@ from polymorphic.models import PolymorphicModel
 from dbmi_client import fileservice
 
 from hypatio.models import SanitizedTextField
+from hypatio.resolvers import resolve_class
 from workflows.controllers.initializations import get_step_initialization_controller_choices
 from workflows.controllers.review import get_step_review_controller_choices
 
@@ -29,49 +28,17 @@ def check_controller_class(controller_class_name) -> bool:
     """
     Utility method for ensuring a class is a valid controller class.
     """
-    try:
-        # Split module and class
-        module_path, class_name = controller_class_name.rsplit(".", 1)
+    # Resolving the class validates it
+    resolve_class(controller_class_name)
 
-        # Import the module
-        module = importlib.import_module(module_path)
-
-        # Get the class
-        cls = getattr(module, class_name)
-
-        # Check it's actually a class
-        if not inspect.isclass(cls):
-            raise ValidationError(f"Invalid class name: {controller_class_name}. Ensure it is a valid Python import path to a class.")
-
-        # Check if class is abstract
-        if inspect.isabstract(cls):
-            raise ValidationError(f"Invalid class name: {controller_class_name}. Specified class is abstract and cannot be used.")
-
-        return True
-
-    except (ImportError, AttributeError, ValueError) as e:
-        logger.exception(e, exc_info=True)
-        raise ValidationError(f"Invalid class name: {controller_class_name}. Ensure it is a valid Python import path to a class.")
+    return True
 
 def get_controller_instance(controller_class_name, *args, **kwargs) -> object:
     """
     Utility method for instaniating and returning an instance of a controller
     class via its name.
     """
-    try:
-        # Split module and class
-        module_path, class_name = controller_class_name.rsplit(".", 1)
-
-        # Import the module
-        module = importlib.import_module(module_path)
-
-        controller = getattr(module, class_name)(*args, **kwargs)
-
-        return controller
-
-    except (ImportError, AttributeError, ValueError) as e:
-        logger.exception(e, exc_info=True)
-        raise ValidationError(f"Invalid class name: {controller_class_name}. Ensure it is a valid Python import path to a class.")
+    return resolve_class(controller_class_name)(*args, **kwargs)
 
 
 # class Project(models.Model):
@@ -706,9 +673,15 @@ class StepState(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     modified_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["_status", "step"], name="workflows_ss_status_step_idx"),
+        ]
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.__original_status = self.status
+        self.__counted_status = self.status
 
     @property
     def status(self):
@@ -932,9 +905,17 @@ class StepState(models.Model):
         if status_changed and not self.validate_next_status():
             raise ValidationError(f"Error: status '{self.status}' is invalid for the current state of this object")
 
+        # Determine the status last recorded in queue counts
+        counted_status = None if self._state.adding else self.__counted_status
+
         # Process the save
         super().save(*args, **kwargs)
 
+        # Update queue counts
+        if counted_status != self.status:
+            StepStateQueueCount.record_transition(self.step.workflow_id, counted_status, self.status)
+            self.__counted_status = self.status
+
         # If this is a status change, update dependent steps.
         if status_changed:
             self.workflow_state.set_step_statuses()
@@ -965,6 +946,88 @@ class StepState(models.Model):
         return get_controller_instance(self.step.review_controller, self, *args, **kwargs)
 
 
+class StepStateQueueCount(models.Model):
+    """
+    Tracks the number of StepStates for a Workflow that are in a status that
+    requires administrator action, e.g. initialization or review. These are
+    kept current on StepState status transitions so queue sizes can be read
+    without counting StepStates.
+    """
+    QUEUE_STATUSES = (StepState.Status.Uninitialized.value, StepState.Status.Unreviewed.value)
+
+    status = models.CharField(max_length=128, choices=StepState.Status.choices())
+    count = models.PositiveIntegerField(default=0)
+
+    # Relationships
+    workflow = models.ForeignKey(Workflow, on_delete=models.CASCADE, related_name='queue_counts')
+
+    # Meta
+    created_at = models.DateTimeField(auto_now_add=True)
+    modified_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('workflow', 'status')
+
+    def __str__(self):
+        return f"{self.workflow.name}: {self.status}: {self.count}"
+
+    @classmethod
+    def record_transition(cls, workflow_id, previous_status: Optional[str], status: Optional[str]):
+        """
+        Updates counts for a StepState that has moved from one status to another.
+        Passing None for either status indicates creation or deletion of the StepState.
+        """
+        if previous_status in cls.QUEUE_STATUSES:
+            cls.objects.filter(workflow_id=workflow_id, status=previous_status, count__gt=0).update(
+                count=models.F("count") - 1, modified_at=timezone.now(),
+            )
+
+        if status in cls.QUEUE_STATUSES:
+            if not cls.objects.filter(workflow_id=workflow_id, status=status).update(
+                count=models.F("count") + 1, modified_at=timezone.now(),
+            ):
+                # Create it and try again
+                cls.objects.get_or_create(workflow_id=workflow_id, status=status)
+                cls.objects.filter(workflow_id=workflow_id, status=status).update(
+                    count=models.F("count") + 1, modified_at=timezone.now(),
+                )
+
+    @classmethod
+    def get_counts(cls, workflow_ids) -> dict[str, int]:
+        """
+        Returns the total count for each queue status across the passed workflows.
+        """
+        counts = {status: 0 for status in cls.QUEUE_STATUSES}
+        for status, count in cls.objects.filter(workflow_id__in=workflow_ids).values_list("status", "count"):
+            counts[status] += count
+
+        return counts
+
+    @classmethod
+    def rebuild(cls, workflow_ids=None):
+        """
+        Recalculates counts from StepStates, for all or only the passed workflows.
+        """
+        step_states = StepState.objects.filter(_status__in=cls.QUEUE_STATUSES)
+        if workflow_ids is not None:
+            step_states = step_states.filter(step__workflow_id__in=workflow_ids)
+
+        # Count them
+        counts = {
+            (row["step__workflow_id"], row["_status"]): row["total"]
+            for row in step_states.values("step__workflow_id", "_status").annotate(total=models.Count("id"))
+        }
+
+        workflows = Workflow.objects.all() if workflow_ids is None else Workflow.objects.filter(id__in=workflow_ids)
+        for workflow_id in workflows.values_list("id", flat=True):
+            for status in cls.QUEUE_STATUSES:
+                cls.objects.update_or_create(
+                    workflow_id=workflow_id,
+                    status=status,
+                    defaults={"count": counts.get((workflow_id, status), 0)},
+                )
+
+
 class StepStateInitialization(models.Model):
     """
     Represents the initialization of a step. This is used to track when a step was initialized.
@@ -1140,18 +1203,8 @@ class FormStepMixin:
         """
         Returns a form instance for this step, if a form class is specified.
         """
-        try:
-            # Split module and class
-            module_path, class_name = self.form_class_name.rsplit(".", 1)
-
-            # Import the module
-            module = importlib.import_module(module_path)
-
-            # Build the form
-            return getattr(module, class_name)(*args, **kwargs)
-
-        except (ImportError, AttributeError, ValueError):
-            raise ValidationError(f"Invalid class name: {self.class_name}. Ensure it is a valid Python import path to a class.")
+        # Build the form
+        return resolve_class(self.form_class_name)(*args, **kwargs)
 
 
 class FormStep(Step, FormStepMixin):
@@ -2,7 +2,9 @@ from django.db.models.signals import post_delete, pre_delete
 from django.dispatch import receiver
 
 from workflows.models import WorkflowState
+from workflows.models import Step
 from workflows.models import StepState
+from workflows.models import StepStateQueueCount
 from workflows.models import StepStateReview
 from workflows.models import StepStateInitialization
 
@@ -10,6 +12,12 @@ from workflows.models import StepStateInitialization
 @receiver(post_delete, sender=StepState)
 def step_state_post_delete(sender, instance, using, **kwargs):
 
+    # Remove it from queue counts
+    try:
+        StepStateQueueCount.record_transition(instance.step.workflow_id, instance.status, None)
+    except Step.DoesNotExist:
+        pass
+
     # Do not do this if we are deleting the WorkflowState
     if kwargs.get("origin") and kwargs["origin"].model is WorkflowState:
         return